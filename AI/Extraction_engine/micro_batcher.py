@@ -0,0 +1,101 @@
+"""
+ScholarMind — Async Micro-Batcher
+---------------------------------
+
+Coalesces concurrent single-item requests into batches for models that are
+much faster per item when called on a list (SentenceTransformer, KeyBERT).
+
+Callers `await batcher.submit(item)`. A worker collects queued items and
+flushes them as one `fn(items)` call once `max_batch_size` items are waiting
+or `max_wait_ms` has passed since the first one, whichever comes first. The
+call runs in a thread so the event loop stays free, and every caller gets
+its own result (or the batch's exception) through its future; `fn` must
+return one result per item, in order.
+"""
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import Executor
+from typing import Any
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        fn: Callable[[list], list],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        executor: Executor | None = None,
+    ):
+        self.fn = fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.executor = executor
+        self.batches = 0
+        self.items = 0
+        self._queue = None
+        self._worker = None
+        self._loop = None
+
+    async def submit(self, item) -> Any:
+        """Queue one item and wait for its result."""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.items / self.batches if self.batches else 0.0
+
+    async def close(self):
+        if self._worker:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        # A batcher may outlive the loop it was first used on (asyncio.run).
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except TimeoutError:
+                    break
+            await self._flush(batch)
+
+    async def _flush(self, batch):
+        # Callers that gave up (e.g. request cancelled) are not computed.
+        batch = [(item, future) for item, future in batch if not future.done()]
+        if not batch:
+            return
+        items = [item for item, _ in batch]
+        self.batches += 1
+        self.items += len(items)
+        try:
+            results = await self._loop.run_in_executor(self.executor, self.fn, items)
+            if len(results) != len(items):
+                raise ValueError(
+                    f"Batch function returned {len(results)} results "
+                    f"for {len(items)} items"
+                )
+        except Exception as e:  # noqa: BLE001 - handed to every caller
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results, strict=True):
+            if not future.done():
+                future.set_result(result)
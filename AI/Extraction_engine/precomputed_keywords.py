@@ -0,0 +1,98 @@
+"""
+ScholarMind — Keywords from Precomputed Embeddings
+--------------------------------------------------
+
+KeyBERT keyword extraction for documents that are already indexed.
+
+The document embedding is built from the chunk vectors the vector DB (or
+the embedding cache) already holds, so the document text is never encoded
+again. Only the candidate n-grams are embedded, with the same model as the
+index so both live in one vector space, and through a cached embedder, so
+phrases repeated across papers are embedded once.
+"""
+
+import numpy as np
+from keybert import KeyBERT
+from keybert.backend import BaseEmbedder
+from sklearn.feature_extraction.text import CountVectorizer
+
+from AI.config import settings
+
+KEYPHRASE_NGRAM_RANGE = (1, 3)
+STOP_WORDS = "english"
+
+
+class LangchainEmbedder(BaseEmbedder):
+    """KeyBERT backend over a LangChain `Embeddings` (e.g. the index's)."""
+
+    def __init__(self, embeddings):
+        super().__init__()
+        self.embeddings = embeddings
+
+    def embed(self, documents, verbose: bool = False) -> np.ndarray:
+        return np.asarray(
+            self.embeddings.embed_documents(list(documents)), dtype=np.float32
+        )
+
+
+def document_embedding(chunk_vectors) -> np.ndarray:
+    """Mean of a document's chunk vectors, L2-normalized."""
+    vectors = np.asarray(chunk_vectors, dtype=np.float32)
+    mean = vectors.mean(axis=0)
+    norm = np.linalg.norm(mean)
+    return mean / norm if norm else mean
+
+
+def extract_keywords_precomputed(
+    text: str,
+    doc_embedding: np.ndarray,
+    keyphrase_embeddings,
+    top_n: int = 5,
+    max_candidates: int = settings.KEYPHRASE_MAX_CANDIDATES,
+):
+    """
+    Extract keywords from `text` given its precomputed embedding.
+
+    Parameters
+    ----------
+    text : str
+        The document text, used to find candidate keyphrases.
+    doc_embedding : np.ndarray
+        Embedding of the document, e.g. `document_embedding(chunk_vectors)`.
+    keyphrase_embeddings : Embeddings
+        Embeds the candidates; must be the model that produced
+        `doc_embedding` and should be cached.
+    top_n : int, optional
+        Number of keywords to return (default = 5).
+    max_candidates : int, optional
+        Only the most frequent candidate n-grams are embedded, which bounds
+        the embedding API calls per document.
+
+    Returns
+    -------
+    list of dict
+        Same format as `extract_keywords`: "keyword" and "score" per item.
+    """
+    vectorizer = CountVectorizer(
+        ngram_range=KEYPHRASE_NGRAM_RANGE,
+        stop_words=STOP_WORDS,
+        max_features=max_candidates,
+    )
+    try:
+        candidates = vectorizer.fit([text]).get_feature_names_out()
+    except ValueError:  # no candidate left after stop words
+        return []
+
+    embedder = LangchainEmbedder(keyphrase_embeddings)
+    # KeyBERT refits `vectorizer` on the same text, so its candidate list
+    # lines up with these embeddings.
+    keywords = KeyBERT(model=embedder).extract_keywords(
+        text,
+        vectorizer=vectorizer,
+        use_mmr=True,
+        diversity=0.7,
+        top_n=top_n,
+        doc_embeddings=np.asarray(doc_embedding, dtype=np.float32).reshape(1, -1),
+        word_embeddings=embedder.embed(candidates),
+    )
+    return [{"keyword": kw, "score": float(score)} for kw, score in keywords]
@@ -0,0 +1,277 @@
+"""
+ScholarMind — Query Embedding Cache
+-----------------------------------
+
+Two-tier cache for query embeddings:
+- an in-process LRU, checked first
+- Redis, shared by every worker and surviving restarts
+
+Vectors are stored in Redis as raw float32 bytes under
+`<prefix>:<model name>:<sha256 of the normalized query>` with a TTL.
+A query the model rejects (a `permanent_errors` exception, e.g. a
+ValueError for input it cannot tokenize) is cached as a failure for the
+shorter `negative_ttl`, stored in Redis as an empty value; any other
+error is transient and never cached, so it does not stick.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Callable
+
+import numpy as np
+
+from AI.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Returned by the tier lookups for a query cached as a permanent failure.
+FAILED = object()
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form of a query: NFKC, stripped, single spaces."""
+    return " ".join(unicodedata.normalize("NFKC", query).split())
+
+
+def get_redis_client():
+    """Binary (non-decoding) Redis client for REDIS_URL, or None."""
+    if not settings.REDIS_URL:
+        return None
+    try:
+        import redis
+    except ImportError:
+        logger.warning("REDIS_URL is set but redis is not installed")
+        return None
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+class QueryEmbeddingCache:
+    def __init__(
+        self,
+        model_name: str,
+        redis_client=None,
+        maxsize: int = settings.QUERY_EMBEDDING_CACHE_SIZE,
+        ttl: int = settings.QUERY_EMBEDDING_CACHE_TTL,
+        negative_ttl: int = settings.QUERY_EMBEDDING_NEGATIVE_TTL,
+        permanent_errors: tuple[type[Exception], ...] = (ValueError, TypeError),
+        prefix: str = "qemb",
+    ):
+        self.model_name = model_name
+        self.redis = redis_client
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.permanent_errors = permanent_errors
+        self.prefix = prefix
+        # key -> vector, or the time.time() a cached failure expires at
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.failures = 0
+        self.redis_errors = 0
+
+    def key(self, query: str) -> str:
+        digest = hashlib.sha256(normalize_query(query).encode()).hexdigest()
+        return f"{self.prefix}:{self.model_name}:{digest}"
+
+    def get_or_compute(
+        self, query: str, compute: Callable[[str], np.ndarray]
+    ) -> np.ndarray | None:
+        """
+        Return the cached embedding of `query`, computing it with
+        `compute(normalized_query)` on a miss. Returns None if `compute`
+        raises, or raised a permanent error within `negative_ttl`.
+        """
+        key = self.key(query)
+        vector = self._get_local(key)
+        if vector is None:
+            vector = self._get_redis(key)
+            if vector is not None:
+                self._put_local(key, vector)
+        if vector is not None:
+            return None if vector is FAILED else vector
+
+        with self._lock:
+            self.misses += 1
+        return self._compute(key, lambda: compute(normalize_query(query)))
+
+    def get_or_compute_many(
+        self, queries: list[str], compute: Callable[[list[str]], np.ndarray]
+    ) -> list[np.ndarray | None]:
+        """
+        Batch version of `get_or_compute`: all misses are computed with a
+        single `compute(normalized_queries)` call and Redis is read once.
+        If the batch fails with a permanent error, its queries are computed
+        one by one so that only the rejected ones fail.
+        """
+        keys = [self.key(q) for q in queries]
+        vectors = [self._get_local(key) for key in keys]
+
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        for i, vector in zip(
+            missing, self._get_redis_many([keys[i] for i in missing]), strict=True
+        ):
+            if vector is not None:
+                vectors[i] = vector
+                self._put_local(keys[i], vector)
+
+        # Duplicate queries in one batch are computed once.
+        pending = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                pending.setdefault(keys[i], normalize_query(queries[i]))
+
+        computed = {}
+        if pending:
+            with self._lock:
+                self.misses += len(pending)
+            try:
+                batch = np.asarray(compute(list(pending.values())), dtype=np.float32)
+            except Exception as e:  # noqa: BLE001 - reported as None
+                if isinstance(e, self.permanent_errors) and len(pending) > 1:
+                    computed = {
+                        key: self._compute(key, lambda q=query: compute([q])[0])
+                        for key, query in pending.items()
+                    }
+                else:
+                    for key in pending:
+                        self._record_failure(key, e)
+            else:
+                batch.setflags(write=False)
+                computed = dict(zip(pending, batch, strict=True))
+                for key, vector in computed.items():
+                    self._put_local(key, vector)
+                self._put_redis_many(computed)
+
+        return [
+            None if v is FAILED else v if v is not None else computed.get(key)
+            for key, v in zip(keys, vectors, strict=True)
+        ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.local_hits + self.redis_hits + self.negative_hits
+            lookups = hits + self.misses
+            return {
+                "local_hits": self.local_hits,
+                "redis_hits": self.redis_hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "failures": self.failures,
+                "redis_errors": self.redis_errors,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "size": len(self._local),
+            }
+
+    def clear(self):
+        """Drop the in-process tier (Redis entries expire by TTL)."""
+        with self._lock:
+            self._local.clear()
+
+    def _compute(self, key, compute: Callable[[], np.ndarray]) -> np.ndarray | None:
+        """Compute and cache one vector, or record why it failed."""
+        try:
+            vector = np.asarray(compute(), dtype=np.float32)
+        except Exception as e:  # noqa: BLE001 - reported as None
+            self._record_failure(key, e)
+            return None
+        vector.setflags(write=False)
+        self._put_local(key, vector)
+        self._put_redis(key, vector)
+        return vector
+
+    def _record_failure(self, key, error: Exception):
+        with self._lock:
+            self.failures += 1
+        if isinstance(error, self.permanent_errors):
+            logger.warning(
+                f"Query embedding rejected, caching the failure for "
+                f"{self.negative_ttl}s: {error}"
+            )
+            self._put_local(key, FAILED)
+            self._put_redis(key, FAILED)
+        else:
+            logger.error(
+                f"Query embedding failed, not caching the result: {error}",
+                exc_info=error,
+            )
+
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            if isinstance(entry, float):
+                if entry <= time.time():
+                    del self._local[key]
+                    return None
+                self.negative_hits += 1
+                entry = FAILED
+            else:
+                self.local_hits += 1
+            self._local.move_to_end(key)
+            return entry
+
+    def _put_local(self, key, vector):
+        """Store a vector, or FAILED as its expiry time."""
+        if vector is FAILED:
+            vector = time.time() + self.negative_ttl
+        with self._lock:
+            self._local[key] = vector
+            self._local.move_to_end(key)
+            while len(self._local) > self.maxsize:
+                self._local.popitem(last=False)
+
+    def _get_redis(self, key):
+        return self._get_redis_many([key])[0]
+
+    def _get_redis_many(self, keys):
+        if self.redis is None or not keys:
+            return [None] * len(keys)
+        try:
+            values = self.redis.mget(keys)
+        except Exception as e:  # noqa: BLE001
+            # Redis being down must not fail the query, it is only a cache.
+            logger.warning(f"Query embedding cache read failed: {e}")
+            with self._lock:
+                self.redis_errors += 1
+            return [None] * len(keys)
+        vectors = [self._decode(data) for data in values]
+        with self._lock:
+            self.redis_hits += sum(v is not None and v is not FAILED for v in vectors)
+            self.negative_hits += sum(v is FAILED for v in vectors)
+        return vectors
+
+    @staticmethod
+    def _decode(data):
+        if data is None:
+            return None
+        if not data:
+            return FAILED
+        return np.frombuffer(data, dtype=np.float32)
+
+    def _put_redis(self, key, vector):
+        self._put_redis_many({key: vector})
+
+    def _put_redis_many(self, vectors: dict):
+        if self.redis is None:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, vector in vectors.items():
+                if vector is FAILED:
+                    pipe.set(key, b"", ex=self.negative_ttl)
+                else:
+                    pipe.set(key, vector.tobytes(), ex=self.ttl)
+            pipe.execute()
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"Query embedding cache write failed: {e}")
+            with self._lock:
+                self.redis_errors += 1
@@ -3,10 +3,14 @@
 # Using KeyBERT for Simple Keyword Extraction
 # =========================================
 
-from keybert import KeyBERT
+from collections import defaultdict
 
-# Load KeyBERT model once globally for efficiency
-kw_model = KeyBERT(model="all-MiniLM-L6-v2")
+from AI import models
+from AI.config import settings
+from AI.Extraction_engine.micro_batcher import MicroBatcher
+
+# KeyBERT model, loaded once on first use (see AI/models.py)
+kw_model = models.keybert
 
 
 def extract_keywords(text: str, top_n: int = 5):
@@ -27,18 +31,74 @@ def extract_keywords(text: str, top_n: int = 5):
         - "keyword": extracted keyword or phrase
         - "score": relevance score (float)
     """
+    return extract_keywords_batch([text], top_n=top_n)[0]
+
+
+def extract_keywords_batch(texts: list[str], top_n: int = 5):
+    """
+    Extract keywords from many texts at once.
+
+    KeyBERT embeds all documents and all candidate keyphrases of the batch
+    in one pass each, which is much faster than one call per text.
+
+    Returns
+    -------
+    list of list of dict
+        One `extract_keywords` result per input text, in order.
+    """
+    if not texts:
+        return []
+
     # Generate diverse keyphrases (1–3 words)
-    keywords = kw_model.extract_keywords(
-        text,
+    keywords = kw_model.get().extract_keywords(
+        texts,
         keyphrase_ngram_range=(1, 3),
         stop_words="english",
         use_mmr=True,
         diversity=0.7,
         top_n=top_n,
     )
+    # KeyBERT unwraps the result for a single document and returns a bare
+    # [] when no text in the batch has any candidate keyphrase
+    if len(texts) == 1:
+        keywords = [keywords]
+    elif not keywords:
+        keywords = [[] for _ in texts]
 
     # Convert result to JSON-ready structure
-    return [{"keyword": kw, "score": float(score)} for kw, score in keywords]
+    return [
+        [{"keyword": kw, "score": float(score)} for kw, score in doc_keywords]
+        for doc_keywords in keywords
+    ]
+
+
+def _extract_keywords_grouped(items: list[tuple[str, int]]):
+    """`extract_keywords_batch` over (text, top_n) items, one call per top_n."""
+    by_top_n = defaultdict(list)
+    for i, (_, top_n) in enumerate(items):
+        by_top_n[top_n].append(i)
+    results = [None] * len(items)
+    for top_n, indices in by_top_n.items():
+        batch = extract_keywords_batch([items[i][0] for i in indices], top_n=top_n)
+        for i, keywords in zip(indices, batch, strict=True):
+            results[i] = keywords
+    return results
+
+
+keyword_batcher = MicroBatcher(
+    _extract_keywords_grouped,
+    max_batch_size=settings.KEYWORD_BATCH_SIZE,
+    max_wait_ms=settings.KEYWORD_BATCH_WAIT_MS,
+)
+
+
+async def aextract_keywords(text: str, top_n: int = 5):
+    """
+    Async `extract_keywords` for servers: concurrent requests are coalesced
+    into batches of up to KEYWORD_BATCH_SIZE texts, waiting at most
+    KEYWORD_BATCH_WAIT_MS, with one KeyBERT call per distinct `top_n`.
+    """
+    return await keyword_batcher.submit((text, top_n))
 
 
 # Local test
@@ -8,26 +8,57 @@ ScholarMind — Semantic Query Embedding (SPECTER)
 Features:
 - Uses SPECTER (`allenai/specter`) for stable citation-aware embeddings
 - Normalized embeddings for cosine similarity
-- Cached results for repeated queries
+- Two-tier cache (in-process LRU + Redis) for repeated queries
+- Batched encoding (`embed_queries`) and async micro-batching (`aembed_query`)
 - Safe input validation
 """
 
-from sentence_transformers import SentenceTransformer
-from functools import lru_cache
+from AI.Extraction_engine.query_embedding_cache import (
+    QueryEmbeddingCache,
+    get_redis_client,
+)
+from AI.Extraction_engine.micro_batcher import MicroBatcher
+from AI.config import settings
+from AI import models
 from typing import Optional
 import numpy as np
 
 # -----------------------------
-# Load Model Once (Global)
+# Model, Loaded Once on First Use
 # -----------------------------
-EMBEDDING_MODEL_NAME = "sentence-transformers/allenai-specter"
+EMBEDDING_MODEL_NAME = models.QUERY_EMBEDDING_MODEL_NAME
+
+embedding_model = models.specter
+
+# -----------------------------
+# Query Embedding Cache
+# -----------------------------
+# Keyed by backend too: int8 ONNX vectors differ slightly from fp32 ones
+query_cache = QueryEmbeddingCache(
+    f"{EMBEDDING_MODEL_NAME}/{settings.SENTENCE_TRANSFORMER_BACKEND}",
+    get_redis_client(),
+)
+
+
+def _encode(query: str) -> np.ndarray:
+    return embedding_model.get().encode(query, normalize_embeddings=True)
+
+
+def _encode_batch(queries: list[str]) -> np.ndarray:
+    return embedding_model.get().encode(
+        queries, batch_size=len(queries), normalize_embeddings=True
+    )
+
+
+def _clean(query) -> Optional[str]:
+    if not isinstance(query, str):
+        return None
+    return query.strip() or None
 
-embedding_model = SentenceTransformer(EMBEDDING_MODEL_NAME)
 
 # -----------------------------
 # Cached Query Embedding
 # -----------------------------
-@lru_cache(maxsize=512)
 def embed_query(query: str) -> Optional[np.ndarray]:
     """
     Convert a user query into a normalized semantic embedding.
@@ -42,21 +73,48 @@ def embed_query(query: str) -> Optional[np.ndarray]:
     np.ndarray | None
         Normalized embedding vector (768-dim),
         or None if input is invalid or encoding fails.
+        Transient failures are not cached, so the next call retries;
+        queries the model rejects are cached as failures for
+        QUERY_EMBEDDING_NEGATIVE_TTL.
     """
 
-    if not isinstance(query, str):
+    query = _clean(query)
+    if query is None:
         return None
 
-    query = query.strip()
-    if not query:
-        return None
+    return query_cache.get_or_compute(query, _encode)
 
-    try:
-        embedding = embedding_model.encode(query, normalize_embeddings=True)
-        return embedding
 
-    except Exception:
-        return None
+# -----------------------------
+# Batched Query Embedding
+# -----------------------------
+def embed_queries(queries: list[str]) -> list[Optional[np.ndarray]]:
+    """
+    Embed many queries with one forward pass over the cache misses.
+
+    Returns one entry per input, in order: the normalized embedding, or
+    None for invalid inputs and when encoding fails.
+    """
+    cleaned = [_clean(q) for q in queries]
+    valid = [q for q in cleaned if q is not None]
+    vectors = iter(query_cache.get_or_compute_many(valid, _encode_batch))
+    return [None if q is None else next(vectors) for q in cleaned]
+
+
+query_batcher = MicroBatcher(
+    embed_queries,
+    max_batch_size=settings.QUERY_BATCH_SIZE,
+    max_wait_ms=settings.QUERY_BATCH_WAIT_MS,
+)
+
+
+async def aembed_query(query: str) -> Optional[np.ndarray]:
+    """
+    Async `embed_query` for servers: concurrent calls are coalesced into
+    batches of up to QUERY_BATCH_SIZE queries, waiting at most
+    QUERY_BATCH_WAIT_MS for a batch to fill.
+    """
+    return await query_batcher.submit(query)
 
 
 # -----------------------------
@@ -69,5 +127,7 @@ if __name__ == "__main__":
     if vec is not None:
         print("Embedding OK")
         print("Vector shape:", vec.shape)
+        embed_query(q)
+        print("Cache:", query_cache.stats())
     else:
         print("Embedding failed")
@@ -0,0 +1,148 @@
+"""
+Bulk topic summarization (e.g. every topic of a course syllabus).
+
+Topics are deduplicated (same normalized topic and context), served from
+the response cache when possible, and the rest run through `abatch` with a
+concurrency cap and a tokens-per-minute budget. A failing topic does not
+fail the batch: its result carries the error instead of a summary. Every
+result records its latency and token usage.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+
+from langchain_core.runnables import RunnableLambda
+
+from AI.config import settings
+from AI.prompts.summarizer_prompt import system_prompt, user_prompt
+from AI.Summarizer import topic_summarizer
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBudget:
+    """
+    Sliding-window tokens-per-minute limiter shared by concurrent calls.
+
+    `acquire` reserves an estimate before a call and waits while the
+    window is full; `settle` replaces the estimate with the real usage.
+    """
+
+    def __init__(self, tokens_per_minute: int, window: float = 60.0):
+        self.tokens_per_minute = tokens_per_minute
+        self.window = window
+        self._spent = deque()  # [timestamp, tokens]
+        self._lock = asyncio.Lock()
+
+    def used(self) -> int:
+        cutoff = time.monotonic() - self.window
+        while self._spent and self._spent[0][0] <= cutoff:
+            self._spent.popleft()
+        return sum(tokens for _, tokens in self._spent)
+
+    async def acquire(self, tokens: int) -> list:
+        async with self._lock:
+            # A single request larger than the budget runs on an empty window.
+            while self._spent and self.used() + tokens > self.tokens_per_minute:
+                await asyncio.sleep(self._spent[0][0] + self.window - time.monotonic())
+            reservation = [time.monotonic(), tokens]
+            self._spent.append(reservation)
+            return reservation
+
+    def settle(self, reservation: list, tokens: int):
+        reservation[1] = tokens
+
+
+def estimate_tokens(sci_topic: str, context: str) -> int:
+    """Rough prompt size (~4 characters per token) plus the expected output."""
+    prompt_chars = (
+        len(system_prompt.prompt_text)
+        + len(user_prompt.prompt_text)
+        + len(sci_topic)
+        + len(context)
+    )
+    return prompt_chars // 4 + settings.SUMMARY_OUTPUT_TOKEN_ESTIMATE
+
+
+async def asummarize_topics(
+    topics: list[str],
+    context: str = "None",
+    max_concurrency: int = settings.SUMMARY_BULK_CONCURRENCY,
+    tokens_per_minute: int = settings.SUMMARY_TOKENS_PER_MINUTE,
+) -> list[dict]:
+    """
+    Summarize many topics concurrently.
+
+    Returns one dict per input topic, in order, with "topic", "summary"
+    (None on failure), "error", "cached", "latency_s" and "tokens".
+    Duplicate topics share one result.
+    """
+    cache = topic_summarizer.response_cache
+    budget = TokenBudget(tokens_per_minute)
+
+    unique = {}
+    for topic in topics:
+        unique.setdefault(cache.key(topic, context), topic)
+    # Semantic lookups embed the topic, so they run on worker threads.
+    start = time.perf_counter()
+    cached = await asyncio.gather(
+        *(cache.aget(topic, context) for topic in unique.values())
+    )
+    results = {}
+    pending = {}
+    for (key, topic), summary in zip(unique.items(), cached, strict=True):
+        if summary is not None:
+            results[key] = _result(topic, summary, None, True, start, 0)
+        else:
+            pending[key] = topic
+
+    async def summarize(sci_topic: str) -> dict:
+        estimate = estimate_tokens(sci_topic, context)
+        reservation = await budget.acquire(estimate)
+        start = time.perf_counter()
+        try:
+            response = await topic_summarizer.get_chain().ainvoke(
+                {"sci_topic": sci_topic, "context": context}
+            )
+        except Exception as e:  # noqa: BLE001 - reported in the topic's result
+            # A failed call may still have used tokens, so the estimate stays.
+            logger.warning(f"Summary of '{sci_topic}' failed: {e}")
+            return _result(sci_topic, None, str(e), False, start, 0)
+        tokens = topic_summarizer.total_tokens(response) or estimate
+        budget.settle(reservation, tokens)
+        summary = topic_summarizer.text_of(response.content)
+        await cache.aput(sci_topic, context, summary, tokens=tokens)
+        return _result(sci_topic, summary, None, False, start, tokens)
+
+    # Not chain.abatch: each call reserves and settles its own token budget
+    # and latency, and a chat model's abatch is one ainvoke per input anyway.
+    outputs = await RunnableLambda(summarize).abatch(
+        list(pending.values()),
+        config={"max_concurrency": max_concurrency},
+        return_exceptions=True,
+    )
+    for (key, topic), output in zip(pending.items(), outputs, strict=True):
+        if isinstance(output, Exception):
+            results[key] = _result(topic, None, str(output), False, None, 0)
+        else:
+            results[key] = output
+
+    return [{**results[cache.key(topic, context)], "topic": topic} for topic in topics]
+
+
+def summarize_topics(topics: list[str], context: str = "None", **kwargs):
+    """Synchronous `asummarize_topics`, for scripts and notebooks."""
+    return asyncio.run(asummarize_topics(topics, context, **kwargs))
+
+
+def _result(topic, summary, error, cached, start, tokens) -> dict:
+    return {
+        "topic": topic,
+        "summary": summary,
+        "error": error,
+        "cached": cached,
+        "latency_s": time.perf_counter() - start if start is not None else None,
+        "tokens": tokens,
+    }
@@ -0,0 +1,169 @@
+"""
+Response cache for topic summaries.
+
+Two tiers, both in process:
+- exact: keyed by the normalized topic plus a hash of the context
+- semantic (optional): a topic whose embedding is within a cosine
+  threshold of a cached topic with the same context reuses its summary
+
+Entries expire after `ttl` seconds and the least recently used ones are
+evicted beyond `maxsize`. Hits, misses and the tokens the hits saved are
+counted for monitoring. The semantic tier embeds topics, so async
+callers use `aget`/`aput`, which run it on a worker thread.
+"""
+
+import asyncio
+import hashlib
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+
+def normalize_topic(topic: str) -> str:
+    """Case-, unicode- and whitespace-insensitive form of a topic."""
+    return " ".join(unicodedata.normalize("NFKC", topic).casefold().split())
+
+
+def context_hash(context: str) -> str:
+    return hashlib.sha256(context.encode()).hexdigest()
+
+
+@dataclass
+class CachedSummary:
+    text: str
+    tokens: int
+    expires_at: float
+    context_hash: str
+    embedding: np.ndarray | None = None
+
+
+class SummaryCache:
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 24 * 3600,
+        semantic_threshold: float | None = None,
+        embed: Callable[[str], np.ndarray] | None = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.semantic_threshold = semantic_threshold
+        self._embed = lru_cache(maxsize=256)(embed) if embed else None
+        self._entries: OrderedDict[str, CachedSummary] = OrderedDict()
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.saved_tokens = 0
+
+    @property
+    def semantic(self) -> bool:
+        return self._embed is not None and self.semantic_threshold is not None
+
+    def key(self, topic: str, context: str) -> str:
+        return hashlib.sha256(
+            f"{normalize_topic(topic)}\0{context_hash(context)}".encode()
+        ).hexdigest()
+
+    def get(self, topic: str, context: str = "None") -> str | None:
+        key = self.key(topic, context)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                self.saved_tokens += entry.tokens
+                return entry.text
+
+        if self.semantic:
+            match = self._nearest(topic, context_hash(context), now)
+            if match is not None:
+                match_key, entry = match
+                with self._lock:
+                    if match_key in self._entries:
+                        self._entries.move_to_end(match_key)
+                    self.semantic_hits += 1
+                    self.saved_tokens += entry.tokens
+                return entry.text
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, topic: str, context: str, text: str, tokens: int = 0):
+        embedding = self._embedding(topic) if self.semantic else None
+        entry = CachedSummary(
+            text, tokens, time.time() + self.ttl, context_hash(context), embedding
+        )
+        key = self.key(topic, context)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    async def aget(self, topic: str, context: str = "None") -> str | None:
+        """`get` that keeps the event loop free while the topic is embedded."""
+        if not self.semantic:
+            return self.get(topic, context)
+        return await asyncio.to_thread(self.get, topic, context)
+
+    async def aput(self, topic: str, context: str, text: str, tokens: int = 0):
+        """`put` that keeps the event loop free while the topic is embedded."""
+        if not self.semantic:
+            return self.put(topic, context, text, tokens)
+        return await asyncio.to_thread(self.put, topic, context, text, tokens)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.exact_hits + self.semantic_hits
+            lookups = hits + self.misses
+            return {
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "saved_tokens": self.saved_tokens,
+                "size": len(self._entries),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _embedding(self, topic: str) -> np.ndarray:
+        vector = np.asarray(self._embed(normalize_topic(topic)), dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def _nearest(self, topic: str, ctx_hash: str, now: float):
+        """
+        (key, entry) of the most similar live entry with the same context,
+        if close enough.
+        """
+        with self._lock:
+            candidates = [
+                (key, e)
+                for key, e in self._entries.items()
+                if e.context_hash == ctx_hash
+                and e.embedding is not None
+                and e.expires_at > now
+            ]
+        if not candidates:
+            return None
+        similarities = np.stack([e.embedding for _, e in candidates]) @ self._embedding(
+            topic
+        )
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.semantic_threshold:
+            return candidates[best]
+        return None
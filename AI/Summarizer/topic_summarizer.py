@@ -1,27 +1,77 @@
 from AI.config import settings
-from dotenv import dotenv_values
-from prompts.summarizer_prompt import system_prompt, user_prompt
-from langchain_google_genai import ChatGoogleGenerativeAI
+from AI import models
+from AI.Summarizer.response_cache import SummaryCache
+from AI.prompts.summarizer_prompt import system_prompt, user_prompt
 from langchain_core.prompts import ChatPromptTemplate
 
 model = settings.SUMMARIZER_MODEL
-env_values = dotenv_values("./app.env")
-api_key = env_values["GOOGLE_API_KEY"]
-llm = ChatGoogleGenerativeAI(
-    model=settings.SUMMARIZER_MODEL,
-    google_api_key=api_key,
-    temperature=0.7,
-)
 chat_prompt = ChatPromptTemplate.from_messages(
     [("system", system_prompt.prompt_text), ("user", user_prompt.prompt_text)]
 )
 
-chain = chat_prompt | llm
+response_cache = SummaryCache(
+    maxsize=settings.SUMMARY_CACHE_SIZE,
+    ttl=settings.SUMMARY_CACHE_TTL,
+    semantic_threshold=settings.SUMMARY_CACHE_SEMANTIC_THRESHOLD,
+    embed=lambda topic: models.specter.get().encode(topic, normalize_embeddings=True),
+)
+
+
+def get_chain():
+    # The Gemini client is built (and app.env read) on first use
+    return chat_prompt | models.summarizer_llm.get()
+
+
+def text_of(content) -> str:
+    """Text of a message's content, which is a str or a list of blocks."""
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block if isinstance(block, str) else block.get("text", "")
+        for block in content
+        if isinstance(block, str) or block.get("type") == "text"
+    )
+
+
+def total_tokens(response) -> int:
+    usage = getattr(response, "usage_metadata", None) or {}
+    return usage.get("total_tokens", 0)
 
 
 def summarize_sci_topic(sci_topic, context: str = "None"):
-    response = chain.invoke({"sci_topic": sci_topic, "context": context})
-    return response.content[0]["text"]
+    cached = response_cache.get(sci_topic, context)
+    if cached is not None:
+        return cached
+    response = get_chain().invoke({"sci_topic": sci_topic, "context": context})
+    summary = text_of(response.content)
+    response_cache.put(sci_topic, context, summary, tokens=total_tokens(response))
+    return summary
+
+
+async def astream_summary(sci_topic, context: str = "None"):
+    """
+    Async `summarize_sci_topic` that yields the summary as it is generated.
+
+    Closing the generator early (e.g. the client disconnected) stops the
+    model call; only complete summaries are cached.
+    """
+    cached = await response_cache.aget(sci_topic, context)
+    if cached is not None:
+        yield cached
+        return
+
+    full = None
+    async for chunk in get_chain().astream(
+        {"sci_topic": sci_topic, "context": context}
+    ):
+        full = chunk if full is None else full + chunk
+        text = text_of(chunk.content)
+        if text:
+            yield text
+    if full is not None:
+        await response_cache.aput(
+            sci_topic, context, text_of(full.content), tokens=total_tokens(full)
+        )
 
 
 # print(summarize_sci_topic(sci_topic="Deep Learning"))
@@ -0,0 +1,110 @@
+"""
+Benchmark: one-request-per-chunk embedding vs BatchedEmbeddings.
+
+Starts a local stub embedding server that charges a fixed latency per
+request plus a small cost per text, and answers 429 when more requests are
+in flight than its concurrency limit, so no API key or network is needed.
+
+Run from the repository root:
+    PYTHONPATH=. python AI/benchmarks/bench_batch_embedding.py
+"""
+
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from langchain_core.embeddings import Embeddings
+
+from AI.similarity_search_pipeline.batch_embedding import BatchedEmbeddings
+
+DIM = 1024
+REQUEST_LATENCY = 0.05  # seconds per request
+TEXT_LATENCY = 0.0005  # seconds per text in a request
+SERVER_CONCURRENCY = 6  # requests beyond this get a 429
+N_CHUNKS = 2000
+
+
+class StubEmbeddingHandler(BaseHTTPRequestHandler):
+    in_flight = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        texts = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.lock:
+            StubEmbeddingHandler.in_flight += 1
+            overloaded = StubEmbeddingHandler.in_flight > SERVER_CONCURRENCY
+        try:
+            if overloaded:
+                self.send_response(429)
+                self.end_headers()
+                return
+            time.sleep(REQUEST_LATENCY + TEXT_LATENCY * len(texts))
+            body = json.dumps([[random.random()] * DIM for _ in texts]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with self.lock:
+                StubEmbeddingHandler.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+class StubHTTPError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class StubEmbeddings(Embeddings):
+    def __init__(self, url):
+        self.url = url
+        self.requests = 0
+
+    def embed_documents(self, texts):
+        self.requests += 1
+        request = urllib.request.Request(self.url, data=json.dumps(texts).encode())
+        try:
+            with urllib.request.urlopen(request) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            raise StubHTTPError(e.code) from e
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def run(name, embed, texts):
+    start = time.perf_counter()
+    vectors = embed(texts)
+    elapsed = time.perf_counter() - start
+    assert len(vectors) == len(texts)
+    print(f"{name:<32} {elapsed:7.2f}s {len(texts) / elapsed:9.1f} chunks/s")
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubEmbeddingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/embed"
+    texts = [f"chunk {i} " + "lorem ipsum " * 25 for i in range(N_CHUNKS)]
+
+    stub = StubEmbeddings(url)
+    run(
+        "one request per chunk",
+        lambda t: [stub.embed_documents([x])[0] for x in t],
+        texts[:200],
+    )
+    for concurrency in (1, 2, 4, 8, 16):
+        stub = StubEmbeddings(url)
+        batched = BatchedEmbeddings(
+            stub, max_concurrency=concurrency, backoff=0.05, max_retries=10
+        )
+        run(f"batched, concurrency={concurrency}", batched.embed_documents, texts)
+        print(f"{'':<32} {stub.requests} requests")
+    server.shutdown()
@@ -0,0 +1,45 @@
+"""
+Benchmark: docling documents per minute by converter pool size.
+
+Parses every PDF in a directory with a ConverterPool of each size, using as
+many threads as converters so they work in parallel. Model loading happens
+in warmup and is reported separately from parse throughput.
+
+Run from the repository root:
+    PYTHONPATH=. python AI/benchmarks/bench_converter_pool.py <pdf_dir> [sizes]
+
+e.g. `... bench_converter_pool.py data/papers 1,2,4`
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from AI.similarity_search_pipeline.pdf_parser import ConverterPool, host_cpu_count
+
+
+def bench(pool_size: int, pdfs: list[str]):
+    pool = ConverterPool(size=pool_size)
+    start = time.perf_counter()
+    pool.warmup()
+    warmup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=pool_size) as executor:
+        list(executor.map(pool.convert, pdfs))
+    elapsed = time.perf_counter() - start
+    print(
+        f"pool={pool_size:<3} threads/converter={pool.num_threads:<3} "
+        f"warmup={warmup:6.1f}s  {len(pdfs) / elapsed * 60:7.1f} docs/min"
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    pdfs = sorted(str(p) for p in Path(sys.argv[1]).glob("*.pdf"))
+    sizes = [int(s) for s in sys.argv[2].split(",")] if len(sys.argv) > 2 else [1, 2, 4]
+    print(f"{len(pdfs)} PDFs, {host_cpu_count()} CPUs")
+    for size in sizes:
+        bench(size, pdfs)
@@ -0,0 +1,100 @@
+"""
+Benchmark: recall@k and query latency of the approximate FAISS index types
+against the exact flat index.
+
+Vectors are drawn from a gaussian mixture so the data has cluster structure
+like real embeddings. Every index is built with `build_index` from the
+vector DB (trained on a sample) and searched one query at a time to report
+p50/p99 latency.
+
+Run from the repository root:
+    PYTHONPATH=. python AI/benchmarks/bench_index.py [sizes] [dim]
+
+e.g. `... bench_index.py 100000,1000000,5000000 384`. 5M vectors at 384
+dimensions need ~8GB of RAM for the data plus the indexes.
+"""
+
+import sys
+import time
+
+import faiss
+import numpy as np
+
+from AI.similarity_search_pipeline.vector_db import build_index, tune_index
+
+K = 10
+N_QUERIES = 1000
+INDEXES = [
+    ("flat", {}),
+    ("ivf_flat", {"nprobe": 16}),
+    ("ivf_flat", {"nprobe": 64}),
+    ("ivf_pq", {"nprobe": 16}),
+    ("ivf_pq", {"nprobe": 64}),
+    ("hnsw", {"ef_search": 32}),
+    ("hnsw", {"ef_search": 128}),
+]
+
+
+def make_vectors(n: int, centers: np.ndarray, rng):
+    n_clusters, dim = centers.shape
+    vectors = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, 100_000):
+        stop = min(start + 100_000, n)
+        labels = rng.integers(n_clusters, size=stop - start)
+        noise = rng.standard_normal((stop - start, dim), dtype=np.float32)
+        vectors[start:stop] = centers[labels] + 0.5 * noise
+    return vectors
+
+
+def search_latencies(index, queries):
+    # Per-query latency on one thread, not batch throughput.
+    threads = faiss.omp_get_max_threads()
+    faiss.omp_set_num_threads(1)
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        _, ids = index.search(query[None, :], K)
+        latencies.append(time.perf_counter() - start)
+        results.append(ids[0])
+    faiss.omp_set_num_threads(threads)
+    return np.array(latencies) * 1000, np.array(results)
+
+
+def recall_at_k(results, ground_truth):
+    hits = sum(len(set(r) & set(g)) for r, g in zip(results, ground_truth, strict=True))
+    return hits / ground_truth.size
+
+
+if __name__ == "__main__":
+    sizes = [100_000, 1_000_000, 5_000_000]
+    if len(sys.argv) > 1:
+        sizes = [int(s) for s in sys.argv[1].split(",")]
+    dim = int(sys.argv[2]) if len(sys.argv) > 2 else 384
+    rng = np.random.default_rng(0)
+
+    for n in sizes:
+        centers = rng.standard_normal((1000, dim), dtype=np.float32)
+        vectors = make_vectors(n, centers, rng)
+        queries = make_vectors(N_QUERIES, centers, rng)
+        exact = faiss.IndexFlatL2(dim)
+        exact.add(vectors)
+        _, ground_truth = exact.search(queries, K)
+
+        print(f"\n{n:,} vectors, dim={dim}, recall@{K}")
+        print(f"{'index':<28}{'build s':>9}{'recall':>9}{'p50 ms':>9}{'p99 ms':>9}")
+        built = {}
+        for index_type, params in INDEXES:
+            build_time = 0.0
+            if index_type not in built:
+                start = time.perf_counter()
+                index = build_index(dim, vectors, index_type, min_train_size=0)
+                index.add(vectors)
+                build_time = time.perf_counter() - start
+                built[index_type] = index
+            index = tune_index(built[index_type], **params)
+            latencies, results = search_latencies(index, queries)
+            name = index_type + "".join(f" {k}={v}" for k, v in params.items())
+            recall = recall_at_k(results, ground_truth)
+            p50, p99 = np.percentile(latencies, [50, 99])
+            print(f"{name:<28}{build_time:>9.1f}{recall:>9.3f}{p50:>9.3f}{p99:>9.3f}")
+        del built, exact, vectors
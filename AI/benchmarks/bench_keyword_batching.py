@@ -0,0 +1,67 @@
+"""
+Benchmark: KeyBERT keyword extraction throughput (texts/s) by batch size.
+
+Batch size 1 is the old one-text-per-call `extract_keywords`; larger sizes
+call `extract_keywords_batch`, which embeds the documents and candidate
+keyphrases of the whole batch together. Runs on CPU.
+
+Run from the repository root:
+    PYTHONPATH=. python AI/benchmarks/bench_keyword_batching.py [sizes]
+
+e.g. `... bench_keyword_batching.py 1,8,32,64`
+"""
+
+import importlib.util
+import os
+import random
+import sys
+import time
+
+os.environ["CUDA_VISIBLE_DEVICES"] = ""  # CPU numbers, even on a GPU host
+N_TEXTS = 256
+TOPICS = [
+    "neural network transformer attention",
+    "protein folding genome sequencing",
+    "graph convolution",
+    "reinforcement learning policy gradient",
+    "diffusion model",
+    "quantum error correction",
+    "climate simulation",
+    "causal inference",
+    "bayesian optimization",
+    "language model",
+    "retrieval augmented generation",
+    "benchmark",
+]
+VOCABULARY = [word for topic in TOPICS for word in topic.split()]
+
+
+def load_extractor():
+    # The module name has dots in it, so it cannot be imported normally.
+    spec = importlib.util.spec_from_file_location(
+        "keyword_extractor", "AI/Extraction_engine/v1.keyword_extractor.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_texts(n: int, rng):
+    return [" ".join(rng.choices(VOCABULARY, k=120)) for _ in range(n)]
+
+
+if __name__ == "__main__":
+    sizes = [1, 8, 32, 64]
+    if len(sys.argv) > 1:
+        sizes = [int(s) for s in sys.argv[1].split(",")]
+    extractor = load_extractor()
+    texts = make_texts(N_TEXTS, random.Random(0))
+    extractor.extract_keywords_batch(texts[:4])  # warmup
+
+    print(f"{N_TEXTS} texts of ~120 words")
+    for size in sizes:
+        start = time.perf_counter()
+        for i in range(0, N_TEXTS, size):
+            extractor.extract_keywords_batch(texts[i : i + size])
+        elapsed = time.perf_counter() - start
+        print(f"batch size {size:<4} {N_TEXTS / elapsed:8.1f} texts/s")
@@ -0,0 +1,93 @@
+"""
+Benchmark: query embedding throughput, one encode call per query vs the
+async MicroBatcher coalescing concurrent queries.
+
+Simulates `clients` concurrent callers each embedding queries back to back.
+In single-query mode every call runs `model.encode(query)` on a thread
+pool, the way an async server would without batching; in batched mode the
+calls go through a MicroBatcher. The cache is bypassed so every query is
+encoded.
+
+Run from the repository root:
+    PYTHONPATH=. python AI/benchmarks/bench_micro_batching.py [model] [clients]
+
+e.g. `... bench_micro_batching.py sentence-transformers/allenai-specter 64`
+"""
+
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from AI.Extraction_engine.micro_batcher import MicroBatcher
+
+N_QUERIES = 2000
+THREADS = 4  # executor threads in single-query mode
+
+
+async def run_clients(embed, queries, clients):
+    latencies = []
+
+    async def client(mine):
+        for query in mine:
+            start = time.perf_counter()
+            await embed(query)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(queries[i::clients]) for i in range(clients)))
+    return time.perf_counter() - start, np.array(latencies) * 1000
+
+
+def report(name, elapsed, latencies):
+    print(
+        f"{name:<36}{len(latencies) / elapsed:9.1f} q/s"
+        f"{np.percentile(latencies, 50):9.1f}{np.percentile(latencies, 99):9.1f}"
+    )
+
+
+async def main(model, clients):
+    queries = [
+        f"query {i} on protein folding with deep learning" for i in range(N_QUERIES)
+    ]
+    print(f"{N_QUERIES} queries, {clients} concurrent clients")
+    print(f"{'mode':<36}{'':>13}{'p50 ms':>9}{'p99 ms':>9}")
+
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+
+        async def single(query):
+            return await loop.run_in_executor(
+                executor, lambda: model.encode(query, normalize_embeddings=True)
+            )
+
+        report(
+            f"single query, {THREADS} threads",
+            *await run_clients(single, queries, clients),
+        )
+
+    for max_batch_size, max_wait_ms in ((8, 5), (32, 5), (32, 10), (64, 10)):
+        batcher = MicroBatcher(
+            lambda batch: model.encode(
+                batch, batch_size=len(batch), normalize_embeddings=True
+            ),
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+        )
+        elapsed, latencies = await run_clients(batcher.submit, queries, clients)
+        report(
+            f"batched, max={max_batch_size} wait={max_wait_ms}ms", elapsed, latencies
+        )
+        print(f"{'':<36}mean batch {batcher.mean_batch_size:.1f}")
+        await batcher.close()
+
+
+if __name__ == "__main__":
+    name = sys.argv[1] if len(sys.argv) > 1 else "sentence-transformers/allenai-specter"
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    model = SentenceTransformer(name, device="cpu")
+    model.encode(["warmup"])
+    asyncio.run(main(model, clients))
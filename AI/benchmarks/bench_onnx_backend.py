@@ -0,0 +1,77 @@
+"""
+Benchmark: CPU latency of the sentence-transformer backends (fp32 PyTorch,
+fp32 ONNX Runtime, int8 ONNX Runtime) for the Extraction_engine models.
+
+Reports single-query p50/p99 latency (the query embedding path) and
+throughput for batches of 32 (the keyword/batched path), plus the mean
+cosine similarity of each backend's embeddings to fp32 PyTorch.
+
+Run from the repository root:
+    PYTHONPATH=. python AI/benchmarks/bench_onnx_backend.py [models]
+
+e.g. `... bench_onnx_backend.py all-MiniLM-L6-v2,sentence-transformers/allenai-specter`
+The int8 model is exported and quantized into ONNX_MODEL_DIR on first run.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+from AI.models import (
+    KEYWORD_MODEL_NAME,
+    QUERY_EMBEDDING_MODEL_NAME,
+    SENTENCE_TRANSFORMER_BACKENDS,
+    load_sentence_transformer,
+)
+
+os.environ["CUDA_VISIBLE_DEVICES"] = ""  # CPU numbers, even on a GPU host
+N_QUERIES = 200
+BATCH_SIZE = 32
+N_BATCHES = 10
+
+
+def make_texts(n: int):
+    topics = ["protein folding", "graph neural networks", "dark matter", "CRISPR"]
+    return [f"recent advances in {topics[i % len(topics)]} ({i})" for i in range(n)]
+
+
+def bench(model, texts):
+    model.encode(texts[:BATCH_SIZE])  # warmup
+    latencies = []
+    for text in texts[:N_QUERIES]:
+        start = time.perf_counter()
+        model.encode(text, normalize_embeddings=True)
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1000
+
+    start = time.perf_counter()
+    for i in range(N_BATCHES):
+        batch = texts[i * BATCH_SIZE : (i + 1) * BATCH_SIZE]
+        model.encode(batch, batch_size=BATCH_SIZE, normalize_embeddings=True)
+    throughput = N_BATCHES * BATCH_SIZE / (time.perf_counter() - start)
+    return latencies, throughput
+
+
+if __name__ == "__main__":
+    names = [KEYWORD_MODEL_NAME, QUERY_EMBEDDING_MODEL_NAME]
+    if len(sys.argv) > 1:
+        names = sys.argv[1].split(",")
+    texts = make_texts(max(N_QUERIES, BATCH_SIZE * N_BATCHES))
+
+    for name in names:
+        print(f"\n{name}")
+        print(f"{'backend':<12}{'p50 ms':>9}{'p99 ms':>9}{'texts/s':>10}{'cosine':>9}")
+        reference = None
+        for backend in SENTENCE_TRANSFORMER_BACKENDS:
+            model = load_sentence_transformer(name, backend=backend)
+            latencies, throughput = bench(model, texts)
+            vectors = model.encode(texts[:BATCH_SIZE], normalize_embeddings=True)
+            if reference is None:
+                reference = vectors
+            cosine = np.sum(reference * vectors, axis=1).mean()
+            print(
+                f"{backend:<12}{np.percentile(latencies, 50):>9.2f}"
+                f"{np.percentile(latencies, 99):>9.2f}{throughput:>10.1f}{cosine:>9.4f}"
+            )
@@ -1,15 +1,65 @@
 from pathlib import Path
+import os
+
+# Data paths are relative to the AI directory, not the working directory.
+AI_DIR = Path(__file__).resolve().parent
 
 
 class Settings:
     CHUNK_SIZE: int = 300
     CHUNK_OVERLAP: int = 50
     EMBEDDING_MODEL: str = "cohere"
+    EMBEDDING_CACHE_PATH: Path | None = AI_DIR / "data/embedding_cache"
+    EMBEDDING_CACHE_SIZE: int = 100_000  # cached chunk vectors
+    EMBEDDING_BATCH_SIZE: int = 96  # Cohere accepts at most 96 texts per call
+    EMBEDDING_BATCH_MAX_CHARS: int = 100_000
+    EMBEDDING_CONCURRENCY: int = 4
+    EMBEDDING_MAX_RETRIES: int = 5
+    KEYPHRASE_CACHE_SIZE: int = 200_000  # cached keyphrase candidate vectors
+    KEYPHRASE_MAX_CANDIDATES: int = 150  # most frequent n-grams embedded per document
     VECTOR_DB: str = "chroma"
     COLLECTION_NAME: str = "documents"
-    VECTOR_DB_PATH = Path("data/vector_db.faiss")
+    VECTOR_DB_PATH = AI_DIR / "data/vector_db.faiss"
+    VECTOR_DB_MAX_SEGMENTS: int = 8  # compact once the index has more segments
+    VECTOR_DB_LAZY_LOAD: bool = False  # mmap the index, read chunks on demand
+    VECTOR_INDEX_TYPE: str = "flat"  # flat | ivf_flat | ivf_pq | hnsw
+    VECTOR_INDEX_NLIST: int = 4096  # IVF inverted lists
+    VECTOR_INDEX_PQ_M: int = 64  # IVF-PQ sub-quantizers, must divide the dimension
+    VECTOR_INDEX_HNSW_M: int = 32  # HNSW graph neighbours
+    VECTOR_INDEX_TRAIN_SIZE: int = 200_000  # IVF training sample
+    VECTOR_INDEX_MIN_TRAIN_SIZE: int = 10_000  # stay flat below this many vectors
+    VECTOR_INDEX_NPROBE: int = 32  # IVF lists searched per query
+    VECTOR_INDEX_EF_SEARCH: int = 64  # HNSW search breadth
+    INGEST_REGISTRY_PATH = AI_DIR / "data/ingested_pdfs.sqlite"
+    PDF_IMAGES_PATH = AI_DIR / "data/pdf_images"  # figures of PDFs parsed with images
     K_BEST_RESULT = 5
+    INGEST_WORKERS: int | None = None  # defaults to os.cpu_count()
+    INGEST_BATCH_SIZE: int = 16  # PDFs embedded and indexed together
+    STREAM_BATCH_SIZE: int = 256  # chunks embedded per batch when streaming
+    STREAM_QUEUE_SIZE: int = 2  # parsed batches buffered ahead of embedding
+    DOCLING_POOL_SIZE: int = 1  # docling converters per process
+    DOCLING_THREADS: int | None = None  # per converter, defaults to a share of the CPUs
     SUMMARIZER_MODEL = "gemini-3-flash-preview"
+    SUMMARY_CACHE_SIZE: int = 1024  # cached topic summaries per process
+    SUMMARY_CACHE_TTL: int = 24 * 3600  # seconds
+    # Reuse a summary for a topic this close (cosine, SPECTER); None = exact only
+    SUMMARY_CACHE_SEMANTIC_THRESHOLD: float | None = None
+    SUMMARY_BULK_CONCURRENCY: int = 8  # parallel Gemini calls in bulk summaries
+    SUMMARY_TOKENS_PER_MINUTE: int = 1_000_000  # keep under the API quota
+    SUMMARY_OUTPUT_TOKEN_ESTIMATE: int = 2000  # budgeted per summary up front
+    REDIS_URL: str | None = os.getenv("REDIS_URL")  # shared caches, off if unset
+    QUERY_EMBEDDING_CACHE_SIZE: int = 512  # query vectors kept per process
+    QUERY_EMBEDDING_CACHE_TTL: int = 7 * 24 * 3600  # seconds, in Redis
+    QUERY_EMBEDDING_NEGATIVE_TTL: int = 300  # seconds a rejected query stays cached
+    QUERY_BATCH_SIZE: int = 32  # queries encoded together by aembed_query
+    QUERY_BATCH_WAIT_MS: float = 5.0  # max wait for a query batch to fill
+    KEYWORD_BATCH_SIZE: int = 32  # texts per KeyBERT call in aextract_keywords
+    KEYWORD_BATCH_WAIT_MS: float = 10.0  # max wait for a keyword batch to fill
+    # Inference backend of the Extraction_engine sentence transformers:
+    # torch | onnx | onnx_int8 (needs `sentence-transformers[onnx]`)
+    SENTENCE_TRANSFORMER_BACKEND: str = "torch"
+    ONNX_QUANTIZATION: str = "avx2"  # arm64 | avx2 | avx512 | avx512_vnni
+    ONNX_MODEL_DIR = AI_DIR / "data/onnx_models"  # exported + quantized models
 
     class Config:
         env_file = "app.env"
@@ -0,0 +1,156 @@
+"""
+Lazily loaded model handles shared by the AI modules.
+
+Importing this module (or any module using it) loads nothing. Each model is
+built on the first `.get()`, once, even when several threads ask for it at
+the same time. `warmup()` loads models up front (e.g. from a server's
+startup hook) and `model_status()` reports what is resident and how long
+each model took to load.
+"""
+
+import logging
+import threading
+import time
+from pathlib import Path
+
+from dotenv import dotenv_values
+
+from AI.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEYWORD_MODEL_NAME = "all-MiniLM-L6-v2"
+QUERY_EMBEDDING_MODEL_NAME = "sentence-transformers/allenai-specter"
+
+
+class LazyModel:
+    def __init__(self, name: str, loader):
+        self.name = name
+        self.loader = loader
+        self.load_seconds = None
+        self.loaded_at = None
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def get(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    logger.info(f"Loading model '{self.name}'")
+                    start = time.perf_counter()
+                    model = self.loader()
+                    self.load_seconds = time.perf_counter() - start
+                    self.loaded_at = time.time()
+                    self._model = model
+                    logger.info(f"Loaded '{self.name}' in {self.load_seconds:.1f}s")
+        return self._model
+
+    def status(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "load_seconds": self.load_seconds,
+            "loaded_at": self.loaded_at,
+        }
+
+
+registry: dict[str, LazyModel] = {}
+
+
+def register(name: str, loader) -> LazyModel:
+    registry[name] = LazyModel(name, loader)
+    return registry[name]
+
+
+def warmup(names: list[str] | None = None):
+    """Load the named models (all registered ones by default)."""
+    for name in names if names is not None else list(registry):
+        registry[name].get()
+
+
+def model_status() -> dict[str, dict]:
+    return {name: model.status() for name, model in registry.items()}
+
+
+SENTENCE_TRANSFORMER_BACKENDS = ("torch", "onnx", "onnx_int8")
+
+
+def load_sentence_transformer(
+    name: str, backend: str = settings.SENTENCE_TRANSFORMER_BACKEND
+):
+    """
+    Load a sentence-transformers model with the given inference backend:
+    `torch` (fp32 PyTorch), `onnx` (fp32 ONNX Runtime) or `onnx_int8`
+    (ONNX Runtime with dynamically int8-quantized weights, for CPU nodes).
+    """
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(name)
+    if backend == "onnx":
+        return SentenceTransformer(name, backend="onnx")
+    if backend == "onnx_int8":
+        return _load_quantized_onnx(name)
+    raise ValueError(
+        f"Unknown sentence transformer backend '{backend}', "
+        f"expected one of {SENTENCE_TRANSFORMER_BACKENDS}"
+    )
+
+
+def _load_quantized_onnx(name: str):
+    """
+    Export `name` to ONNX and quantize it the first time, then load the
+    quantized copy from ONNX_MODEL_DIR.
+    """
+    from sentence_transformers import (
+        SentenceTransformer,
+        export_dynamic_quantized_onnx_model,
+    )
+
+    config = settings.ONNX_QUANTIZATION
+    model_dir = Path(settings.ONNX_MODEL_DIR) / name.replace("/", "__")
+    file_name = f"onnx/model_qint8_{config}.onnx"
+    if not (model_dir / file_name).exists():
+        logger.info(f"Exporting '{name}' to int8 ONNX ({config}) in {model_dir}")
+        model = SentenceTransformer(name, backend="onnx")
+        model.save_pretrained(str(model_dir))
+        export_dynamic_quantized_onnx_model(model, config, str(model_dir))
+    return SentenceTransformer(
+        str(model_dir), backend="onnx", model_kwargs={"file_name": file_name}
+    )
+
+
+def _load_keybert():
+    from keybert import KeyBERT
+
+    return KeyBERT(model=load_sentence_transformer(KEYWORD_MODEL_NAME))
+
+
+def _load_specter():
+    return load_sentence_transformer(QUERY_EMBEDDING_MODEL_NAME)
+
+
+def _load_summarizer_llm():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    env_values = dotenv_values(Path(__file__).parent / "app.env")
+    return ChatGoogleGenerativeAI(
+        model=settings.SUMMARIZER_MODEL,
+        google_api_key=env_values["GOOGLE_API_KEY"],
+        temperature=0.7,
+    )
+
+
+def _load_search_pipeline():
+    from AI.similarity_search_pipeline.pipeline import SemanticSearchPipeline
+
+    return SemanticSearchPipeline()
+
+
+keybert = register("keybert", _load_keybert)
+specter = register("specter", _load_specter)
+summarizer_llm = register("summarizer_llm", _load_summarizer_llm)
+search_pipeline = register("search_pipeline", _load_search_pipeline)
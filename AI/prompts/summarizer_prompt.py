@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from config import settings
+from AI.config import settings
 
 
 class SystemPrompt(BaseModel):
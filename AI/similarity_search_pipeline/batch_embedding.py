@@ -0,0 +1,94 @@
+import logging
+import math
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.embeddings import Embeddings
+
+from AI.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """True if `error` is an HTTP 429 from the embedding provider."""
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    return status_code == 429
+
+
+class BatchedEmbeddings(Embeddings):
+    """
+    Embedding stage that cuts large chunk sets into batches and sends them
+    to the wrapped model concurrently.
+
+    Batches hold at most `batch_size` texts and `max_batch_chars` characters,
+    and are shrunk for small inputs so every worker gets work. At most
+    `max_concurrency` requests are in flight; a batch rejected with 429 is
+    retried with exponential backoff and jitter. Results keep input order.
+    """
+
+    def __init__(
+        self,
+        embedding_model,
+        batch_size: int = settings.EMBEDDING_BATCH_SIZE,
+        max_batch_chars: int = settings.EMBEDDING_BATCH_MAX_CHARS,
+        max_concurrency: int = settings.EMBEDDING_CONCURRENCY,
+        max_retries: int = settings.EMBEDDING_MAX_RETRIES,
+        backoff: float = 1.0,
+    ):
+        self.embedding_model = embedding_model
+        self.batch_size = batch_size
+        self.max_batch_chars = max_batch_chars
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        batches = self.make_batches(texts)
+        if len(batches) <= 1:
+            return [v for batch in batches for v in self._embed_batch(batch)]
+        workers = min(self.max_concurrency, len(batches))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(self._embed_batch, batches)
+            return [vector for batch in results for vector in batch]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embedding_model.embed_query(text)
+
+    def make_batches(self, texts: list[str]) -> list[list[str]]:
+        """Split `texts` into ordered batches within the count and size caps."""
+        if not texts:
+            return []
+        # Spread small inputs over all workers instead of one full batch.
+        per_worker = math.ceil(len(texts) / self.max_concurrency)
+        batch_size = max(1, min(self.batch_size, per_worker))
+
+        batches, batch, batch_chars = [], [], 0
+        for text in texts:
+            if batch and (
+                len(batch) >= batch_size
+                or batch_chars + len(text) > self.max_batch_chars
+            ):
+                batches.append(batch)
+                batch, batch_chars = [], 0
+            batch.append(text)
+            batch_chars += len(text)
+        batches.append(batch)
+        return batches
+
+    def _embed_batch(self, batch: list[str]) -> list[list[float]]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.embedding_model.embed_documents(batch)
+            except Exception as e:
+                if not is_rate_limited(e) or attempt == self.max_retries:
+                    raise
+                delay = self.backoff * 2**attempt * (1 + random.random())
+                logger.warning(
+                    f"Embedding rate limited, retrying batch of {len(batch)} "
+                    f"in {delay:.2f}s ({attempt + 1}/{self.max_retries})"
+                )
+                time.sleep(delay)
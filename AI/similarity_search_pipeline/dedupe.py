@@ -0,0 +1,60 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+
+def hash_pdf(path: str, block_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of a PDF's bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(block_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestRegistry:
+    """
+    Content-addressed record of ingested PDFs.
+
+    Maps the SHA-256 of a PDF's bytes to the chunk ids it produced in the
+    vector DB, so a document that was already ingested can be recognised
+    without parsing or embedding it again.
+    """
+
+    def __init__(self, db_path: str):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "digest TEXT PRIMARY KEY, source TEXT, chunk_ids TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, digest: str) -> list[str] | None:
+        """Return the chunk ids stored for `digest`, or None if unknown."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT chunk_ids FROM documents WHERE digest = ?", (digest,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def add(self, digest: str, source: str, chunk_ids: list[str]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?)",
+                (digest, source, json.dumps(chunk_ids)),
+            )
+            self._conn.commit()
+
+    def remove(self, digest: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM documents WHERE digest = ?", (digest,))
+            self._conn.commit()
+
+
+def chunk_ids_for(digest: str, count: int) -> list[str]:
+    """Deterministic chunk ids derived from the document's content hash."""
+    return [f"{digest}:{i}" for i in range(count)]
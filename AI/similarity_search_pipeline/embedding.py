@@ -1,14 +1,52 @@
+from AI.similarity_search_pipeline.batch_embedding import BatchedEmbeddings
+from AI.similarity_search_pipeline.embedding_cache import (
+    CachedEmbeddings,
+    EmbeddingStore,
+)
 from dotenv import dotenv_values
+from AI.config import settings
+from pathlib import Path
 
-env_values = dotenv_values("app.env")
-cohere_api_key = env_values["COHERE_API_KEY"]
+ENV_FILE = Path(__file__).resolve().parents[1] / "app.env"
 
 
-def get_embedding_model(model: str):
+def cohere_api_key() -> str:
+    """Read from AI/app.env when the model is built, not at import time."""
+    api_key = dotenv_values(ENV_FILE).get("COHERE_API_KEY")
+    if not api_key:
+        raise RuntimeError(f"COHERE_API_KEY is not set in {ENV_FILE}")
+    return api_key
+
+
+def get_embedding_model(model: str, purpose: str = "chunks"):
+    """
+    Embedding model for `purpose`: "chunks" (indexed text) or "keyphrases"
+    (keyword candidates). Both use the same model so their vectors are
+    comparable, but each has its own cache.
+    """
     if model == "cohere":
         from langchain_community.embeddings.cohere import CohereEmbeddings
 
         embedding_llm = CohereEmbeddings(
-            cohere_api_key=cohere_api_key, user_agent="langchain"
+            cohere_api_key=cohere_api_key(), user_agent="langchain"
+        )
+        return with_cache(
+            BatchedEmbeddings(embedding_llm),
+            f"cohere/{embedding_llm.model}",
+            purpose,
         )
+
+
+def with_cache(embedding_llm, model_name: str, purpose: str = "chunks"):
+    """Put the persistent embedding cache in front of `embedding_llm`."""
+    if not settings.EMBEDDING_CACHE_PATH:
         return embedding_llm
+    store_name = model_name.replace("/", "_")
+    capacity = settings.EMBEDDING_CACHE_SIZE
+    if purpose != "chunks":
+        store_name = f"{store_name}_{purpose}"
+        capacity = settings.KEYPHRASE_CACHE_SIZE
+    store = EmbeddingStore(
+        str(Path(settings.EMBEDDING_CACHE_PATH) / store_name), capacity=capacity
+    )
+    return CachedEmbeddings(embedding_llm, model_name, store)
@@ -0,0 +1,210 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+SQL_BATCH = 500  # keys per `IN (...)` query, under SQLite's variable limit
+
+
+class EmbeddingStore:
+    """
+    Fixed-capacity on-disk vector store with LRU eviction.
+
+    Vectors live in a memory-mapped float32 file (`vectors.f32`, one row per
+    slot); `index.sqlite` maps each key to its slot, lists the free slots
+    and records recency so the LRU order survives restarts.
+
+    SQLite is the only source of truth for slots: every operation runs in
+    an exclusive transaction that also covers its reads and writes of the
+    vector file, so processes sharing a cache directory never hand one slot
+    to two keys or read a slot while it is being overwritten.
+    """
+
+    def __init__(self, path: str, capacity: int):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.path / "index.sqlite",
+            check_same_thread=False,
+            isolation_level=None,  # transactions are managed explicitly
+            timeout=60,
+        )
+        self.dim = None
+        self._vectors = None
+        self._clock = 0
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, "
+            "slot INTEGER NOT NULL UNIQUE, last_used INTEGER NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);"
+            "CREATE TABLE IF NOT EXISTS free_slots (slot INTEGER PRIMARY KEY);"
+            "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER);"
+        )
+        with self._transaction() as conn:
+            # Drop entries beyond a reduced capacity and rebuild the free list.
+            conn.execute("DELETE FROM entries WHERE slot >= ?", (capacity,))
+            used = {slot for (slot,) in conn.execute("SELECT slot FROM entries")}
+            conn.execute("DELETE FROM free_slots")
+            conn.executemany(
+                "INSERT INTO free_slots VALUES (?)",
+                [(slot,) for slot in range(capacity) if slot not in used],
+            )
+
+    def get_many(self, keys: list[str]) -> dict[str, np.ndarray]:
+        """Return the cached vectors for `keys` and mark them recently used."""
+        found = {}
+        with self._transaction() as conn:
+            if self._vectors is None:
+                return found
+            for start in range(0, len(keys), SQL_BATCH):
+                batch = keys[start : start + SQL_BATCH]
+                rows = conn.execute(
+                    "SELECT key, slot FROM entries WHERE key IN "
+                    f"({', '.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                for key, slot in rows:
+                    found[key] = np.array(self._vectors[slot])
+            conn.executemany(
+                "UPDATE entries SET last_used = ? WHERE key = ?",
+                [(self._tick(), key) for key in found],
+            )
+        return found
+
+    def put_many(self, items: dict[str, list[float]]):
+        """Store vectors, evicting the least recently used entries when full."""
+        if not items:
+            return
+        with self._transaction() as conn:
+            if self.dim is None:
+                self.dim = len(next(iter(items.values())))
+                conn.execute("INSERT INTO meta VALUES ('dim', ?)", (self.dim,))
+                self._vectors = self._open_vectors()
+
+            for key, vector in items.items():
+                slot = self._slot_for(conn, key)
+                self._vectors[slot] = vector
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)",
+                    (key, slot, self._tick()),
+                )
+            self._vectors.flush()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def _slot_for(self, conn, key: str) -> int:
+        """The key's slot, else a free one, else the least recently used one."""
+        row = conn.execute("SELECT slot FROM entries WHERE key = ?", (key,)).fetchone()
+        if row:
+            return row[0]
+        row = conn.execute("SELECT slot FROM free_slots LIMIT 1").fetchone()
+        if row:
+            conn.execute("DELETE FROM free_slots WHERE slot = ?", row)
+            return row[0]
+        old_key, slot = conn.execute(
+            "SELECT key, slot FROM entries ORDER BY last_used LIMIT 1"
+        ).fetchone()
+        conn.execute("DELETE FROM entries WHERE key = ?", (old_key,))
+        return slot
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN EXCLUSIVE")
+            try:
+                # Other processes may have written since our last transaction.
+                self._clock = self._conn.execute(
+                    "SELECT COALESCE(MAX(last_used), 0) FROM entries"
+                ).fetchone()[0]
+                if self.dim is None:
+                    row = self._conn.execute(
+                        "SELECT value FROM meta WHERE name = 'dim'"
+                    ).fetchone()
+                    if row:
+                        self.dim = row[0]
+                        self._vectors = self._open_vectors()
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _tick(self):
+        self._clock += 1
+        return self._clock
+
+    def _open_vectors(self):
+        vectors_path = self.path / "vectors.f32"
+        size = self.capacity * self.dim * np.dtype(np.float32).itemsize
+        with open(vectors_path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        return np.memmap(
+            vectors_path, dtype=np.float32, mode="r+", shape=(self.capacity, self.dim)
+        )
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embedding backend that serves chunk vectors from an `EmbeddingStore`
+    and only sends cache misses to the wrapped model.
+
+    Vectors are keyed by a hash of the model name and the chunk text, so
+    switching models never returns stale vectors. Queries are not cached.
+    """
+
+    def __init__(self, embedding_model, model_name: str, store: EmbeddingStore):
+        self.embedding_model = embedding_model
+        self.model_name = model_name
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys = [self._key(text) for text in texts]
+        with self._lock:
+            cached = self.store.get_many(keys)
+
+        missing = {}
+        for key, text in zip(keys, texts, strict=True):
+            if key not in cached:
+                missing.setdefault(key, text)
+        if missing:
+            vectors = self.embedding_model.embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors, strict=True))
+            with self._lock:
+                self.store.put_many(computed)
+            cached.update(computed)
+
+        with self._lock:
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+        logging.debug(
+            f"Embedding cache: {len(texts) - len(missing)} hits, {len(missing)} misses"
+        )
+        return [list(map(float, cached[key])) for key in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embedding_model.embed_query(text)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self.store),
+            "capacity": self.store.capacity,
+        }
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode()).hexdigest()
@@ -0,0 +1,206 @@
+import bisect
+import hashlib
+import json
+import mmap
+from collections.abc import Mapping
+from functools import lru_cache
+from pathlib import Path
+
+import faiss
+import numpy as np
+from langchain_community.docstore.base import AddableMixin, Docstore
+from langchain_core.documents import Document
+
+
+class ReadOnlyStoreError(ValueError):
+    """A lazily loaded vector DB was asked to change its on-disk documents."""
+
+
+def id_key(doc_id: str) -> int:
+    """64-bit hash of a document id, used to look ids up in a segment."""
+    return int.from_bytes(
+        hashlib.blake2b(doc_id.encode(), digest_size=8).digest(), "little", signed=True
+    )
+
+
+def write_segment_lookup(jsonl_path: Path, offsets: list[int], ids: list[str]):
+    """
+    Write the side files that let a segment be read without loading it:
+    line offsets of the JSONL records and a sorted id-hash -> position table.
+    """
+    np.save(jsonl_path.with_suffix(".offsets.npy"), np.asarray(offsets, dtype=np.int64))
+    keys = np.fromiter((id_key(i) for i in ids), dtype=np.int64, count=len(ids))
+    order = np.argsort(keys, kind="stable")
+    np.save(jsonl_path.with_suffix(".idkeys.npy"), keys[order])
+    np.save(jsonl_path.with_suffix(".idpos.npy"), order.astype(np.int64))
+
+
+class SegmentReader:
+    """Random access to the records of one segment's JSONL through mmap."""
+
+    def __init__(self, jsonl_path: Path):
+        if not jsonl_path.with_suffix(".idpos.npy").exists():
+            self._build_lookup(jsonl_path)
+        with open(jsonl_path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._offsets = np.load(jsonl_path.with_suffix(".offsets.npy"), mmap_mode="r")
+        self._keys = np.load(jsonl_path.with_suffix(".idkeys.npy"), mmap_mode="r")
+        self._positions = np.load(jsonl_path.with_suffix(".idpos.npy"), mmap_mode="r")
+        self.record = lru_cache(maxsize=1024)(self._read_record)
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def position_of(self, doc_id: str) -> int | None:
+        key = id_key(doc_id)
+        i = int(np.searchsorted(self._keys, key))
+        while i < len(self._keys) and self._keys[i] == key:
+            position = int(self._positions[i])
+            if self.record(position)["id"] == doc_id:
+                return position
+            i += 1
+        return None
+
+    def document(self, position: int) -> Document:
+        record = self.record(position)
+        return Document(
+            id=record["id"],
+            page_content=record["page_content"],
+            metadata=record["metadata"],
+        )
+
+    def _read_record(self, position: int) -> dict:
+        start, end = self._offsets[position], self._offsets[position + 1]
+        return json.loads(self._data[start:end])
+
+    @staticmethod
+    def _build_lookup(jsonl_path: Path):
+        offsets, ids = [0], []
+        with open(jsonl_path, "rb") as f:
+            for line in f:
+                offsets.append(offsets[-1] + len(line))
+                ids.append(json.loads(line)["id"])
+        write_segment_lookup(jsonl_path, offsets, ids)
+
+
+class SegmentSet:
+    """The segments of a vector DB addressed by global index position."""
+
+    def __init__(self, readers: list[SegmentReader]):
+        self.readers = readers
+        self.starts = []
+        total = 0
+        for reader in readers:
+            self.starts.append(total)
+            total += len(reader)
+        self.total = total
+
+    def locate(self, position: int):
+        i = bisect.bisect_right(self.starts, position) - 1
+        return self.readers[i], position - self.starts[i]
+
+    def position_of(self, doc_id: str) -> int | None:
+        for start, reader in zip(self.starts, self.readers, strict=True):
+            position = reader.position_of(doc_id)
+            if position is not None:
+                return start + position
+        return None
+
+    def find(self, doc_id: str) -> Document | None:
+        for reader in self.readers:
+            position = reader.position_of(doc_id)
+            if position is not None:
+                return reader.document(position)
+        return None
+
+
+class LazyDocstore(Docstore, AddableMixin):
+    """
+    Docstore that reads documents from the on-disk segments on demand.
+    Documents added after loading are kept in memory.
+    """
+
+    def __init__(self, segments: SegmentSet):
+        self.segments = segments
+        self._dict = {}
+
+    def add(self, texts: dict[str, Document]) -> None:
+        overlapping = {i for i in texts if isinstance(self.search(i), Document)}
+        if overlapping:
+            raise ValueError(f"Tried to add ids that already exist: {overlapping}")
+        self._dict.update(texts)
+
+    def delete(self, ids: list) -> None:
+        # Segments are immutable; load eagerly to delete documents.
+        raise ReadOnlyStoreError("Lazily loaded vector DBs are append-only")
+
+    def search(self, search: str) -> str | Document:
+        doc = self._dict.get(search) or self.segments.find(search)
+        if doc is None:
+            return f"ID {search} not found."
+        return doc
+
+
+class LazyIndexToDocstoreId(Mapping):
+    """`index_to_docstore_id` backed by the segments instead of a dict."""
+
+    def __init__(self, segments: SegmentSet):
+        self.segments = segments
+        self._added = {}
+        self._added_positions = {}
+
+    def __getitem__(self, position: int) -> str:
+        position = int(position)
+        if 0 <= position < self.segments.total:
+            reader, local = self.segments.locate(position)
+            return reader.record(local)["id"]
+        return self._added[position]
+
+    def __len__(self):
+        return self.segments.total + len(self._added)
+
+    def __iter__(self):
+        return iter(range(len(self)))
+
+    def update(self, index_to_id: dict[int, str]):
+        self._added.update(index_to_id)
+        self._added_positions.update((i, p) for p, i in index_to_id.items())
+
+    def position_of(self, doc_id: str) -> int | None:
+        position = self.segments.position_of(doc_id)
+        if position is None:
+            position = self._added_positions.get(doc_id)
+        return position
+
+
+class LayeredIndex(faiss.IndexShards):
+    """
+    A memory-mapped, read-only base index plus an in-memory flat index that
+    receives every vector added after loading. Ids run on from base to delta.
+    """
+
+    def __init__(self, base, delta):
+        super().__init__(base.d, False, True)
+        # faiss index wrappers reject unknown attributes through setattr.
+        object.__setattr__(self, "base", base)
+        object.__setattr__(self, "delta", delta)
+        self.add_shard(base)
+        self.add_shard(delta)
+
+    def add(self, x):
+        self.delta.add(x)
+        self.syncWithSubIndexes()
+
+    def reconstruct(self, key):
+        if key < self.base.ntotal:
+            return self.base.reconstruct(key)
+        return self.delta.reconstruct(key - self.base.ntotal)
+
+    def reconstruct_n(self, i0, ni):
+        vectors = np.concatenate(
+            [
+                self.base.reconstruct_n(0, self.base.ntotal),
+                self.delta.reconstruct_n(0, self.delta.ntotal),
+            ]
+        )
+        return vectors[i0 : i0 + ni]
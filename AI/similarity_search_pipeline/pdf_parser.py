@@ -1,54 +1,217 @@
 from langchain_community.document_loaders import PyPDFLoader
-from docling.document_converter import DocumentConverter
+from langchain_core.documents import Document
 from docling.datamodel.accelerator_options import AcceleratorDevice, AcceleratorOptions
 from docling.datamodel.base_models import InputFormat
-from docling_core.types.doc.document import PictureItem
+from docling_core.types.doc.document import PictureItem, TableItem, TextItem
 from docling.document_converter import DocumentConverter, PdfFormatOption
 from docling.datamodel.pipeline_options import PdfPipelineOptions
+from contextlib import contextmanager
+from collections import defaultdict
+from AI.config import settings
 from pathlib import Path
+import threading
+import hashlib
+import logging
+import queue
+import os
 
-class ArixParse:
-    def __init__(self, pdf_path: str):
-        self.path =  pdf_path
 
-        accelerator_options = AcceleratorOptions(
-            num_threads=8, device=AcceleratorDevice.CUDA
+def host_cpu_count() -> int:
+    """CPUs this process may run on (respects container/affinity limits)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def build_pipeline_options(num_threads: int, device=AcceleratorDevice.AUTO):
+    pipeline_options = PdfPipelineOptions()
+    pipeline_options.accelerator_options = AcceleratorOptions(
+        num_threads=num_threads, device=device
+    )
+
+    pipeline_options.do_ocr = False
+    pipeline_options.do_table_structure = True
+    pipeline_options.ocr_options.lang = ["en"]
+    pipeline_options.images_scale = 2.0
+    pipeline_options.generate_page_images = False
+    pipeline_options.generate_picture_images = True
+    return pipeline_options
+
+
+class ConverterPool:
+    """
+    Long-lived pool of docling converters shared by every document parsed in
+    this process, so layout/table models are loaded once per converter
+    instead of once per PDF.
+
+    The device is picked by docling (CUDA, MPS or CPU, whichever the host
+    has) and the host's CPUs are split evenly between the converters.
+    """
+
+    shared: "ConverterPool | None" = None  # see `get_converter_pool`
+
+    def __init__(self, size: int = 1, num_threads: int | None = None):
+        self.size = max(1, size)
+        self.num_threads = num_threads or max(1, host_cpu_count() // self.size)
+        self._idle = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def converter(self):
+        """Borrow a converter, creating one if the pool is not full yet."""
+        try:
+            converter = self._idle.get_nowait()
+        except queue.Empty:
+            converter = self._create() or self._idle.get()
+        try:
+            yield converter
+        finally:
+            self._idle.put(converter)
+
+    def convert(self, path: str):
+        with self.converter() as converter:
+            return converter.convert(path).document
+
+    def warmup(self):
+        """Create every converter and load its models up front."""
+        while converter := self._create():
+            converter.initialize_pipeline(InputFormat.PDF)
+            self._idle.put(converter)
+
+    def _create(self):
+        with self._lock:
+            if self._created >= self.size:
+                return None
+            self._created += 1
+            created = self._created
+        logging.info(
+            f"Creating docling converter ({self.num_threads} threads, "
+            f"{created}/{self.size})"
         )
-        self.pipeline_options = PdfPipelineOptions()
-        self.pipeline_options.accelerator_options = accelerator_options
-
-        self.pipeline_options.do_ocr = False
-        self.pipeline_options.do_table_structure = True
-        self.pipeline_options.ocr_options.lang = ["en"]
-        self.pipeline_options.images_scale = 2.0
-        self.pipeline_options.generate_page_images = False
-        self.pipeline_options.generate_picture_images = True
-        self.converter = DocumentConverter(
-            format_options={
-                InputFormat.PDF: PdfFormatOption(pipeline_options=self.pipeline_options)
-            }
+        try:
+            return DocumentConverter(
+                format_options={
+                    InputFormat.PDF: PdfFormatOption(
+                        pipeline_options=build_pipeline_options(self.num_threads)
+                    )
+                }
+            )
+        except BaseException:
+            # Free the slot, or borrowers would wait for a converter forever.
+            with self._lock:
+                self._created -= 1
+            raise
+
+
+_converter_pool_lock = threading.Lock()
+
+
+def get_converter_pool() -> ConverterPool:
+    """The process-wide converter pool, created on first use."""
+    with _converter_pool_lock:
+        if ConverterPool.shared is None:
+            ConverterPool.shared = ConverterPool(
+                settings.DOCLING_POOL_SIZE, settings.DOCLING_THREADS
+            )
+        return ConverterPool.shared
+
+
+def configure_converter_pool(size: int, num_threads: int | None = None):
+    """Replace the process-wide converter pool, e.g. in a worker initializer."""
+    with _converter_pool_lock:
+        ConverterPool.shared = ConverterPool(
+            size, num_threads or settings.DOCLING_THREADS
         )
+        return ConverterPool.shared
+
+
+class ArixParse:
+    def __init__(self, pdf_path: str, pool: ConverterPool | None = None):
+        self.path = pdf_path
+        self.pool = pool or get_converter_pool()
 
     def parse(self):
-        return self.converter.convert(self.path).document
-
-
-def parsePDF(path:str, outputdir, withImages = False):
-    """ takes PDF file path and returns PDF parsed pages text with metadata"""
-    llm_loader = PyPDFLoader(path)
-    pages = llm_loader.load_and_split()
-    
-    if withImages:
-        doc = ArixParse(pdf_path=path).parse()
-        images_path = Path(outputdir) / "images"
-        images_path.mkdir(exist_ok=True)
-
-        image_counter = 0
-        for element, level in doc.iterate_items():
-            if isinstance(element, PictureItem):
-                image_counter += 1
-                img = element.get_image(doc)
-                if img:
-                    img_path = images_path / f"figure_{image_counter}.png"
-                    img.save(img_path, "PNG")
-    return pages
+        return self.pool.convert(self.path)
+
+
+def parsePDF(path: str, outputdir=None, withImages=False):
+    """takes PDF file path and returns PDF parsed pages text with metadata
+
+    Without images the text is extracted with the fast PyPDFLoader, one
+    Document per page exactly as `iter_pages` yields them, so streamed and
+    whole-document ingestion split a PDF into the same chunks. With
+    images a single docling pass yields the page text, tables (as markdown)
+    and figures together; figures are saved under `outputdir`/images, or
+    in a directory of the PDF's own under PDF_IMAGES_PATH by default.
+    """
+    if not withImages:
+        return list(iter_pages(path))
+
+    doc = ArixParse(pdf_path=path).parse()
+    images_path = Path(outputdir) / "images" if outputdir else images_dir_for(path)
+    images_path.mkdir(parents=True, exist_ok=True)
+    return docling_pages(doc, path, images_path)
+
+
+def images_dir_for(path: str) -> Path:
+    """Figure directory of a PDF under PDF_IMAGES_PATH, unique per file path."""
+    source = Path(path).resolve()
+    digest = hashlib.sha256(str(source).encode()).hexdigest()[:12]
+    return Path(settings.PDF_IMAGES_PATH) / f"{source.stem}-{digest}"
+
+
+def iter_pages(path: str, outputdir=None, withImages=False):
+    """
+    Yield the PDF's pages one at a time instead of returning them all.
+
+    The text-only mode extracts each page lazily. Docling converts the whole
+    document at once, so with images the pages are yielded after conversion.
+    """
+    if not withImages:
+        yield from PyPDFLoader(path).lazy_load()
+        return
+    yield from parsePDF(path, outputdir, withImages=True)
+
+
+def docling_pages(doc, source: str, images_path: Path) -> list[Document]:
+    """Group a docling document's items into one Document per page."""
+    texts = defaultdict(list)
+    tables = defaultdict(int)
+    images = defaultdict(list)
+
+    image_counter = 0
+    for element, level in doc.iterate_items():
+        if not element.prov:
+            continue
+        page_no = element.prov[0].page_no
+        if isinstance(element, TableItem):
+            texts[page_no].append(element.export_to_markdown(doc))
+            tables[page_no] += 1
+        elif isinstance(element, PictureItem):
+            image_counter += 1
+            img = element.get_image(doc)
+            if img:
+                img_path = (
+                    images_path / f"{Path(source).stem}_figure_{image_counter}.png"
+                )
+                img.save(img_path, "PNG")
+                images[page_no].append(str(img_path))
+        elif isinstance(element, TextItem):
+            texts[page_no].append(element.text)
+
+    total_pages = doc.num_pages()
+    return [
+        Document(
+            page_content="\n\n".join(texts[page_no]),
+            metadata={
+                "source": source,
+                "page": page_no - 1,  # 0-based, like PyPDFLoader
+                "total_pages": total_pages,
+                "tables": tables[page_no],
+                "images": images[page_no],
+            },
+        )
+        for page_no in sorted(texts.keys() | images.keys())
+    ]
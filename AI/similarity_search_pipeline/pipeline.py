@@ -1,9 +1,31 @@
-from AI.similarity_search_pipeline.pdf_parser import parsePDF
-from AI.similarity_search_pipeline.text_splitter import split_text
+from AI.similarity_search_pipeline.pdf_parser import (
+    parsePDF,
+    iter_pages,
+    configure_converter_pool,
+    host_cpu_count,
+)
+from AI.similarity_search_pipeline.text_splitter import split_text, iter_chunks
 from AI.similarity_search_pipeline.vector_db import VectorDB
 from AI.similarity_search_pipeline.embedding import get_embedding_model
-from config import settings
+from AI.similarity_search_pipeline.dedupe import IngestRegistry, hash_pdf, chunk_ids_for
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import islice
+from AI.config import settings
+import threading
 import logging
+import queue
+
+_END_OF_STREAM = object()
+
+
+def _init_worker(num_threads: int):
+    """Give each worker process its own converter pool with a share of the CPUs."""
+    configure_converter_pool(settings.DOCLING_POOL_SIZE, num_threads)
+
+
+def _load_chunks(pdf_path: str, with_images: bool = False):
+    """Parse and split a single PDF. Runs inside a worker process."""
+    return split_text(parsePDF(pdf_path, withImages=with_images))
 
 
 class SemanticSearchPipeline:
@@ -14,17 +36,237 @@ class SemanticSearchPipeline:
             persist_path=str(settings.VECTOR_DB_PATH),
         )
         self.vector_db = self.vector_manager.load()
+        self.registry = IngestRegistry(str(settings.INGEST_REGISTRY_PATH))
+        self._keyphrase_embeddings = None
 
-    def add_pdf(self, pdf_path: str):
+    def add_pdf(self, pdf_path: str, with_images: bool = False):
+        """Ingest one PDF and return the ids of its chunks in the vector DB."""
+        digest = hash_pdf(pdf_path)
+        chunk_ids = self._known_chunk_ids(digest)
+        if chunk_ids is not None:
+            logging.info(f"{pdf_path} already ingested, skipping")
+            return chunk_ids
         # step 1
-        raw_text = parsePDF(pdf_path)
+        raw_text = parsePDF(pdf_path, withImages=with_images)
         # step 2
         chunks = split_text(raw_text)
         # step 3
+        chunk_ids = chunk_ids_for(digest, len(chunks))
+        self._index_chunks(chunks, chunk_ids)
+        self.registry.add(digest, pdf_path, chunk_ids)
+        return chunk_ids
+
+    def add_pdf_streaming(
+        self,
+        pdf_path: str,
+        batch_size: int = settings.STREAM_BATCH_SIZE,
+        with_images: bool = False,
+    ):
+        """
+        Ingest one PDF as a stream of pages -> chunks -> vectors.
+
+        A background thread parses and splits page by page into a queue of at
+        most `settings.STREAM_QUEUE_SIZE` batches of `batch_size` chunks, while
+        this thread embeds and indexes them, so parsing overlaps embedding and
+        memory stays bounded by a few batches regardless of document length.
+        Segment compaction waits until the whole document is indexed.
+        Returns the ids of the document's chunks, like `add_pdf`.
+        """
+        digest = hash_pdf(pdf_path)
+        chunk_ids = self._known_chunk_ids(digest)
+        if chunk_ids is not None:
+            logging.info(f"{pdf_path} already ingested, skipping")
+            return chunk_ids
+
+        batches = queue.Queue(maxsize=settings.STREAM_QUEUE_SIZE)
+        stop = threading.Event()
+
+        def produce():
+            try:
+                chunks = iter_chunks(iter_pages(pdf_path, withImages=with_images))
+                while not stop.is_set() and (batch := list(islice(chunks, batch_size))):
+                    batches.put(batch)
+                batches.put(_END_OF_STREAM)
+            except Exception as e:
+                batches.put(e)
+
+        producer = threading.Thread(target=produce, name="pdf-stream", daemon=True)
+        producer.start()
+        chunk_ids = []
+        with self.vector_manager.deferred_compaction():
+            try:
+                while (batch := batches.get()) is not _END_OF_STREAM:
+                    if isinstance(batch, Exception):
+                        raise batch
+                    batch_ids = [
+                        f"{digest}:{len(chunk_ids) + i}" for i in range(len(batch))
+                    ]
+                    chunk_ids.extend(batch_ids)
+                    self._index_chunks(batch, batch_ids)
+            finally:
+                stop.set()
+                # Unblock the producer if it is waiting on a full queue.
+                while producer.is_alive():
+                    try:
+                        batches.get(timeout=0.1)
+                    except queue.Empty:
+                        pass
+        self.registry.add(digest, pdf_path, chunk_ids)
+        return chunk_ids
+
+    def add_pdfs(
+        self,
+        pdf_paths: list[str],
+        max_workers: int | None = settings.INGEST_WORKERS,
+        batch_size: int = settings.INGEST_BATCH_SIZE,
+        on_progress=None,
+        with_images: bool = False,
+    ):
+        """
+        Ingest many PDFs at once.
+
+        Parsing and splitting run across a process pool; the resulting chunks
+        are embedded and written to the index once per `batch_size` PDFs, and
+        segments are compacted once after the last batch.
+        A PDF that fails to parse is recorded and skipped without stopping the
+        batch, and PDFs whose content was already ingested are skipped without
+        parsing. Errors while indexing are raised: PDFs indexed up to then are
+        in the registry, and chunks of the failed batch that did reach the
+        index are skipped when the batch is ingested again.
+
+        `on_progress(done, total, pdf_path, error)` is called after each PDF
+        is parsed, with `error` set to the exception when it failed.
+
+        Returns a dict with the ingested paths under "added", already known
+        paths under "skipped" and a mapping of path -> error message under
+        "failed".
+        """
+        total = len(pdf_paths)
+        report = {"added": [], "skipped": [], "failed": {}}
+        to_parse, seen = {}, set()
+        for path in pdf_paths:
+            try:
+                digest = hash_pdf(path)
+            except OSError as e:
+                report["failed"][path] = str(e)
+                continue
+            if digest in seen or self._known_chunk_ids(digest) is not None:
+                report["skipped"].append(path)
+                continue
+            seen.add(digest)
+            to_parse[path] = digest
+
+        pending = []
+        done = total - len(to_parse)
+        workers = max_workers or host_cpu_count()
+        threads = settings.DOCLING_THREADS or max(
+            1, host_cpu_count() // (workers * settings.DOCLING_POOL_SIZE)
+        )
+        with self.vector_manager.deferred_compaction():
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(threads,)
+            ) as executor:
+                futures = {
+                    executor.submit(_load_chunks, path, with_images): path
+                    for path in to_parse
+                }
+                for future in as_completed(futures):
+                    path = futures[future]
+                    done += 1
+                    error = future.exception()
+                    if error is None:
+                        pending.append((path, to_parse[path], future.result()))
+                        logging.info(f"[{done}/{total}] Parsed {path}")
+                    else:
+                        report["failed"][path] = str(error)
+                        logging.error(
+                            f"[{done}/{total}] Failed to parse {path}: {error}"
+                        )
+                    if on_progress:
+                        on_progress(done, total, path, error)
+
+                    if len(pending) >= batch_size:
+                        self._flush_batch(pending, report)
+                        pending = []
+
+            if pending:
+                self._flush_batch(pending, report)
+
+        logging.info(
+            f"Ingested {len(report['added'])}/{total} PDFs, "
+            f"{len(report['skipped'])} skipped, {len(report['failed'])} failed"
+        )
+        return report
+
+    def _flush_batch(self, pending, report):
+        """Embed and index one batch of parsed PDFs with a single index write."""
+        chunks, chunk_ids = [], []
+        for _, digest, doc_chunks in pending:
+            chunks.extend(doc_chunks)
+            chunk_ids.extend(chunk_ids_for(digest, len(doc_chunks)))
+        self._index_chunks(chunks, chunk_ids)
+        for path, digest, doc_chunks in pending:
+            self.registry.add(digest, path, chunk_ids_for(digest, len(doc_chunks)))
+            report["added"].append(path)
+
+    def _known_chunk_ids(self, digest: str):
+        """Chunk ids of an already ingested document that is still indexed."""
+        chunk_ids = self.registry.get(digest)
+        if chunk_ids is None:
+            return None
+        if chunk_ids and not (
+            self.vector_db and self.vector_db.get_by_ids(chunk_ids[:1])
+        ):
+            # The index was rebuilt or deleted since; ingest it again.
+            self.registry.remove(digest)
+            return None
+        return chunk_ids
+
+    def _index_chunks(self, chunks, chunk_ids):
+        if not chunks:
+            return
         if self.vector_db:
-            self.vector_db = self.vector_manager.add_docs(self.vector_db, chunks)
+            self.vector_db = self.vector_manager.add_docs(
+                self.vector_db, chunks, chunk_ids
+            )
         else:
-            self.vector_db = self.vector_manager.create(chunks)
+            self.vector_db = self.vector_manager.create(chunks, chunk_ids)
+
+    def extract_keywords(self, pdf_path: str, top_n: int = 5):
+        """
+        Keywords of a PDF (ingested first if needed), reusing the chunk
+        vectors already in the index instead of re-encoding the text.
+        """
+        from AI.Extraction_engine.precomputed_keywords import (
+            document_embedding,
+            extract_keywords_precomputed,
+        )
+
+        chunk_ids = self.add_pdf(pdf_path)
+        if not chunk_ids:
+            return []
+        chunks = self.vector_db.get_by_ids(chunk_ids)
+        vectors = self.vector_manager.vectors_for(self.vector_db, chunk_ids)
+        if vectors is None:
+            # Served from the embedding cache unless it evicted them.
+            vectors = self.embedding_model.embed_documents(
+                [chunk.page_content for chunk in chunks]
+            )
+        return extract_keywords_precomputed(
+            "\n".join(chunk.page_content for chunk in chunks),
+            document_embedding(vectors),
+            self.keyphrase_embeddings,
+            top_n=top_n,
+        )
+
+    @property
+    def keyphrase_embeddings(self):
+        """Same model as the index, with its own cache for keyphrases."""
+        if self._keyphrase_embeddings is None:
+            self._keyphrase_embeddings = get_embedding_model(
+                settings.EMBEDDING_MODEL, purpose="keyphrases"
+            )
+        return self._keyphrase_embeddings
 
     def search(self, query: str, k: int = settings.K_BEST_RESULT):
         if not self.vector_db:
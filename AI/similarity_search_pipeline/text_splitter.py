@@ -1,15 +1,20 @@
-from config import settings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from AI.config import settings
 
-def split_text(pages: list[str]) -> list[str]:
-    text_splitter = RecursiveCharacterTextSplitter(
+
+def get_text_splitter() -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter(
         separators=["\n\n", "\n", ".", " "],
         chunk_size=settings.CHUNK_SIZE,
         length_function=len,
         chunk_overlap=settings.CHUNK_OVERLAP,
     )
 
+
+def split_text(pages: list[str]) -> list[str]:
+    text_splitter = get_text_splitter()
+
     documents = []
     metadatas = []
     for page in pages:
@@ -18,3 +23,10 @@ def split_text(pages: list[str]) -> list[str]:
 
     chunks = text_splitter.create_documents(documents, metadatas)
     return chunks
+
+
+def iter_chunks(pages):
+    """Split pages as they arrive, yielding the chunks of one page at a time."""
+    text_splitter = get_text_splitter()
+    for page in pages:
+        yield from text_splitter.create_documents([page.page_content], [page.metadata])
@@ -1,45 +1,585 @@
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from AI.similarity_search_pipeline.lazy_store import (
+    LayeredIndex,
+    LazyDocstore,
+    LazyIndexToDocstoreId,
+    SegmentReader,
+    SegmentSet,
+    write_segment_lookup,
+)
+from AI.config import settings
+from contextlib import contextmanager
 from pathlib import Path
+import numpy as np
+import threading
 import logging
+import faiss
+import json
+import math
+import os
+
+MANIFEST_NAME = "manifest.json"
+LEGACY_INDEX_NAME = "index.faiss"
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+SEGMENT_SUFFIXES = (".faiss", ".jsonl", ".offsets.npy", ".idkeys.npy", ".idpos.npy")
+PQ_NBITS = 8
+
+
+def min_train_size_for(index_type: str, min_train_size: int | None = None) -> int:
+    """
+    Vectors needed before `index_type` is trained: `min_train_size`
+    (default VECTOR_INDEX_MIN_TRAIN_SIZE), raised for IVF-PQ to the
+    2**PQ_NBITS centroids its k-means needs.
+    """
+    if min_train_size is None:
+        min_train_size = settings.VECTOR_INDEX_MIN_TRAIN_SIZE
+    if index_type == "ivf_pq":
+        return max(min_train_size, 2**PQ_NBITS)
+    return min_train_size
+
+
+def build_index(
+    dimension: int,
+    vectors: np.ndarray | None = None,
+    index_type: str = settings.VECTOR_INDEX_TYPE,
+    nlist: int = settings.VECTOR_INDEX_NLIST,
+    pq_m: int = settings.VECTOR_INDEX_PQ_M,
+    hnsw_m: int = settings.VECTOR_INDEX_HNSW_M,
+    train_size: int = settings.VECTOR_INDEX_TRAIN_SIZE,
+    min_train_size: int | None = None,
+):
+    """
+    Build an empty FAISS index of `index_type`.
+
+    IVF indexes are trained on a random sample of at most `train_size` of
+    `vectors`; with fewer than `min_train_size_for(index_type,
+    min_train_size)` vectors there is not enough data to train them and a
+    flat index is returned instead.
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type {index_type!r}, expected {INDEX_TYPES}")
+    if index_type == "flat":
+        return faiss.IndexFlatL2(dimension)
+    if index_type == "hnsw":
+        return tune_index(faiss.IndexHNSWFlat(dimension, hnsw_m))
+
+    n_vectors = 0 if vectors is None else len(vectors)
+    if n_vectors < min_train_size_for(index_type, min_train_size):
+        logging.info(
+            f"{n_vectors} vectors are too few to train {index_type}, using flat"
+        )
+        return faiss.IndexFlatL2(dimension)
+
+    # FAISS wants ~39 training points per inverted list.
+    nlist = max(1, min(nlist, n_vectors // 39))
+    quantizer = faiss.IndexFlatL2(dimension)
+    if index_type == "ivf_flat":
+        index = faiss.IndexIVFFlat(quantizer, dimension, nlist)
+    else:
+        if dimension % pq_m:
+            # PQ splits vectors into equal sub-vectors.
+            pq_m = math.gcd(pq_m, dimension)
+            logging.warning(f"Using {pq_m} PQ sub-quantizers for dimension {dimension}")
+        index = faiss.IndexIVFPQ(quantizer, dimension, nlist, pq_m, PQ_NBITS)
+
+    rng = np.random.default_rng(0)
+    sample = rng.choice(n_vectors, size=min(train_size, n_vectors), replace=False)
+    logging.info(f"Training {index_type} (nlist={nlist}) on {len(sample)} vectors")
+    index.train(np.ascontiguousarray(vectors[np.sort(sample)], dtype=np.float32))
+    return tune_index(index)
+
+
+def tune_index(
+    index,
+    nprobe: int = settings.VECTOR_INDEX_NPROBE,
+    ef_search: int = settings.VECTOR_INDEX_EF_SEARCH,
+):
+    """Apply the search-time recall/latency knobs of IVF and HNSW indexes."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = nprobe
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = ef_search
+    return index
+
+
+def index_type_of(index) -> str:
+    if isinstance(index, LayeredIndex):
+        return index_type_of(index.base)
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivf_pq"
+    if isinstance(index, faiss.IndexIVFFlat):
+        return "ivf_flat"
+    return "flat"
 
 
 class VectorDB:
-    def __init__(self, embedding_model, persist_path: str | None = None):
+    """
+    FAISS vector store persisted as append-only segments.
+
+    Every write adds an immutable segment (`segment-NNNNNN.faiss` holding the
+    new vectors and `segment-NNNNNN.jsonl` holding their documents) and then
+    swaps `manifest.json`, so adding documents never rewrites existing data.
+    Once the manifest lists more than `max_segments` segments they are merged
+    into one by a background compaction thread, or once a
+    `deferred_compaction()` block (such as an ingest) ends.
+
+    Segments always hold the raw vectors. The searchable index is built as
+    `index_type` (see `build_index`), staying flat until `min_train_size`
+    vectors exist; for approximate types a trained copy covering the first
+    segment is kept as `segment-NNNNNN.index` so loading does not have to
+    retrain it.
+
+    `load(lazy=True)` memory-maps that index and reads documents from the
+    segment files only when a search returns them. Files replaced by a
+    compaction or snapshot are therefore kept until the next one, so other
+    processes still holding the previous manifest can keep reading them.
+    """
+
+    def __init__(
+        self,
+        embedding_model,
+        persist_path: str | None = None,
+        max_segments: int = settings.VECTOR_DB_MAX_SEGMENTS,
+        index_type: str = settings.VECTOR_INDEX_TYPE,
+        min_train_size: int | None = None,
+    ):
         self.embedding_model = embedding_model
         self.persist_path = persist_path
+        self.max_segments = max_segments
+        self.index_type = index_type
+        self.min_train_size = min_train_size
+        self._manifest = None
+        self._manifest_lock = threading.Lock()
+        self._compaction_thread = None
+        self._compaction_deferred = 0
+        self._positions_of = None
+        self._positions = {}
 
-    def create(self, initial_chunks):
+    def create(self, initial_chunks, ids: list[str] | None = None):
         """Create a new vector DB from initial chunks."""
-        vector_db = FAISS.from_documents(initial_chunks, self.embedding_model)
+        texts, metadatas = self._split_chunks(initial_chunks)
+        embeddings = self.embedding_model.embed_documents(texts)
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        index = self._build_index(vectors.shape[1], vectors)
+        vector_db = FAISS(self.embedding_model, index, InMemoryDocstore(), {})
+        ids = vector_db.add_embeddings(list(zip(texts, embeddings)), metadatas, ids)
         if self.persist_path:
-            self.save(vector_db)
+            self._write_snapshot(vector_db, vectors, ids)
         return vector_db
 
-    def add_docs(self, vector_db, new_chunks):
-        """Add new chunks to an existing vector DB and optionally save."""
-        vector_db.add_documents(new_chunks)
+    def add_docs(self, vector_db, new_chunks, ids: list[str] | None = None):
+        """
+        Add new chunks to an existing vector DB and optionally save.
+
+        Chunks whose id is already indexed (e.g. left by an ingest that
+        crashed before recording the PDF) are skipped: FAISS would add their
+        vectors before its docstore rejects the duplicate ids, leaving
+        vectors that no document points to.
+        """
+        if ids is not None:
+            new_chunks, ids = self._drop_indexed(vector_db, new_chunks, ids)
+            if not ids:
+                return vector_db
+        texts, metadatas = self._split_chunks(new_chunks)
+        embeddings = self.embedding_model.embed_documents(texts)
+        ids = vector_db.add_embeddings(list(zip(texts, embeddings)), metadatas, ids)
+        self._maybe_upgrade_index(vector_db)
         if self.persist_path:
-            self.save(vector_db)
+            if self._manifest is None:
+                # Nothing on disk to append to yet, write a full snapshot.
+                self.save(vector_db)
+            else:
+                self._append_segment(vector_db, embeddings, ids)
         return vector_db
 
     def save(self, vector_db):
-        """Save the vector DB to disk."""
+        """
+        Save a full snapshot of the vector DB to disk as a single segment.
+
+        Raw vectors are reconstructed from the index, which is lossy for
+        IVF-PQ; snapshots written by `create` use the exact embeddings.
+        """
         if not self.persist_path:
             logging.warning("No persist_path set. Vector DB not saved.")
             return
-        path = Path(self.persist_path)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        vector_db.save_local(self.persist_path)
+        index = vector_db.index
+        if faiss.try_extract_index_ivf(index) is not None:
+            faiss.extract_index_ivf(index).make_direct_map()
+        vectors = index.reconstruct_n(0, index.ntotal)
+        ids = [vector_db.index_to_docstore_id[i] for i in range(len(vectors))]
+        self._write_snapshot(vector_db, vectors, ids)
+
+    def _write_snapshot(self, vector_db, vectors, ids):
+        if self._compaction_thread:
+            self._compaction_thread.join()
+        Path(self.persist_path).mkdir(parents=True, exist_ok=True)
+
+        with self._manifest_lock:
+            if self._manifest is None:
+                self._manifest = self._new_manifest(vector_db.index.d)
+            name = self._allocate_segment_name()
+        segment = self._write_segment(name, vectors, ids, vector_db.docstore)
+        base_index = self._write_base_index(name, vector_db.index)
+        with self._manifest_lock:
+            old_segments = self._manifest["segments"]
+            old_base_index = self._manifest.pop("index", None)
+            self._manifest["segments"] = [segment]
+            if base_index:
+                self._manifest["index"] = base_index
+            expired = self._retire(old_segments, old_base_index)
+            self._write_manifest(self._manifest)
+        self._delete_files(expired)
         logging.info(f"Vector DB saved at: {self.persist_path}")
 
-    def load(self):
-        """Load the vector DB from disk."""
+    def load(self, lazy: bool = settings.VECTOR_DB_LAZY_LOAD):
+        """
+        Load the vector DB from disk.
+
+        With `lazy`, the first segment's index is memory-mapped instead of
+        read into RAM (so the page cache is shared between processes) and
+        chunk text and metadata are read from disk on demand, making startup
+        time independent of the index size.
+        """
         if not self.persist_path or not Path(self.persist_path).exists():
             logging.warning("Vector DB file does not exist.")
             return None
         logging.info(f"Loading vector DB from: {self.persist_path}")
-        return FAISS.load_local(
+        manifest_path = Path(self.persist_path) / MANIFEST_NAME
+        if not manifest_path.exists():
+            return self._migrate_legacy()
+
+        with self._manifest_lock:
+            self._manifest = json.loads(manifest_path.read_text())
+            segments = list(self._manifest["segments"])
+            dimension = self._manifest["dimension"]
+            base_index = self._manifest.get("index")
+        if not self._covers_first_segment(base_index, segments):
+            base_index = None
+
+        if lazy:
+            return self._load_lazy(segments, dimension, base_index)
+
+        if base_index:
+            index = tune_index(self._read_index_file(base_index["name"]))
+            for segment in segments[1:]:
+                index.add(self._read_segment_vectors(segment))
+        else:
+            index = self._build_index_from_segments(segments, dimension)
+
+        docs, index_to_docstore_id = {}, {}
+        for segment in segments:
+            for doc_id, doc in self._read_segment_docs(segment):
+                index_to_docstore_id[len(index_to_docstore_id)] = doc_id
+                docs[doc_id] = doc
+        return FAISS(
+            self.embedding_model,
+            index,
+            InMemoryDocstore(docs),
+            index_to_docstore_id,
+        )
+
+    def _load_lazy(self, segments, dimension, base_index):
+        path = Path(self.persist_path)
+        if base_index:
+            base_file = base_index["name"]
+        elif self.index_type == "flat" and segments:
+            # A flat segment file is already a searchable flat index.
+            base_file = f"{segments[0]['name']}.faiss"
+        else:
+            base_file = None
+
+        if base_file:
+            base = faiss.read_index(
+                str(path / base_file), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+            )
+            delta = faiss.IndexFlatL2(dimension)
+            for segment in segments[1:]:
+                delta.add(self._read_segment_vectors(segment))
+            index = LayeredIndex(tune_index(base), delta)
+        else:
+            logging.info("No trained index on disk yet, building it in memory")
+            index = self._build_index_from_segments(segments, dimension)
+
+        segment_set = SegmentSet(
+            [SegmentReader(path / f"{s['name']}.jsonl") for s in segments]
+        )
+        return FAISS(
+            self.embedding_model,
+            index,
+            LazyDocstore(segment_set),
+            LazyIndexToDocstoreId(segment_set),
+        )
+
+    def vectors_for(self, vector_db, ids: list[str]):
+        """
+        The stored vectors of `ids`, read back from the index without
+        re-embedding, or None if the index cannot reconstruct them (e.g. an
+        IVF index without a direct map) or an id is not indexed.
+        """
+        mapping = vector_db.index_to_docstore_id
+        if hasattr(mapping, "position_of"):
+            positions = [mapping.position_of(i) for i in ids]
+        else:
+            lookup = self._position_lookup(mapping)
+            positions = [lookup.get(i) for i in ids]
+        if not ids or None in positions:
+            return None
+        try:
+            return np.vstack([vector_db.index.reconstruct(int(p)) for p in positions])
+        except RuntimeError:
+            return None
+
+    def _position_lookup(self, mapping):
+        """
+        Reverse of an in-memory `index_to_docstore_id`, kept between calls
+        and extended with the positions added since, as ids are only ever
+        appended. A different mapping (e.g. after `load`) starts a new one.
+        """
+        if self._positions_of is not mapping:
+            self._positions_of, self._positions = mapping, {}
+        for position in range(len(self._positions), len(mapping)):
+            self._positions[mapping[position]] = position
+        return self._positions
+
+    def _covers_first_segment(self, base_index, segments):
+        """True if `base_index` is a usable trained index for `segments[0]`."""
+        return bool(
+            base_index
+            and base_index["type"] == self.index_type
+            and segments
+            and base_index["segment"] == segments[0]["name"]
+        )
+
+    def _build_index_from_segments(self, segments, dimension):
+        vectors = np.concatenate(
+            [self._read_segment_vectors(s) for s in segments]
+            or [np.empty((0, dimension), dtype=np.float32)]
+        )
+        index = self._build_index(dimension, vectors)
+        index.add(vectors)
+        return index
+
+    def _build_index(self, dimension, vectors):
+        return build_index(
+            dimension, vectors, self.index_type, min_train_size=self.min_train_size
+        )
+
+    def compact(self, wait: bool = False):
+        """Merge all current segments into one in a background thread."""
+        if self._compaction_thread and self._compaction_thread.is_alive():
+            if wait:
+                self._compaction_thread.join()
+            return
+        self._compaction_thread = threading.Thread(
+            target=self._compact, name="vector-db-compaction", daemon=True
+        )
+        self._compaction_thread.start()
+        if wait:
+            self._compaction_thread.join()
+
+    @contextmanager
+    def deferred_compaction(self):
+        """
+        Hold back compaction while appending many segments (e.g. one per
+        batch of a large ingest) and compact once on exit if still needed.
+        """
+        with self._manifest_lock:
+            self._compaction_deferred += 1
+        try:
+            yield
+        finally:
+            with self._manifest_lock:
+                self._compaction_deferred -= 1
+                due = (
+                    not self._compaction_deferred
+                    and self._manifest is not None
+                    and len(self._manifest["segments"]) > self.max_segments
+                )
+            if due:
+                self.compact()
+
+    def _compact(self):
+        with self._manifest_lock:
+            merged = list(self._manifest["segments"])
+            dimension = self._manifest["dimension"]
+            if len(merged) < 2:
+                return
+            name = self._allocate_segment_name()
+        logging.info(f"Compacting {len(merged)} vector DB segments")
+
+        vectors = np.concatenate([self._read_segment_vectors(s) for s in merged])
+        ids, docs = [], {}
+        for segment in merged:
+            for doc_id, doc in self._read_segment_docs(segment):
+                ids.append(doc_id)
+                docs[doc_id] = doc
+        segment = self._write_segment(name, vectors, ids, InMemoryDocstore(docs))
+
+        base_index = None
+        if self.index_type != "flat":
+            index = self._build_index(dimension, vectors)
+            index.add(vectors)
+            base_index = self._write_base_index(name, index)
+
+        with self._manifest_lock:
+            # Keep segments appended while we were merging.
+            appended = self._manifest["segments"][len(merged) :]
+            self._manifest["segments"] = [segment] + appended
+            old_base_index = self._manifest.pop("index", None)
+            if base_index:
+                self._manifest["index"] = base_index
+            expired = self._retire(merged, old_base_index)
+            self._write_manifest(self._manifest)
+        self._delete_files(expired)
+        logging.info("Vector DB compaction finished")
+
+    def _append_segment(self, vector_db, embeddings, ids):
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        with self._manifest_lock:
+            name = self._allocate_segment_name()
+        segment = self._write_segment(name, vectors, ids, vector_db.docstore)
+        with self._manifest_lock:
+            self._manifest["segments"].append(segment)
+            self._write_manifest(self._manifest)
+            due = (
+                len(self._manifest["segments"]) > self.max_segments
+                and not self._compaction_deferred
+            )
+        logging.info(f"Appended {len(ids)} vectors to: {self.persist_path}")
+        if due:
+            self.compact()
+
+    def _maybe_upgrade_index(self, vector_db):
+        """Swap a flat index for the configured type once it can be trained."""
+        index = vector_db.index
+        if self.index_type == "flat" or index_type_of(index) != "flat":
+            return
+        if index.ntotal < min_train_size_for(self.index_type, self.min_train_size):
+            return
+        vectors = index.reconstruct_n(0, index.ntotal)
+        upgraded = self._build_index(index.d, vectors)
+        upgraded.add(vectors)
+        vector_db.index = upgraded
+        logging.info(f"Rebuilt vector index as {self.index_type}")
+
+    def _migrate_legacy(self):
+        """Convert a `save_local` directory into the segment layout."""
+        if not (Path(self.persist_path) / LEGACY_INDEX_NAME).exists():
+            logging.warning("Vector DB file does not exist.")
+            return None
+        logging.info("Migrating legacy vector DB to segment layout")
+        vector_db = FAISS.load_local(
             self.persist_path,
             self.embedding_model,
             allow_dangerous_deserialization=True,
         )
+        self.save(vector_db)
+        return vector_db
+
+    def _new_manifest(self, dimension: int):
+        return {"version": 1, "dimension": dimension, "next_segment": 0, "segments": []}
+
+    def _allocate_segment_name(self):
+        """Reserve the next segment name. Caller must hold the manifest lock."""
+        name = f"segment-{self._manifest['next_segment']:06d}"
+        self._manifest["next_segment"] += 1
+        return name
+
+    def _write_segment(self, name, vectors, ids, docstore):
+        """Write vectors and their documents as a new immutable segment."""
+        path = Path(self.persist_path)
+        index = faiss.IndexFlatL2(vectors.shape[1])
+        index.add(np.ascontiguousarray(vectors, dtype=np.float32))
+        faiss.write_index(index, str(path / f"{name}.faiss"))
+        offsets = [0]
+        with open(path / f"{name}.jsonl", "wb") as f:
+            for doc_id in ids:
+                doc = docstore.search(doc_id)
+                record = {
+                    "id": doc_id,
+                    "page_content": doc.page_content,
+                    "metadata": doc.metadata,
+                }
+                line = (json.dumps(record) + "\n").encode("utf-8")
+                f.write(line)
+                offsets.append(offsets[-1] + len(line))
+        write_segment_lookup(path / f"{name}.jsonl", offsets, ids)
+        return {"name": name, "count": len(ids)}
+
+    def _write_manifest(self, manifest):
+        path = Path(self.persist_path) / MANIFEST_NAME
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(manifest, indent=2))
+        os.replace(tmp_path, path)
+
+    def _write_base_index(self, name, index):
+        """Persist a trained approximate index covering segment `name`."""
+        index_type = index_type_of(index)
+        if index_type == "flat":
+            return None
+        file_name = f"{name}.index"
+        faiss.write_index(index, str(Path(self.persist_path) / file_name))
+        return {"name": file_name, "segment": name, "type": index_type}
+
+    def _read_index_file(self, file_name):
+        return faiss.read_index(str(Path(self.persist_path) / file_name))
+
+    def _read_segment_vectors(self, segment):
+        index = self._read_index_file(f"{segment['name']}.faiss")
+        return index.reconstruct_n(0, index.ntotal)
+
+    def _read_segment_docs(self, segment):
+        path = Path(self.persist_path) / f"{segment['name']}.jsonl"
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                yield record["id"], Document(
+                    id=record["id"],
+                    page_content=record["page_content"],
+                    metadata=record["metadata"],
+                )
+
+    def _retire(self, segments, base_index=None):
+        """
+        Record the files of replaced `segments` in the manifest and return
+        those retired by the previous swap, now two manifests old.
+        Caller must hold the manifest lock and write the manifest.
+        """
+        files = [
+            f"{s['name']}{suffix}" for s in segments for suffix in SEGMENT_SUFFIXES
+        ]
+        if base_index:
+            files.append(base_index["name"])
+        expired = self._manifest.get("retired", [])
+        self._manifest["retired"] = files
+        return expired
+
+    def _delete_files(self, names):
+        path = Path(self.persist_path)
+        for name in names:
+            (path / name).unlink(missing_ok=True)
+
+    @staticmethod
+    def _drop_indexed(vector_db, chunks, ids):
+        """Leave out chunks whose id is indexed or repeated within `ids`."""
+        seen = {i for i in ids if isinstance(vector_db.docstore.search(i), Document)}
+        kept_chunks, kept_ids = [], []
+        for chunk, doc_id in zip(chunks, ids, strict=True):
+            if doc_id not in seen:
+                seen.add(doc_id)
+                kept_chunks.append(chunk)
+                kept_ids.append(doc_id)
+        if len(kept_ids) < len(ids):
+            logging.warning(
+                f"Skipping {len(ids) - len(kept_ids)} chunks already in the vector DB"
+            )
+        return kept_chunks, kept_ids
+
+    @staticmethod
+    def _split_chunks(chunks):
+        return [c.page_content for c in chunks], [c.metadata for c in chunks]
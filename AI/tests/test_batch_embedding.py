@@ -0,0 +1,114 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from AI.similarity_search_pipeline import batch_embedding
+from AI.similarity_search_pipeline.batch_embedding import (
+    BatchedEmbeddings,
+    is_rate_limited,
+)
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+class FakeClient(Embeddings):
+    """Embeds "text <i>" as [i]; earlier batches finish last."""
+
+    def __init__(self, rate_limited=0, error=None):
+        self.batches = []
+        self.rate_limited = rate_limited
+        self.error = error
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self._lock:
+            self.batches.append(list(texts))
+            if self.error:
+                raise self.error
+            if self.rate_limited:
+                self.rate_limited -= 1
+                raise RateLimited("slow down")
+        first = int(texts[0].split()[1])
+        time.sleep(0.02 / (1 + first))
+        return [[float(text.split()[1])] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def texts(n, padding=""):
+    return [f"text {i}{padding}" for i in range(n)]
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(batch_embedding, "time", SimpleNamespace(sleep=delays.append))
+    return delays
+
+
+def test_results_keep_input_order_across_batches():
+    client = FakeClient()
+    embeddings = BatchedEmbeddings(client, batch_size=3, max_concurrency=4)
+    vectors = embeddings.embed_documents(texts(20))
+
+    assert vectors == [[float(i)] for i in range(20)]
+    assert len(client.batches) == 7
+    assert sorted(t for batch in client.batches for t in batch) == sorted(texts(20))
+
+
+def test_batches_respect_the_count_and_size_caps():
+    embeddings = BatchedEmbeddings(
+        FakeClient(), batch_size=4, max_batch_chars=50, max_concurrency=2
+    )
+    batches = embeddings.make_batches(texts(10, padding="x" * 10))
+    assert [t for batch in batches for t in batch] == texts(10, padding="x" * 10)
+    assert all(len(batch) <= 4 for batch in batches)
+    assert all(sum(map(len, batch)) <= 50 for batch in batches)
+    # Small inputs are spread over the workers.
+    assert [len(b) for b in embeddings.make_batches(texts(4))] == [2, 2]
+    assert embeddings.make_batches([]) == []
+
+
+def test_rate_limited_batch_is_retried_with_backoff(sleeps):
+    client = FakeClient(rate_limited=3)
+    embeddings = BatchedEmbeddings(
+        client, max_concurrency=1, max_retries=3, backoff=0.5
+    )
+    assert embeddings.embed_documents(texts(2)) == [[0.0], [1.0]]
+
+    assert len(client.batches) == 4
+    assert len(sleeps) == 3
+    for attempt, delay in enumerate(sleeps):
+        # Exponential, with up to 100% jitter.
+        assert 0.5 * 2**attempt <= delay <= 1.0 * 2**attempt
+
+
+def test_rate_limiting_beyond_max_retries_is_raised(sleeps):
+    embeddings = BatchedEmbeddings(
+        FakeClient(rate_limited=5), max_concurrency=1, max_retries=2
+    )
+    with pytest.raises(RateLimited):
+        embeddings.embed_documents(texts(2))
+    assert len(sleeps) == 2
+
+
+def test_other_errors_are_not_retried(sleeps):
+    client = FakeClient(error=ValueError("bad input"))
+    with pytest.raises(ValueError):
+        BatchedEmbeddings(client, max_concurrency=1).embed_documents(texts(2))
+    assert len(client.batches) == 1
+    assert sleeps == []
+
+
+def test_is_rate_limited_reads_the_status_code():
+    assert is_rate_limited(RateLimited())
+    response_error = Exception()
+    response_error.response = SimpleNamespace(status_code=429)
+    assert is_rate_limited(response_error)
+    assert not is_rate_limited(ValueError())
@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from AI.Summarizer import bulk_summarizer, topic_summarizer
+from AI.Summarizer.response_cache import SummaryCache
+
+
+@pytest.fixture
+def fake_chain(monkeypatch):
+    calls = []
+    running = {"now": 0, "max": 0}
+
+    async def fake_llm(inputs):
+        calls.append(inputs["sci_topic"])
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        await asyncio.sleep(0.01)
+        running["now"] -= 1
+        if inputs["sci_topic"] == "broken":
+            raise RuntimeError("quota exceeded")
+        return AIMessage(
+            content=f"Summary of {inputs['sci_topic']}",
+            usage_metadata={"input_tokens": 10, "output_tokens": 5, "total_tokens": 15},
+        )
+
+    chain = RunnableLambda(fake_llm)
+    monkeypatch.setattr(topic_summarizer, "get_chain", lambda: chain)
+    topic_summarizer.response_cache.clear()
+    yield calls, running
+    topic_summarizer.response_cache.clear()
+
+
+def test_bulk_dedupes_and_reports_partial_failures(fake_chain):
+    calls, _ = fake_chain
+    topics = ["Deep Learning", "deep learning", "broken", "CRISPR"]
+    results = bulk_summarizer.summarize_topics(topics)
+
+    assert sorted(calls) == ["CRISPR", "Deep Learning", "broken"]
+    assert [r["topic"] for r in results] == topics
+    assert results[0]["summary"] == results[1]["summary"] == "Summary of Deep Learning"
+    assert results[0]["tokens"] == 15
+    assert results[2]["summary"] is None
+    assert "quota exceeded" in results[2]["error"]
+    assert results[3]["error"] is None
+    assert all(r["latency_s"] is not None for r in results)
+
+    # Successful topics are cached, the failed one is retried.
+    calls.clear()
+    results = bulk_summarizer.summarize_topics(topics)
+    assert calls == ["broken"]
+    assert results[0]["cached"] and results[3]["cached"]
+
+
+def test_bulk_respects_max_concurrency(fake_chain):
+    _, running = fake_chain
+    topics = [f"topic {i}" for i in range(20)]
+    results = bulk_summarizer.summarize_topics(topics, max_concurrency=3)
+    assert all(r["error"] is None for r in results)
+    assert running["max"] == 3
+
+
+def test_semantic_cache_lookups_run_concurrently(fake_chain, monkeypatch):
+    def slow_embed(topic):
+        time.sleep(0.1)
+        return np.eye(8)[int(topic[-1])]
+
+    monkeypatch.setattr(
+        topic_summarizer,
+        "response_cache",
+        SummaryCache(semantic_threshold=0.9, embed=slow_embed),
+    )
+    bulk_summarizer.summarize_topics([f"topic {i}" for i in range(8)])
+
+    start = time.perf_counter()
+    results = bulk_summarizer.summarize_topics([f"subject {i}" for i in range(8)])
+    assert all(r["cached"] for r in results)
+    assert topic_summarizer.response_cache.stats()["semantic_hits"] == 8
+    # Eight 0.1 s embeddings, overlapped on worker threads.
+    assert time.perf_counter() - start < 0.5
+
+
+def test_token_budget_waits_for_the_window():
+    async def run():
+        budget = bulk_summarizer.TokenBudget(tokens_per_minute=100, window=0.2)
+        start = time.monotonic()
+        await budget.acquire(60)
+        await budget.acquire(60)
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.2
@@ -0,0 +1,29 @@
+from AI.similarity_search_pipeline.dedupe import IngestRegistry, chunk_ids_for, hash_pdf
+
+
+def test_hash_depends_only_on_content(tmp_path):
+    first, copy, other = (tmp_path / name for name in ("a.pdf", "b.pdf", "c.pdf"))
+    first.write_bytes(b"%PDF-1.4 same")
+    copy.write_bytes(b"%PDF-1.4 same")
+    other.write_bytes(b"%PDF-1.4 different")
+    assert hash_pdf(str(first)) == hash_pdf(str(copy), block_size=3)
+    assert hash_pdf(str(first)) != hash_pdf(str(other))
+
+
+def test_chunk_ids_are_derived_from_the_digest():
+    assert chunk_ids_for("abc", 3) == ["abc:0", "abc:1", "abc:2"]
+    assert chunk_ids_for("abc", 0) == []
+
+
+def test_registry_persists_across_instances(tmp_path):
+    path = str(tmp_path / "registry" / "ingested.sqlite")
+    registry = IngestRegistry(path)
+    assert registry.get("abc") is None
+    registry.add("abc", "paper.pdf", chunk_ids_for("abc", 2))
+
+    reopened = IngestRegistry(path)
+    assert reopened.get("abc") == ["abc:0", "abc:1"]
+    reopened.add("abc", "copy.pdf", chunk_ids_for("abc", 1))
+    assert reopened.get("abc") == ["abc:0"]
+    reopened.remove("abc")
+    assert IngestRegistry(path).get("abc") is None
@@ -0,0 +1,88 @@
+import sqlite3
+
+import numpy as np
+
+from AI.similarity_search_pipeline.embedding_cache import (
+    CachedEmbeddings,
+    EmbeddingStore,
+)
+
+
+def vec(x: float) -> list[float]:
+    return [x, x + 1, x + 2]
+
+
+def test_lru_order_survives_restart(tmp_path):
+    store = EmbeddingStore(str(tmp_path), capacity=3)
+    store.put_many({"a": vec(1), "b": vec(2), "c": vec(3)})
+    store.get_many(["a"])
+    store.get_many(["b"])
+
+    # After a restart, touching "c" must make it newer than "a" and "b".
+    store = EmbeddingStore(str(tmp_path), capacity=3)
+    store.get_many(["c"])
+    store.put_many({"d": vec(4)})
+    assert set(store.get_many(["a", "b", "c", "d"])) == {"b", "c", "d"}
+
+
+def test_stores_sharing_a_directory_never_share_slots(tmp_path):
+    first = EmbeddingStore(str(tmp_path), capacity=4)
+    second = EmbeddingStore(str(tmp_path), capacity=4)
+    first.put_many({"a": vec(1)})
+    second.put_many({"b": vec(2)})
+    first.put_many({"c": vec(3)})
+
+    for store in (first, second):
+        found = store.get_many(["a", "b", "c"])
+        assert {k: v.tolist() for k, v in found.items()} == {
+            "a": vec(1),
+            "b": vec(2),
+            "c": vec(3),
+        }
+    assert len(first) == 3
+
+
+def test_eviction_across_stores_keeps_vectors_consistent(tmp_path):
+    first = EmbeddingStore(str(tmp_path), capacity=2)
+    second = EmbeddingStore(str(tmp_path), capacity=2)
+    first.put_many({"a": vec(1), "b": vec(2)})
+    second.put_many({"c": vec(3)})  # evicts "a" in both views
+
+    found = first.get_many(["a", "b", "c"])
+    assert {k: v.tolist() for k, v in found.items()} == {"b": vec(2), "c": vec(3)}
+
+
+def test_shrinking_capacity_drops_out_of_range_slots(tmp_path):
+    store = EmbeddingStore(str(tmp_path), capacity=4)
+    store.put_many({k: vec(i) for i, k in enumerate("abcd")})
+
+    store = EmbeddingStore(str(tmp_path), capacity=2)
+    conn = sqlite3.connect(tmp_path / "index.sqlite")
+    assert conn.execute("SELECT MAX(slot) FROM entries").fetchone()[0] < 2
+    assert len(store) == 2
+
+    store.put_many({"e": vec(4)})
+    found = store.get_many(list("abcde"))
+    assert len(found) == 2
+    assert found["e"].tolist() == vec(4)
+    for key, vector in found.items():
+        assert vector.tolist() == vec("abcde".index(key))
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [vec(len(text)) for text in texts]
+
+
+def test_cached_embeddings_only_embed_misses(tmp_path):
+    model = FakeModel()
+    cached = CachedEmbeddings(model, "fake", EmbeddingStore(str(tmp_path), capacity=10))
+    assert cached.embed_documents(["x", "yy"]) == [vec(1), vec(2)]
+    assert cached.embed_documents(["yy", "zzz", "zzz"]) == [vec(2), vec(3), vec(3)]
+    assert model.calls == [["x", "yy"], ["zzz"]]
+    assert cached.stats()["hits"] == 2
+    assert np.isclose(cached.stats()["hit_rate"], 2 / 5)
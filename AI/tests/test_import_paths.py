@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+AI_DIR = Path(__file__).resolve().parents[1]
+
+
+def run_outside_ai(tmp_path, code: str):
+    """Run `code` with only the repository root on the path, elsewhere."""
+    env = {**os.environ, "PYTHONPATH": str(AI_DIR.parent)}
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+
+def test_embedding_module_imports_without_app_env_in_cwd(tmp_path):
+    result = run_outside_ai(
+        tmp_path,
+        "import AI.similarity_search_pipeline.embedding as e\n"
+        "from AI.config import settings\n"
+        "from AI.similarity_search_pipeline import config\n"
+        "assert config.settings is settings\n"
+        "assert e.ENV_FILE.parent.name == 'AI'\n"
+        "assert settings.VECTOR_DB_PATH.is_absolute()\n"
+        "assert settings.INGEST_REGISTRY_PATH.is_absolute()\n"
+        "assert settings.EMBEDDING_CACHE_PATH.is_absolute()\n",
+    )
+    assert result.returncode == 0, result.stderr
+    assert not (tmp_path / "data").exists()
+
+
+def test_pipeline_imports_from_outside_ai(tmp_path):
+    pytest.importorskip("docling")
+    result = run_outside_ai(tmp_path, "import AI.similarity_search_pipeline.pipeline")
+    assert result.returncode == 0, result.stderr
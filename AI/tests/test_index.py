@@ -0,0 +1,98 @@
+import faiss
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from AI.similarity_search_pipeline import vector_db
+from AI.similarity_search_pipeline.vector_db import (
+    INDEX_TYPES,
+    VectorDB,
+    build_index,
+    index_type_of,
+    tune_index,
+)
+
+DIMENSION = 8
+
+
+def random_vectors(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((n, DIMENSION), dtype=np.float32)
+
+
+@pytest.mark.parametrize("index_type", INDEX_TYPES)
+def test_built_index_finds_the_same_neighbours_as_flat(index_type):
+    vectors = random_vectors(400)
+    index = build_index(DIMENSION, vectors, index_type, min_train_size=100)
+    index.add(vectors)
+    assert index_type_of(index) == index_type
+
+    exact = faiss.IndexFlatL2(DIMENSION)
+    exact.add(vectors)
+    queries = vectors[:50]
+    _, expected = exact.search(queries, 5)
+    _, found = index.search(queries, 5)
+    recall = np.mean(
+        [len(set(e) & set(f)) / 5 for e, f in zip(expected, found, strict=True)]
+    )
+    assert recall >= 0.9
+
+
+def built_type(n_vectors, index_type, **kwargs):
+    return index_type_of(
+        build_index(DIMENSION, random_vectors(n_vectors), index_type, **kwargs)
+    )
+
+
+def test_too_few_vectors_stay_flat():
+    assert built_type(150, "ivf_flat", min_train_size=200) == "flat"
+    # PQ k-means needs 256 points whatever the configured minimum.
+    assert built_type(150, "ivf_pq", min_train_size=10) == "flat"
+    with pytest.raises(ValueError):
+        built_type(150, "annoy")
+
+
+def test_min_train_size_setting_is_read_at_call_time(monkeypatch):
+    monkeypatch.setattr(vector_db.settings, "VECTOR_INDEX_MIN_TRAIN_SIZE", 100)
+    assert built_type(150, "ivf_flat") == "ivf_flat"
+
+
+def test_tune_index_sets_the_search_knobs():
+    ivf = build_index(DIMENSION, random_vectors(300), "ivf_flat", min_train_size=100)
+    assert tune_index(ivf, nprobe=3).nprobe == 3
+    hnsw = tune_index(faiss.IndexHNSWFlat(DIMENSION, 16), ef_search=40)
+    assert hnsw.hnsw.efSearch == 40
+
+
+@pytest.mark.parametrize("index_type", ["ivf_flat", "hnsw"])
+def test_flat_index_is_upgraded_and_round_trips(tmp_path, index_type):
+    manager = VectorDB(
+        DeterministicFakeEmbedding(size=DIMENSION),
+        persist_path=str(tmp_path),
+        index_type=index_type,
+        min_train_size=100,
+    )
+    texts = [f"chunk {i}" for i in range(160)]
+    docs = [Document(page_content=text, metadata={}) for text in texts]
+    ids = [f"doc:{i}" for i in range(160)]
+    db = manager.create(docs[:60], ids[:60])
+    if index_type != "hnsw":
+        assert index_type_of(db.index) == "flat"
+    db = manager.add_docs(db, docs[60:], ids[60:])
+    assert index_type_of(db.index) == index_type
+
+    def top_ids(store):
+        return [[d.id for d in store.similarity_search(t, k=3)] for t in texts[::16]]
+
+    expected = top_ids(db)
+    for lazy in (False, True):
+        reloaded = manager.load(lazy=lazy)
+        assert index_type_of(reloaded.index) == index_type
+        assert top_ids(reloaded) == expected
+
+    # A snapshot keeps the trained index, which lazy loading memory-maps.
+    manager.save(db)
+    reloaded = manager.load(lazy=True)
+    assert index_type_of(reloaded.index) == index_type
+    assert top_ids(reloaded) == expected
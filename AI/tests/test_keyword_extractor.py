@@ -0,0 +1,91 @@
+import asyncio
+import importlib.util
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+MODULE_PATH = (
+    Path(__file__).resolve().parents[1]
+    / "Extraction_engine"
+    / "v1.keyword_extractor.py"
+)
+
+
+class FakeKeyBERT:
+    """Ranks a document's words by first occurrence, with KeyBERT's quirks."""
+
+    def __init__(self):
+        self.calls = []
+
+    def extract_keywords(self, docs, top_n=5, **kwargs):
+        self.calls.append((list(docs), top_n))
+        keywords = [
+            [(word, 1 / (rank + 1)) for rank, word in enumerate(doc.split()[:top_n])]
+            for doc in docs
+        ]
+        if not any(keywords):
+            return []
+        return keywords[0] if len(docs) == 1 else keywords
+
+
+@pytest.fixture
+def keybert():
+    return FakeKeyBERT()
+
+
+@pytest.fixture
+def extractor(keybert):
+    # The module name has dots in it, so it cannot be imported normally.
+    spec = importlib.util.spec_from_file_location("keyword_extractor", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.kw_model = SimpleNamespace(get=lambda: keybert)
+    return module
+
+
+def test_single_document_result_is_unwrapped_once(extractor):
+    assert extractor.extract_keywords("graph colouring theory", top_n=2) == [
+        {"keyword": "graph", "score": 1.0},
+        {"keyword": "colouring", "score": 0.5},
+    ]
+
+
+def test_batch_returns_one_result_per_text(extractor, keybert):
+    results = extractor.extract_keywords_batch(["graph theory", "", "proteins"], 1)
+    assert results == [
+        [{"keyword": "graph", "score": 1.0}],
+        [],
+        [{"keyword": "proteins", "score": 1.0}],
+    ]
+    assert len(keybert.calls) == 1
+
+
+def test_texts_without_candidates_give_empty_results(extractor):
+    assert extractor.extract_keywords_batch([]) == []
+    assert extractor.extract_keywords_batch(["", " "]) == [[], []]
+    assert extractor.extract_keywords("") == []
+
+
+def test_concurrent_requests_share_one_batch(extractor, keybert):
+    texts = [("graph theory", 2), ("protein folding", 2), ("deep nets", 1)]
+
+    async def run():
+        results = await asyncio.gather(
+            *(extractor.aextract_keywords(text, top_n) for text, top_n in texts)
+        )
+        await extractor.keyword_batcher.close()
+        return results
+
+    results = asyncio.run(run())
+    assert [[k["keyword"] for k in keywords] for keywords in results] == [
+        ["graph", "theory"],
+        ["protein", "folding"],
+        ["deep"],
+    ]
+    assert extractor.keyword_batcher.batches == 1
+    # One KeyBERT call per distinct top_n within the batch.
+    assert sorted(keybert.calls) == [
+        (["deep nets"], 1),
+        (["graph theory", "protein folding"], 2),
+    ]
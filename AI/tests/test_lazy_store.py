@@ -0,0 +1,71 @@
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from AI.similarity_search_pipeline.lazy_store import (
+    LayeredIndex,
+    LazyDocstore,
+    ReadOnlyStoreError,
+    SegmentReader,
+)
+from AI.similarity_search_pipeline.vector_db import VectorDB
+
+TEXTS = ["alpha", "beta", "gamma", "delta", "epsilon"]
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = VectorDB(DeterministicFakeEmbedding(size=8), persist_path=str(tmp_path))
+    vector_db = manager.create(
+        [Document(page_content=t, metadata={"n": i}) for i, t in enumerate(TEXTS[:3])],
+        ["doc:0", "doc:1", "doc:2"],
+    )
+    manager.add_docs(
+        vector_db,
+        [Document(page_content=t, metadata={}) for t in TEXTS[3:]],
+        ["more:0", "more:1"],
+    )
+    return manager
+
+
+def test_lazy_load_answers_like_eager_load(manager):
+    eager = manager.load(lazy=False)
+    lazy = manager.load(lazy=True)
+    assert isinstance(lazy.index, LayeredIndex)
+    assert isinstance(lazy.docstore, LazyDocstore)
+
+    for query in TEXTS:
+        expected = eager.similarity_search_with_score(query, k=3)
+        found = lazy.similarity_search_with_score(query, k=3)
+        assert [(d.id, d.page_content, d.metadata) for d, _ in found] == [
+            (d.id, d.page_content, d.metadata) for d, _ in expected
+        ]
+    assert [lazy.index_to_docstore_id[p] for p in range(5)] == [
+        eager.index_to_docstore_id[p] for p in range(5)
+    ]
+
+
+def test_documents_added_after_lazy_load_are_searchable_and_saved(manager):
+    vector_db = manager.load(lazy=True)
+    vector_db = manager.add_docs(
+        vector_db, [Document(page_content="zeta", metadata={})], ["late:0"]
+    )
+    assert vector_db.similarity_search("zeta", k=1)[0].id == "late:0"
+    assert vector_db.index_to_docstore_id.position_of("late:0") == 5
+    with pytest.raises(ReadOnlyStoreError):
+        vector_db.docstore.delete(["late:0"])
+
+    reloaded = manager.load(lazy=True)
+    assert reloaded.get_by_ids(["late:0"])[0].page_content == "zeta"
+
+
+def test_segment_lookup_is_rebuilt_when_missing(manager, tmp_path):
+    jsonl = sorted(tmp_path.glob("segment-*.jsonl"))[0]
+    for suffix in (".offsets.npy", ".idkeys.npy", ".idpos.npy"):
+        jsonl.with_suffix(suffix).unlink()
+
+    reader = SegmentReader(jsonl)
+    assert len(reader) == 3
+    assert reader.position_of("doc:2") == 2
+    assert reader.position_of("missing") is None
+    assert reader.document(1).page_content == "beta"
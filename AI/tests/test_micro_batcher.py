@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from AI.Extraction_engine.micro_batcher import MicroBatcher
+
+
+def test_concurrent_items_share_a_batch():
+    calls = []
+
+    def double(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(double, max_batch_size=8, max_wait_ms=20)
+
+    async def run():
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        await batcher.close()
+        return results
+
+    assert asyncio.run(run()) == [0, 2, 4, 6, 8]
+    assert calls == [[0, 1, 2, 3, 4]]
+    assert batcher.mean_batch_size == 5
+
+
+def test_full_batch_is_flushed_without_waiting():
+    batcher = MicroBatcher(lambda items: items, max_batch_size=2, max_wait_ms=10_000)
+
+    async def run():
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(i) for i in range(4))), timeout=5
+        )
+        await batcher.close()
+        return results
+
+    assert asyncio.run(run()) == [0, 1, 2, 3]
+    assert batcher.batches == 2
+
+
+def test_batch_exception_reaches_every_caller():
+    def fail(items):
+        raise RuntimeError("model crashed")
+
+    batcher = MicroBatcher(fail, max_wait_ms=20)
+
+    async def run():
+        results = await asyncio.gather(
+            *(batcher.submit(i) for i in range(3)), return_exceptions=True
+        )
+        await batcher.close()
+        return results
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(run()))
+
+
+def test_short_result_list_fails_every_caller():
+    batcher = MicroBatcher(lambda items: items[:-1], max_wait_ms=20)
+
+    async def run():
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                *(batcher.submit(i) for i in range(3)), return_exceptions=True
+            ),
+            timeout=5,
+        )
+        await batcher.close()
+        return results
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+    with pytest.raises(ValueError, match="2 results for 3 items"):
+        raise results[0]
@@ -0,0 +1,51 @@
+"""
+Parity of the int8 ONNX backend with fp32 PyTorch: every sentence embedding
+must keep a cosine similarity of at least PARITY_THRESHOLD with the fp32 one.
+
+Downloads and exports the models on first run; skipped unless
+`sentence-transformers[onnx]` is installed.
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("onnxruntime")
+pytest.importorskip("optimum.onnxruntime")
+
+from AI.config import settings
+from AI.models import (
+    KEYWORD_MODEL_NAME,
+    QUERY_EMBEDDING_MODEL_NAME,
+    load_sentence_transformer,
+)
+
+PARITY_THRESHOLD = 0.98
+SENTENCES = [
+    "CRISPR gene editing in humans",
+    "Attention is all you need: the Transformer architecture",
+    "Protein structure prediction with deep learning",
+    "Quantum error correction with surface codes",
+    "How can artificial intelligence improve medical diagnosis and data analysis?",
+    "Climate sensitivity estimates from paleoclimate records",
+]
+
+
+@pytest.fixture(autouse=True)
+def onnx_model_dir(tmp_path_factory, monkeypatch):
+    path = tmp_path_factory.getbasetemp() / "onnx_models"
+    monkeypatch.setattr(settings, "ONNX_MODEL_DIR", path)
+
+
+@pytest.mark.parametrize("name", [KEYWORD_MODEL_NAME, QUERY_EMBEDDING_MODEL_NAME])
+@pytest.mark.parametrize("backend", ["onnx", "onnx_int8"])
+def test_onnx_matches_fp32(name, backend):
+    reference = load_sentence_transformer(name, backend="torch")
+    candidate = load_sentence_transformer(name, backend=backend)
+
+    expected = reference.encode(SENTENCES, normalize_embeddings=True)
+    actual = candidate.encode(SENTENCES, normalize_embeddings=True)
+
+    assert actual.shape == expected.shape
+    cosine = np.sum(expected * actual, axis=1)
+    assert cosine.min() >= PARITY_THRESHOLD, dict(zip(SENTENCES, cosine, strict=True))
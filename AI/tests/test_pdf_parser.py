@@ -0,0 +1,104 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("docling")
+
+from docling_core.types.doc.document import PictureItem, TableItem, TextItem
+
+from AI.similarity_search_pipeline import pdf_parser
+
+
+def test_failed_converter_does_not_use_up_the_pool(monkeypatch):
+    def broken(**kwargs):
+        raise RuntimeError("model download failed")
+
+    pool = pdf_parser.ConverterPool(size=1, num_threads=1)
+    monkeypatch.setattr(pdf_parser, "DocumentConverter", broken)
+    with pytest.raises(RuntimeError), pool.converter():
+        pass
+
+    monkeypatch.setattr(pdf_parser, "DocumentConverter", lambda **kwargs: "converter")
+    with pool.converter() as converter:
+        assert converter == "converter"
+
+
+def at_page(item_type, page_no, **fields):
+    return item_type.model_construct(prov=[SimpleNamespace(page_no=page_no)], **fields)
+
+
+class Table(TableItem):
+    def export_to_markdown(self, doc=None):
+        return "| a | b |"
+
+
+class Picture(PictureItem):
+    def get_image(self, doc):
+        return SimpleNamespace(save=lambda path, fmt: Path(path).write_bytes(b"png"))
+
+
+class FakeDocument:
+    def iterate_items(self):
+        items = [
+            at_page(TextItem, 1, text="Introduction"),
+            at_page(Table, 1),
+            at_page(Picture, 2),
+            at_page(TextItem, 2, text="Results"),
+            TextItem.model_construct(prov=[], text="furniture"),
+        ]
+        return [(item, 0) for item in items]
+
+    def num_pages(self):
+        return 2
+
+
+class FakeConverter:
+    created = 0
+
+    def __init__(self, **kwargs):
+        FakeConverter.created += 1
+        self.converted = []
+
+    def convert(self, path):
+        self.converted.append(path)
+        return SimpleNamespace(document=FakeDocument())
+
+
+@pytest.fixture
+def fake_docling(monkeypatch, tmp_path):
+    FakeConverter.created = 0
+    monkeypatch.setattr(pdf_parser, "DocumentConverter", FakeConverter)
+    monkeypatch.setattr(pdf_parser.settings, "PDF_IMAGES_PATH", tmp_path / "images")
+    pdf_parser.configure_converter_pool(1, 1)
+
+
+def test_docling_pages_groups_items_by_page(tmp_path):
+    pages = pdf_parser.docling_pages(FakeDocument(), "paper.pdf", tmp_path)
+    assert [p.page_content for p in pages] == ["Introduction\n\n| a | b |", "Results"]
+    assert [p.metadata["page"] for p in pages] == [0, 1]
+    assert pages[0].metadata["tables"] == 1
+    assert pages[1].metadata["images"] == [str(tmp_path / "paper_figure_1.png")]
+    assert (tmp_path / "paper_figure_1.png").read_bytes() == b"png"
+
+
+def test_documents_reuse_the_pooled_converter(fake_docling, tmp_path):
+    paths = [str(tmp_path / name) for name in ("a.pdf", "b.pdf")]
+    for path in paths:
+        assert len(pdf_parser.parsePDF(path, withImages=True)) == 2
+
+    assert FakeConverter.created == 1
+    with pdf_parser.get_converter_pool().converter() as converter:
+        assert converter.converted == paths
+
+
+def test_figures_default_to_the_images_dir_not_the_pdf_dir(fake_docling, tmp_path):
+    path = tmp_path / "papers" / "a.pdf"
+    pages = pdf_parser.parsePDF(str(path), withImages=True)
+    figure = Path(pages[1].metadata["images"][0])
+    assert figure.parent == pdf_parser.images_dir_for(str(path))
+    assert figure.is_relative_to(tmp_path / "images")
+    assert not (tmp_path / "papers").exists()
+
+    pages = pdf_parser.parsePDF(str(path), str(tmp_path / "out"), withImages=True)
+    assert pages[1].metadata["images"] == [str(tmp_path / "out/images/a_figure_1.png")]
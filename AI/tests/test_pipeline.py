@@ -0,0 +1,179 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("docling")
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from AI.similarity_search_pipeline import pipeline as pipeline_module
+from AI.similarity_search_pipeline.dedupe import chunk_ids_for, hash_pdf
+
+
+def fake_pages(path, outputdir=None, withImages=False):
+    """One page per paragraph of the "PDF", which is plain text here."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    for page, paragraph in enumerate(text.split("\n\n")):
+        if paragraph == "broken":
+            raise ValueError("unreadable PDF")
+        yield Document(page_content=paragraph, metadata={"source": path, "page": page})
+
+
+def fake_parse(path, outputdir=None, withImages=False):
+    return list(fake_pages(path, outputdir, withImages))
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    settings = pipeline_module.settings
+    monkeypatch.setattr(settings, "VECTOR_DB_PATH", tmp_path / "vector_db")
+    monkeypatch.setattr(settings, "INGEST_REGISTRY_PATH", tmp_path / "ingested.sqlite")
+    monkeypatch.setattr(
+        pipeline_module,
+        "get_embedding_model",
+        lambda model, purpose="chunks": DeterministicFakeEmbedding(size=8),
+    )
+    monkeypatch.setattr(pipeline_module, "parsePDF", fake_parse)
+    monkeypatch.setattr(pipeline_module, "iter_pages", fake_pages)
+    # Workers share the patched parser instead of re-importing it.
+    monkeypatch.setattr(pipeline_module, "ProcessPoolExecutor", ThreadPoolExecutor)
+    return pipeline_module.SemanticSearchPipeline()
+
+
+def write_pdf(directory, name, text):
+    path = directory / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_add_pdfs_reports_added_skipped_and_failed(pipeline, tmp_path):
+    first = write_pdf(tmp_path, "first.pdf", "Graph theory.\n\nColourings.")
+    copy = write_pdf(tmp_path, "copy.pdf", "Graph theory.\n\nColourings.")
+    second = write_pdf(tmp_path, "second.pdf", "Protein folding.")
+    broken = write_pdf(tmp_path, "broken.pdf", "broken")
+    missing = str(tmp_path / "missing.pdf")
+    progress = []
+
+    report = pipeline.add_pdfs(
+        [first, copy, second, broken, missing],
+        max_workers=2,
+        on_progress=lambda *args: progress.append(args),
+    )
+
+    assert sorted(report["added"]) == [first, second]
+    assert report["skipped"] == [copy]
+    assert set(report["failed"]) == {broken, missing}
+    assert "unreadable PDF" in report["failed"][broken]
+
+    # Called once per parsed PDF, counting the ones settled up front.
+    assert sorted(done for done, *_ in progress) == [3, 4, 5]
+    assert {path for _, _, path, _ in progress} == {first, second, broken}
+    assert all(total == 5 for _, total, _, _ in progress)
+    errors = {path: error for _, _, path, error in progress}
+    assert isinstance(errors[broken], ValueError)
+    assert errors[first] is None
+
+    ids = chunk_ids_for(hash_pdf(first), 2)
+    assert pipeline.registry.get(hash_pdf(first)) == ids
+    assert [d.page_content for d in pipeline.vector_db.get_by_ids(ids)] == [
+        "Graph theory.",
+        "Colourings.",
+    ]
+
+    report = pipeline.add_pdfs([first, copy, second], max_workers=2)
+    assert report == {"added": [], "skipped": [first, copy, second], "failed": {}}
+
+
+def test_add_pdfs_flushes_every_batch_size_pdfs(pipeline, tmp_path, monkeypatch):
+    paths = [write_pdf(tmp_path, f"{i}.pdf", f"Paper {i}.") for i in range(5)]
+    flushed = []
+    flush_batch = pipeline._flush_batch
+
+    def spy(pending, report):
+        flushed.append(sorted(path for path, _, _ in pending))
+        flush_batch(pending, report)
+
+    monkeypatch.setattr(pipeline, "_flush_batch", spy)
+    report = pipeline.add_pdfs(paths, max_workers=2, batch_size=2)
+
+    assert [len(batch) for batch in flushed] == [2, 2, 1]
+    assert sorted(path for batch in flushed for path in batch) == paths
+    assert sorted(report["added"]) == paths
+    assert pipeline.vector_db.index.ntotal == 5
+    # One index write per batch.
+    manifest = json.loads((tmp_path / "vector_db" / "manifest.json").read_text())
+    assert [s["count"] for s in manifest["segments"]] == [2, 2, 1]
+    assert pipeline.vector_manager.load().index.ntotal == 5
+
+
+def long_text(pages):
+    sentence = "Spectral methods bound the chromatic number of sparse graphs. "
+    return "\n\n".join(f"Page {page}. " + sentence * 12 for page in range(pages))
+
+
+def test_streaming_and_whole_document_ingest_agree(pipeline, tmp_path, monkeypatch):
+    path = write_pdf(tmp_path, "paper.pdf", long_text(4))
+    whole_ids = pipeline.add_pdf(path)
+    whole = [d.page_content for d in pipeline.vector_db.get_by_ids(whole_ids)]
+
+    monkeypatch.setattr(
+        pipeline_module.settings, "VECTOR_DB_PATH", tmp_path / "streamed"
+    )
+    monkeypatch.setattr(
+        pipeline_module.settings, "INGEST_REGISTRY_PATH", tmp_path / "streamed.sqlite"
+    )
+    streaming = pipeline_module.SemanticSearchPipeline()
+    streamed_ids = streaming.add_pdf_streaming(path, batch_size=3)
+    streamed = [d.page_content for d in streaming.vector_db.get_by_ids(streamed_ids)]
+
+    assert len(whole_ids) > 4
+    assert streamed_ids == whole_ids
+    assert streamed == whole
+    assert streaming.add_pdf_streaming(path) == whole_ids  # already ingested
+
+
+def test_streaming_parser_error_reaches_the_caller(pipeline, tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline_module.settings, "STREAM_QUEUE_SIZE", 1)
+    path = write_pdf(tmp_path, "paper.pdf", long_text(3) + "\n\nbroken")
+    with pytest.raises(ValueError, match="unreadable PDF"):
+        pipeline.add_pdf_streaming(path, batch_size=1)
+    assert pipeline.registry.get(hash_pdf(path)) is None
+
+
+def test_streaming_indexing_error_does_not_hang_the_producer(
+    pipeline, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(pipeline_module.settings, "STREAM_QUEUE_SIZE", 1)
+
+    def full(chunks, chunk_ids):
+        raise RuntimeError("index full")
+
+    monkeypatch.setattr(pipeline, "_index_chunks", full)
+    path = write_pdf(tmp_path, "paper.pdf", long_text(20))
+    with pytest.raises(RuntimeError, match="index full"):
+        pipeline.add_pdf_streaming(path, batch_size=1)
+    assert pipeline.registry.get(hash_pdf(path)) is None
+
+
+def test_extract_keywords_reuses_the_indexed_vectors(pipeline, tmp_path, monkeypatch):
+    path = write_pdf(tmp_path, "paper.pdf", long_text(2))
+    pipeline.add_pdf(path)
+    chunk_model = pipeline.embedding_model
+    embedded = []
+    embed_documents = DeterministicFakeEmbedding.embed_documents
+
+    def spy(model, texts):
+        if model is chunk_model:
+            embedded.extend(texts)
+        return embed_documents(model, texts)
+
+    # Pydantic models refuse instance attributes, so spy on the class.
+    monkeypatch.setattr(DeterministicFakeEmbedding, "embed_documents", spy)
+    keywords = pipeline.extract_keywords(path, top_n=3)
+
+    assert len(keywords) == 3
+    assert all(set(k) == {"keyword", "score"} for k in keywords)
+    assert embedded == []  # the chunks were not re-encoded
@@ -0,0 +1,94 @@
+import zlib
+
+import numpy as np
+import pytest
+from keybert import KeyBERT
+from langchain_core.embeddings import Embeddings
+from sklearn.feature_extraction.text import CountVectorizer
+
+from AI.Extraction_engine.precomputed_keywords import (
+    KEYPHRASE_NGRAM_RANGE,
+    STOP_WORDS,
+    LangchainEmbedder,
+    document_embedding,
+    extract_keywords_precomputed,
+)
+
+TEXT = (
+    "Graph colouring assigns colours to the vertices of a graph. Spectral "
+    "methods bound the chromatic number of sparse graphs, and greedy "
+    "colouring gives an upper bound on the chromatic number."
+)
+
+
+class BagOfWordsEmbeddings(Embeddings):
+    """Hashed bag of words, so texts sharing words embed close together."""
+
+    def __init__(self, size=64):
+        self.size = size
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+    def _embed(self, text):
+        vector = np.zeros(self.size, dtype=np.float32)
+        for word in text.lower().split():
+            vector[zlib.crc32(word.strip(".,").encode()) % self.size] += 1
+        return vector.tolist()
+
+
+def plain_keybert(text, embeddings, top_n, max_candidates):
+    vectorizer = CountVectorizer(
+        ngram_range=KEYPHRASE_NGRAM_RANGE,
+        stop_words=STOP_WORDS,
+        max_features=max_candidates,
+    )
+    keywords = KeyBERT(model=LangchainEmbedder(embeddings)).extract_keywords(
+        text, vectorizer=vectorizer, use_mmr=True, diversity=0.7, top_n=top_n
+    )
+    return [{"keyword": kw, "score": float(score)} for kw, score in keywords]
+
+
+@pytest.mark.parametrize("top_n", [1, 5])
+def test_matches_keybert_encoding_the_text(top_n):
+    embeddings = BagOfWordsEmbeddings()
+    expected = plain_keybert(TEXT, embeddings, top_n, max_candidates=40)
+
+    # Scale does not change cosine similarity, so the normalized mean of a
+    # single chunk vector stands in for the whole-document embedding.
+    doc_embedding = document_embedding([embeddings.embed_query(TEXT)])
+    keywords = extract_keywords_precomputed(
+        TEXT, doc_embedding, embeddings, top_n=top_n, max_candidates=40
+    )
+
+    assert len(keywords) == top_n
+    assert [k["keyword"] for k in keywords] == [k["keyword"] for k in expected]
+    np.testing.assert_allclose(
+        [k["score"] for k in keywords], [k["score"] for k in expected], atol=1e-4
+    )
+
+
+def test_only_candidates_are_embedded():
+    embeddings = BagOfWordsEmbeddings()
+    doc_embedding = document_embedding(np.ones((3, embeddings.size)))
+    extract_keywords_precomputed(TEXT, doc_embedding, embeddings, max_candidates=10)
+
+    assert TEXT not in embeddings.embedded
+    assert len(embeddings.embedded) == 10
+    assert all(len(phrase.split()) <= 3 for phrase in embeddings.embedded)
+
+
+def test_text_without_candidates_has_no_keywords():
+    embeddings = BagOfWordsEmbeddings()
+    assert extract_keywords_precomputed("the and of", np.ones(4), embeddings) == []
+    assert embeddings.embedded == []
+
+
+def test_document_embedding_is_the_normalized_mean():
+    np.testing.assert_allclose(document_embedding([[3, 0], [3, 8]]), [0.6, 0.8])
+    np.testing.assert_array_equal(document_embedding([[0, 0]]), [0, 0])
@@ -0,0 +1,159 @@
+import numpy as np
+
+from AI.Extraction_engine import query_embedding_cache
+from AI.Extraction_engine.query_embedding_cache import QueryEmbeddingCache
+
+
+class FakeRedis:
+    def __init__(self, fail=False):
+        self.data = {}
+        self.fail = fail
+
+    def mget(self, keys):
+        if self.fail:
+            raise ConnectionError("redis down")
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.writes = {}
+
+    def set(self, key, value, ex=None):
+        self.writes[key] = value
+
+    def execute(self):
+        if self.redis.fail:
+            raise ConnectionError("redis down")
+        self.redis.data.update(self.writes)
+
+
+def embed(query):
+    return [float(len(query)), 1.0]
+
+
+def embed_many(queries):
+    return [embed(query) for query in queries]
+
+
+def test_normalized_queries_share_one_entry():
+    cache = QueryEmbeddingCache("model")
+    calls = []
+
+    def compute(query):
+        calls.append(query)
+        return embed(query)
+
+    first = cache.get_or_compute("deep  learning", compute)
+    second = cache.get_or_compute(" deep learning", compute)
+    assert calls == ["deep learning"]
+    assert np.array_equal(first, second)
+    assert cache.stats()["local_hits"] == 1
+
+
+def test_redis_tier_is_shared_between_workers():
+    redis = FakeRedis()
+    QueryEmbeddingCache("model", redis).get_or_compute("graphs", embed)
+
+    def never(query):
+        raise AssertionError("should come from Redis")
+
+    other_worker = QueryEmbeddingCache("model", redis)
+    assert other_worker.get_or_compute("graphs", never).tolist() == embed("graphs")
+    assert other_worker.stats()["redis_hits"] == 1
+    # Another model never reads these vectors.
+    assert QueryEmbeddingCache("other", redis).key("graphs") not in redis.data
+
+
+def test_lru_keeps_the_most_recent_queries():
+    cache = QueryEmbeddingCache("model", maxsize=2)
+    for query in ("a", "b", "a", "c"):
+        cache.get_or_compute(query, embed)
+    assert cache.stats()["size"] == 2
+    assert cache.stats()["misses"] == 3
+    cache.get_or_compute("a", embed)
+    assert cache.stats()["misses"] == 3
+
+
+def test_failures_are_not_cached():
+    cache = QueryEmbeddingCache("model")
+
+    def fail(query):
+        raise RuntimeError("model down")
+
+    assert cache.get_or_compute("q", fail) is None
+    assert cache.get_or_compute("q", embed).tolist() == embed("q")
+    assert cache.stats()["failures"] == 1
+
+
+def test_redis_errors_fall_back_to_computing():
+    cache = QueryEmbeddingCache("model", FakeRedis(fail=True))
+    assert cache.get_or_compute("q", embed).tolist() == embed("q")
+    assert cache.stats()["redis_errors"] == 2
+
+
+def test_batch_computes_each_missing_query_once():
+    cache = QueryEmbeddingCache("model")
+    cache.get_or_compute("known", embed)
+    calls = []
+
+    def compute(queries):
+        calls.append(list(queries))
+        return embed_many(queries)
+
+    vectors = cache.get_or_compute_many(["known", "new", "new "], compute)
+    assert calls == [["new"]]
+    assert [v.tolist() for v in vectors] == embed_many(["known", "new", "new"])
+
+
+def reject_empty(query):
+    if not query.strip("?"):
+        raise ValueError("nothing to embed")
+    return embed(query)
+
+
+def test_rejected_queries_are_cached_for_the_negative_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(query_embedding_cache.time, "time", lambda: now[0])
+    redis = FakeRedis()
+    cache = QueryEmbeddingCache("model", redis, negative_ttl=60)
+
+    assert cache.get_or_compute("?", reject_empty) is None
+
+    def never(query):
+        raise AssertionError("should come from the cache")
+
+    assert cache.get_or_compute("?", never) is None
+    assert redis.data[cache.key("?")] == b""
+    # Other workers see the failure through Redis.
+    assert QueryEmbeddingCache("model", redis).get_or_compute("?", never) is None
+    assert cache.stats()["negative_hits"] == 1
+    assert cache.stats()["failures"] == 1
+
+    now[0] += 61
+    redis.data.clear()  # expired there too
+    assert cache.get_or_compute("?", embed).tolist() == embed("?")
+
+
+def test_one_rejected_query_does_not_fail_its_batch():
+    cache = QueryEmbeddingCache("model", FakeRedis())
+    calls = []
+
+    def compute(queries):
+        calls.append(list(queries))
+        return [reject_empty(query) for query in queries]
+
+    vectors = cache.get_or_compute_many(["graphs", "?", "proteins"], compute)
+    assert vectors[1] is None
+    assert [vectors[0].tolist(), vectors[2].tolist()] == embed_many(
+        ["graphs", "proteins"]
+    )
+    assert calls == [["graphs", "?", "proteins"], ["graphs"], ["?"], ["proteins"]]
+
+    calls.clear()
+    vectors = cache.get_or_compute_many(["?", "graphs"], compute)
+    assert vectors[0] is None and calls == []
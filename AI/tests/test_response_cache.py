@@ -0,0 +1,71 @@
+import numpy as np
+
+from AI.Summarizer import response_cache
+from AI.Summarizer.response_cache import SummaryCache
+
+VECTORS = {
+    "neural networks": [1.0, 0.0, 0.0],
+    "neural nets": [0.99, 0.1, 0.0],
+    "protein folding": [0.0, 1.0, 0.0],
+    "graph theory": [0.0, 0.0, 1.0],
+}
+
+
+def semantic_cache(**kwargs):
+    return SummaryCache(
+        semantic_threshold=0.95, embed=lambda topic: np.array(VECTORS[topic]), **kwargs
+    )
+
+
+def test_exact_hit_ignores_case_and_whitespace():
+    cache = SummaryCache()
+    cache.put("Neural  Networks", "ctx", "summary", tokens=100)
+    assert cache.get("neural networks ", "ctx") == "summary"
+    assert cache.get("neural networks", "other ctx") is None
+    stats = cache.stats()
+    assert (stats["exact_hits"], stats["misses"], stats["saved_tokens"]) == (1, 1, 100)
+
+
+def test_semantic_hit_needs_a_close_topic_and_the_same_context():
+    cache = semantic_cache()
+    cache.put("neural networks", "ctx", "summary", tokens=50)
+    assert cache.get("neural nets", "ctx") == "summary"
+    assert cache.get("neural nets", "other ctx") is None
+    assert cache.get("protein folding", "ctx") is None
+    assert cache.stats()["semantic_hits"] == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "time", lambda: now[0])
+    cache = semantic_cache(ttl=60)
+    cache.put("neural networks", "ctx", "summary")
+
+    now[0] += 59
+    assert cache.get("neural networks", "ctx") == "summary"
+    now[0] += 2
+    assert cache.get("neural networks", "ctx") is None
+    assert cache.get("neural nets", "ctx") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SummaryCache(maxsize=2)
+    cache.put("neural networks", "ctx", "a")
+    cache.put("protein folding", "ctx", "b")
+    cache.get("neural networks", "ctx")
+    cache.put("graph theory", "ctx", "c")
+
+    assert cache.get("protein folding", "ctx") is None
+    assert cache.get("neural networks", "ctx") == "a"
+    assert cache.get("graph theory", "ctx") == "c"
+
+
+def test_semantic_hit_counts_as_recent_use():
+    cache = semantic_cache(maxsize=2)
+    cache.put("neural networks", "ctx", "a")
+    cache.put("protein folding", "ctx", "b")
+    assert cache.get("neural nets", "ctx") == "a"
+    cache.put("graph theory", "ctx", "c")
+
+    assert cache.get("neural networks", "ctx") == "a"
+    assert cache.get("protein folding", "ctx") is None
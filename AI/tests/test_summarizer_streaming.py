@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from AI.Summarizer import topic_summarizer
+from AI.Summarizer.response_cache import SummaryCache
+
+SUMMARY = "Deep learning stacks many layers of neural networks."
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content=SUMMARY)] * 5))
+    monkeypatch.setattr(
+        topic_summarizer, "get_chain", lambda: topic_summarizer.chat_prompt | llm
+    )
+    topic_summarizer.response_cache.clear()
+    yield llm
+    topic_summarizer.response_cache.clear()
+
+
+async def collect(stream, limit=None):
+    parts = []
+    async for part in stream:
+        parts.append(part)
+        if len(parts) == limit:
+            break
+    await stream.aclose()
+    return parts
+
+
+def test_astream_yields_incrementally_and_caches(fake_llm):
+    parts = asyncio.run(collect(topic_summarizer.astream_summary("Deep Learning")))
+    assert len(parts) > 1
+    assert "".join(parts) == SUMMARY
+
+    # Served from the cache in one piece the second time.
+    parts = asyncio.run(collect(topic_summarizer.astream_summary("deep learning")))
+    assert parts == [SUMMARY]
+
+
+def test_closed_stream_is_not_cached(fake_llm):
+    parts = asyncio.run(collect(topic_summarizer.astream_summary("CRISPR"), limit=2))
+    assert len(parts) == 2
+    assert topic_summarizer.response_cache.get("CRISPR") is None
+
+
+def test_semantic_cache_does_not_block_the_event_loop(fake_llm, monkeypatch):
+    def slow_embed(topic):
+        time.sleep(0.2)
+        return [1.0, 0.0]
+
+    monkeypatch.setattr(
+        topic_summarizer,
+        "response_cache",
+        SummaryCache(semantic_threshold=0.9, embed=slow_embed),
+    )
+
+    async def main():
+        ticks = 0
+        stream = asyncio.create_task(
+            collect(topic_summarizer.astream_summary("Deep Learning"))
+        )
+        while not stream.done():
+            await asyncio.sleep(0.01)
+            ticks += 1
+        return await stream, ticks
+
+    parts, ticks = asyncio.run(main())
+    assert "".join(parts) == SUMMARY
+    # Storing the summary embeds the topic for 0.2 s, off the loop.
+    assert ticks >= 10
+    assert topic_summarizer.response_cache.stats()["size"] == 1
+
+
+def test_text_of_handles_str_and_blocks():
+    assert topic_summarizer.text_of("plain") == "plain"
+    blocks = [
+        {"type": "text", "text": "Hello "},
+        {"type": "thinking", "thinking": "..."},
+        {"type": "text", "text": "world"},
+    ]
+    assert topic_summarizer.text_of(blocks) == "Hello world"
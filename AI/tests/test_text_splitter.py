@@ -0,0 +1,29 @@
+from langchain_core.documents import Document
+
+from AI.similarity_search_pipeline.text_splitter import iter_chunks, split_text
+
+
+def pages(n):
+    sentence = "Spectral methods bound the chromatic number of sparse graphs. "
+    return [
+        Document(page_content=f"Page {i}. " + sentence * 12, metadata={"page": i})
+        for i in range(n)
+    ]
+
+
+def test_iter_chunks_matches_split_text():
+    whole = split_text(pages(3))
+    streamed = list(iter_chunks(iter(pages(3))))
+    assert len(whole) > 3
+    assert [(c.page_content, c.metadata) for c in streamed] == [
+        (c.page_content, c.metadata) for c in whole
+    ]
+
+
+def test_iter_chunks_is_lazy():
+    def one_page_then_fail():
+        yield from pages(1)
+        raise AssertionError("read past the first page")
+
+    chunks = iter_chunks(one_page_then_fail())
+    assert next(chunks).metadata == {"page": 0}
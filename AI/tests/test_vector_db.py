@@ -0,0 +1,154 @@
+import json
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from AI.similarity_search_pipeline.vector_db import SEGMENT_SUFFIXES, VectorDB
+
+
+def chunks(*texts):
+    return [
+        Document(page_content=text, metadata={"n": i}) for i, text in enumerate(texts)
+    ]
+
+
+def ids_for(count, prefix="doc"):
+    return [f"{prefix}:{i}" for i in range(count)]
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return VectorDB(DeterministicFakeEmbedding(size=8), persist_path=str(tmp_path))
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_reingest_after_crash_adds_no_orphan_vectors(manager, lazy):
+    texts = ("alpha", "beta", "gamma", "delta")
+    # A crashed ingest indexed the first chunks but never reached the registry.
+    manager.create(chunks(*texts[:2]), ids_for(2))
+    vector_db = manager.load(lazy=lazy)
+
+    vector_db = manager.add_docs(vector_db, chunks(*texts), ids_for(4))
+    assert vector_db.index.ntotal == len(vector_db.index_to_docstore_id) == 4
+
+    reloaded = manager.load(lazy=lazy)
+    assert reloaded.index.ntotal == 4
+    assert [doc.page_content for doc in reloaded.get_by_ids(ids_for(4))] == list(texts)
+
+
+def test_adding_only_known_ids_writes_nothing(manager, tmp_path):
+    vector_db = manager.create(chunks("alpha", "beta"), ids_for(2))
+    segments = sorted(tmp_path.glob("segment-*"))
+
+    vector_db = manager.add_docs(vector_db, chunks("alpha", "beta"), ids_for(2))
+    assert vector_db.index.ntotal == 2
+    assert sorted(tmp_path.glob("segment-*")) == segments
+
+
+def test_duplicate_ids_within_a_batch_are_added_once(manager):
+    vector_db = manager.create(chunks("alpha"), ids_for(1))
+    vector_db = manager.add_docs(
+        vector_db, chunks("beta", "beta"), ["other:0", "other:0"]
+    )
+    assert vector_db.index.ntotal == 2
+
+
+def test_compaction_waits_for_the_end_of_a_deferred_block(manager, tmp_path):
+    manager.max_segments = 2
+    vector_db = manager.create(chunks("alpha"), ids_for(1))
+    with manager.deferred_compaction():
+        for i, text in enumerate(("beta", "gamma", "delta")):
+            vector_db = manager.add_docs(vector_db, chunks(text), [f"more:{i}"])
+        assert len(list(tmp_path.glob("segment-*.faiss"))) == 4
+
+    manager._compaction_thread.join()
+    assert len(manifest(tmp_path)["segments"]) == 1
+    assert manager.load().index.ntotal == 4
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_vectors_for_follows_added_documents(manager, lazy):
+    model = manager.embedding_model
+    manager.create(chunks("alpha", "beta"), ids_for(2))
+    vector_db = manager.load(lazy=lazy)
+    vectors = manager.vectors_for(vector_db, ["doc:1"])
+    assert np.allclose(vectors, [model.embed_query("beta")])
+
+    vector_db = manager.add_docs(vector_db, chunks("gamma"), ["more:0"])
+    vectors = manager.vectors_for(vector_db, ["more:0", "doc:0"])
+    expected = [model.embed_query("gamma"), model.embed_query("alpha")]
+    assert np.allclose(vectors, expected)
+    assert manager.vectors_for(vector_db, ["missing"]) is None
+
+
+def manifest(tmp_path):
+    return json.loads((tmp_path / "manifest.json").read_text())
+
+
+def test_each_write_appends_a_segment(manager, tmp_path):
+    vector_db = manager.create(chunks("alpha", "beta"), ids_for(2))
+    first = manifest(tmp_path)["segments"]
+    vector_db = manager.add_docs(vector_db, chunks("gamma"), ["more:0"])
+
+    segments = manifest(tmp_path)["segments"]
+    assert segments[0] == first[0]
+    assert [s["count"] for s in segments] == [2, 1]
+    reloaded = manager.load(lazy=False)
+    assert reloaded.index.ntotal == 3
+    assert reloaded.get_by_ids(["more:0"])[0].page_content == "gamma"
+    assert reloaded.get_by_ids(["doc:1"])[0].metadata == {"n": 1}
+
+
+def test_compaction_merges_segments_beyond_the_limit(manager, tmp_path):
+    manager.max_segments = 2
+    vector_db = manager.create(chunks("alpha"), ids_for(1))
+    for i, text in enumerate(("beta", "gamma")):
+        vector_db = manager.add_docs(vector_db, chunks(text), [f"more:{i}"])
+    manager.compact(wait=True)
+
+    assert [s["count"] for s in manifest(tmp_path)["segments"]] == [3]
+    reloaded = manager.load(lazy=False)
+    texts = [d.page_content for d in reloaded.get_by_ids(["doc:0", "more:0", "more:1"])]
+    assert texts == ["alpha", "beta", "gamma"]
+    assert reloaded.similarity_search("gamma", k=1)[0].page_content == "gamma"
+
+
+def test_compacted_segments_outlive_readers_of_the_old_manifest(manager, tmp_path):
+    vector_db = manager.create(chunks("alpha"), ids_for(1))
+    for i, text in enumerate(("beta", "gamma")):
+        vector_db = manager.add_docs(vector_db, chunks(text), [f"more:{i}"])
+    old_segments = [s["name"] for s in manifest(tmp_path)["segments"]]
+    # Another process loaded the store before the compaction.
+    reader = VectorDB(manager.embedding_model, str(tmp_path)).load(lazy=True)
+
+    manager.compact(wait=True)
+    for name in old_segments:
+        assert (tmp_path / f"{name}.jsonl").exists()
+    assert reader.similarity_search("gamma", k=1)[0].id == "more:1"
+    assert reader.get_by_ids(["doc:0"])[0].page_content == "alpha"
+
+    # The next compaction deletes them.
+    vector_db = manager.add_docs(vector_db, chunks("delta"), ["more:2"])
+    manager.compact(wait=True)
+    assert not any((tmp_path / f"{name}.jsonl").exists() for name in old_segments)
+    files = {path.name for path in tmp_path.glob("segment-*")}
+    assert files == set(manifest(tmp_path)["retired"]) | {
+        f"{s['name']}{suffix}"
+        for s in manifest(tmp_path)["segments"]
+        for suffix in SEGMENT_SUFFIXES
+    }
+    assert manager.load(lazy=True).index.ntotal == 4
+
+
+def test_legacy_save_local_directory_is_migrated(manager, tmp_path):
+    legacy = manager.create(chunks("alpha", "beta"), ids_for(2))
+    for path in tmp_path.iterdir():
+        path.unlink()
+    legacy.save_local(str(tmp_path))
+
+    vector_db = manager.load()
+    assert vector_db.index.ntotal == 2
+    assert manifest(tmp_path)["segments"][0]["count"] == 2
+    assert manager.load(lazy=False).get_by_ids(["doc:1"])[0].page_content == "beta"
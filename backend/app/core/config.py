@@ -9,6 +9,10 @@ class KeycloakSettings(BaseSettings):
     KEYCLOAK_CLIENT_SECRET: str = Field(validation_alias="AUTH_CLIENT_SECRET")
     KEYCLOAK_USERNAME: str
     KEYCLOAK_PASSWORD: str
+    KEYCLOAK_JWKS_TTL: float = 600.0  # seconds before signing keys are refetched
+    # Minimum seconds between refetches triggered by an unknown key id
+    KEYCLOAK_JWKS_REFETCH_INTERVAL: float = 30.0
+    KEYCLOAK_VERIFIED_TOKEN_CACHE_SIZE: int = 10_000  # verified tokens memoized
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -46,5 +50,51 @@ class RedisSettings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
 
+class SearchSettings(BaseSettings):
+    SEARCH_WORKERS: int = 4  # threads running embedding + FAISS lookups
+    SEARCH_QUEUE_SIZE: int = 16  # searches allowed to wait for a thread
+    SEARCH_TIMEOUT: float = 10.0  # seconds before a search returns 504
+    SEARCH_MAX_RESULTS: int = 100  # deepest page that can be requested
+
+    model_config = SettingsConfigDict(
+        env_file=".env", env_file_encoding="utf-8", extra="ignore"
+    )
+
+
+class ModelSettings(BaseSettings):
+    # Models loaded at startup; /ready reports 503 until they are resident,
+    # e.g. '["search_pipeline", "specter"]'. See AI/models.py for the names.
+    AI_WARMUP_MODELS: list[str] = []
+
+    model_config = SettingsConfigDict(
+        env_file=".env", env_file_encoding="utf-8", extra="ignore"
+    )
+
+
+class SessionSettings(BaseSettings):
+    # Seconds a worker may serve a session from memory; bounds how long a
+    # revocation can go unnoticed if its pub/sub message is lost.
+    SESSION_CACHE_TTL: float = 30.0
+    SESSION_CACHE_SIZE: int = 10_000  # sessions kept per worker
+    SESSION_INVALIDATION_CHANNEL: str = "session_invalidations"
+    # Cross-worker refresh lock; must outlast a Keycloak token request.
+    SESSION_REFRESH_LOCK_TTL: float = 10.0  # seconds
+    SESSION_REFRESH_POLL_INTERVAL: float = 0.05  # seconds between lock checks
+    # Background refresh: sessions whose access token expires within
+    # SESSION_REFRESH_LEAD seconds are refreshed ahead of time, unless idle.
+    SESSION_REFRESH_LEAD: float = 60.0
+    SESSION_REFRESH_INTERVAL: float = 5.0  # seconds between scheduler runs
+    SESSION_REFRESH_BATCH_SIZE: int = 100  # sessions picked per run
+    SESSION_REFRESH_CONCURRENCY: int = 10  # parallel Keycloak refreshes
+    SESSION_IDLE_TIMEOUT: float = 1800.0  # unused this long: refresh on demand
+
+    model_config = SettingsConfigDict(
+        env_file=".env", env_file_encoding="utf-8", extra="ignore"
+    )
+
+
 kcsettings = KeycloakSettings()  # type: ignore
 redis_settings = RedisSettings()  # type: ignore
+search_settings = SearchSettings()
+model_settings = ModelSettings()
+session_settings = SessionSettings()
@@ -1,23 +1,83 @@
-from fastapi import Request, Response, status
+from fastapi import status
 from fastapi.responses import JSONResponse
 from app.core.context import request_id_ctx
-from app.core.config import kcsettings
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.core import database as db
-from app.core import network as net
+from app.core.session_cache import session_cache
+from app.core.session_scheduler import session_scheduler
+from app.core.session_refresh import session_refresher, decode_access_token, is_fresh
 import json
 import uuid
 import logging
 import time
-import jwt
 
 logger = logging.getLogger("app.core.middleware")
 
 
-class PhantomTokenMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        auth_header = request.headers.get("Authorization")
+class RequestContextMiddleware:
+    """
+    Pure ASGI middleware doing, in order, what used to be three
+    BaseHTTPMiddleware layers:
+
+    - request id: taken from `X-Request-ID` or generated, stored in
+      `request.state.request_id` and `request_id_ctx`, echoed on the response
+    - phantom token: resolves `Authorization: Bearer <session>` to the
+      Keycloak session (from the worker's session cache, else Redis,
+      refreshing it if expired) and stores the user in `request.state`, or
+      answers 401/500 itself
+    - logging: one line per request with method, path, duration and status
+
+    Responses are passed through untouched, so streaming bodies stream.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.time()
+        headers = Headers(scope=scope)
+        req_id = headers.get("X-Request-ID") or str(uuid.uuid4())
+        state = scope.setdefault("state", {})
+        state["request_id"] = req_id
+        ctx_token = request_id_ctx.set(req_id)
+        status_code = None
+
+        async def send_with_context(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)["X-Request-ID"] = req_id
+            await send(message)
+
+        try:
+            early_response = await self.authenticate(headers, state)
+            if early_response is not None:
+                await early_response(scope, receive, send_with_context)
+            else:
+                await self.app(scope, receive, send_with_context)
+
+            # Logged before the reset so the line carries the request id.
+            process_time = (time.time() - start_time) * 1000
+            log_message = (
+                f"{scope['method']} {scope['path']} "
+                f"completed in {process_time:.2f}ms "
+                f"status {status_code}"
+            )
+            logger.info(log_message)
+        finally:
+            request_id_ctx.reset(ctx_token)
+
+    async def authenticate(self, headers: Headers, state: dict):
+        """
+        Fill `state` from the phantom token's session. Returns the error
+        response to send instead of calling the app, or None.
+        """
+        auth_header = headers.get("Authorization")
         phantom_token = None
 
         if auth_header and auth_header.startswith("Bearer "):
@@ -25,120 +85,61 @@ class PhantomTokenMiddleware(BaseHTTPMiddleware):
 
         # We let the route handler decide if it needs auth
         if not phantom_token:
-            return await call_next(request)
+            return None
+
+        cached = session_cache.get(phantom_token)
+        if cached is not None:
+            self.set_user(state, phantom_token, *cached)
+            session_scheduler.touch(phantom_token)
+            return None
 
         try:
             data_json = await db.redis_client.get(f"session:{phantom_token}")
 
             if not data_json:
-                resp = JSONResponse(
+                return JSONResponse(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     content={"detail": "Session expired or revoked"},
                 )
-                return resp
 
             session_data = json.loads(data_json)
-            session_data = await self.validate_session_data(session_data, phantom_token)
+            validated = await self.validate_session_data(session_data, phantom_token)
 
-            if session_data is None:
+            if validated is None:
                 await db.redis_client.delete(f"session:{phantom_token}")
-                response = JSONResponse(
+                return JSONResponse(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     content={"detail": "Session expired fully"},
                 )
-                return response
 
-            payload = jwt.decode(
-                session_data["access_token"], options={"verify_signature": False}
-            )
-            request.state.user = payload
-            request.state.user_id = payload.get("sub")
-            request.state.session_id = phantom_token
-            request.state.access_token = session_data["access_token"]
-            request.state.refresh_token = session_data["refresh_token"]
+            session_data, payload = validated
+            session_cache.put(phantom_token, session_data, payload)
+            self.set_user(state, phantom_token, session_data, payload)
+            session_scheduler.touch(phantom_token)
 
         except Exception as e:
-            print(f"Redis Error: {e}")
+            logger.error(f"Redis Error: {e}")
             return JSONResponse(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 content={"detail": "Internal server error"},
             )
+        return None
 
-        response = await call_next(request)
-        return response
+    @staticmethod
+    def set_user(state: dict, phantom_token: str, session_data: dict, payload: dict):
+        state["user"] = payload
+        state["user_id"] = payload.get("sub")
+        state["session_id"] = phantom_token
+        state["access_token"] = session_data["access_token"]
+        state["refresh_token"] = session_data["refresh_token"]
 
     async def validate_session_data(self, session_data, phantom_token):
-        try:
-            payload = jwt.decode(
-                session_data["access_token"], options={"verify_signature": False}
-            )
-            is_expired = False
-            # Check if current time > exp time
-            import time
-
-            if time.time() > payload["exp"]:
-                is_expired = True
-        except jwt.DecodeError:
-            is_expired = True
-
-        if is_expired:
-            refresh_response = await self.refresh_keycloak_token(
-                session_data["refresh_token"]
-            )
-            if refresh_response.status_code != 200:
-                logger.error(f"Keycloak refresh failed: {refresh_response.text}")
-                return None  # could not refresh, session is invalid
-            refresh_response = refresh_response.json()
-            session_data["access_token"] = refresh_response["access_token"]
-            session_data["refresh_token"] = refresh_response.get(
-                "refresh_token", session_data["refresh_token"]
-            )
-            await db.redis_client.setex(
-                f"session:{phantom_token}",
-                refresh_response.get("refresh_expires_in", 1800),
-                json.dumps(session_data),
-            )
-        return session_data
-
-    async def refresh_keycloak_token(self, refresh_token):
-        payload = {
-            "client_id": kcsettings.KEYCLOAK_CLIENT_ID,
-            "client_secret": kcsettings.KEYCLOAK_CLIENT_SECRET,
-            "grant_type": "refresh_token",
-            "refresh_token": refresh_token,
-        }
-        return await net.client.post(kcsettings.KEYCLOAK_TOKEN_URL, data=payload)
-
-
-class RequestIdMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app: ASGIApp):
-        super().__init__(app)
-
-    async def dispatch(self, request: Request, call_next):
-        """Attach a unique request id to each request and response."""
-        req_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
-        request.state.request_id = req_id
-        request_id_ctx.set(req_id)
-
-        response: Response = await call_next(request)
-
-        response.headers["X-Request-ID"] = req_id
-        return response
-
-
-class LoggingMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app: ASGIApp):
-        super().__init__(app)
-
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        response = await call_next(request)
-        process_time = (time.time() - start_time) * 1000
-
-        log_message = (
-            f"{request.method} {request.url.path} "
-            f"completed in {process_time:.2f}ms "
-            f"status {response.status_code}"
-        )
-        logger.info(log_message)
-        return response
+        """
+        Refresh the session if its access token expired. Returns the session
+        data and the decoded access token, or None if the refresh failed.
+        """
+        payload = decode_access_token(session_data)
+        if is_fresh(payload):
+            return session_data, payload
+        # Parallel requests on this session share one Keycloak refresh.
+        return await session_refresher.refresh(phantom_token)
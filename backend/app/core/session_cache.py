@@ -0,0 +1,106 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+
+from app.core.config import session_settings
+
+logger = logging.getLogger("app.core.session_cache")
+
+
+class SessionCache:
+    """
+    Per-worker cache of validated sessions: phantom token -> (session data,
+    decoded access token).
+
+    An entry lives for at most `ttl` seconds and never past the access
+    token's `exp`, after which the request goes back to Redis (and refreshes
+    the token). Logout publishes the revoked phantom tokens on a Redis
+    channel; every worker's `listen` task evicts them, so revocation is
+    immediate when pub/sub works and bounded by `ttl` when it does not.
+    """
+
+    def __init__(
+        self,
+        ttl: float = session_settings.SESSION_CACHE_TTL,
+        maxsize: int = session_settings.SESSION_CACHE_SIZE,
+        channel: str = session_settings.SESSION_INVALIDATION_CHANNEL,
+    ):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.channel = channel
+        self._entries: OrderedDict[str, tuple[float, dict, dict]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, phantom_token: str):
+        """The cached (session_data, payload), or None."""
+        entry = self._entries.get(phantom_token)
+        if entry is not None and entry[0] <= time.time():
+            del self._entries[phantom_token]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(phantom_token)
+        self.hits += 1
+        return entry[1], entry[2]
+
+    def put(self, phantom_token: str, session_data: dict, payload: dict):
+        expires_at = min(time.time() + self.ttl, payload.get("exp", 0))
+        if expires_at <= time.time():
+            return
+        self._entries[phantom_token] = (expires_at, session_data, payload)
+        self._entries.move_to_end(phantom_token)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def evict(self, phantom_tokens):
+        for phantom_token in phantom_tokens:
+            self._entries.pop(phantom_token, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    async def invalidate(self, redis_client, phantom_tokens):
+        """Evict the sessions here and tell the other workers to do the same."""
+        phantom_tokens = list(phantom_tokens)
+        if not phantom_tokens:
+            return
+        self.evict(phantom_tokens)
+        try:
+            await redis_client.publish(self.channel, json.dumps(phantom_tokens))
+        except Exception as e:  # noqa: BLE001 - best effort
+            # Other workers still drop the entries within `ttl`.
+            logger.error(f"Failed to publish session invalidation: {e}")
+
+    async def listen(self, redis_client, retry_delay: float = 1.0):
+        """Evict sessions revoked by other workers; runs until cancelled."""
+        while True:
+            try:
+                async with redis_client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    # Messages may have been missed while (re)connecting.
+                    self.clear()
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.evict(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # noqa: BLE001 - reconnect and keep listening
+                logger.error(f"Session invalidation listener failed: {e}")
+                self.clear()
+                await asyncio.sleep(retry_delay)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+        }
+
+
+session_cache = SessionCache()
@@ -0,0 +1,189 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+
+import jwt
+
+from app.core import database as db
+from app.core import network as net
+from app.core.config import kcsettings, session_settings
+
+logger = logging.getLogger("app.core.session_refresh")
+
+# Delete the lock only if this worker still holds it.
+RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+# Extend the lock only if this worker still holds it.
+EXTEND_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+# Sorted set of phantom tokens scored by when their access token is due for
+# a background refresh
+SESSION_REFRESH_DUE_KEY = "session_refresh_due"
+
+
+def refresh_margin(payload: dict, lead: float) -> float:
+    """
+    `lead`, capped at half the token's lifetime: a token living no longer
+    than `lead` would otherwise be due again as soon as it is refreshed.
+    """
+    if "iat" in payload:
+        return min(lead, (payload["exp"] - payload["iat"]) / 2)
+    return lead
+
+
+async def track_session(
+    redis_client,
+    phantom_token: str,
+    payload: dict,
+    lead: float = session_settings.SESSION_REFRESH_LEAD,
+):
+    due = payload["exp"] - refresh_margin(payload, lead)
+    await redis_client.zadd(SESSION_REFRESH_DUE_KEY, {phantom_token: due})
+
+
+async def untrack_sessions(redis_client, phantom_tokens):
+    phantom_tokens = list(phantom_tokens)
+    if phantom_tokens:
+        await redis_client.zrem(SESSION_REFRESH_DUE_KEY, *phantom_tokens)
+
+
+class SessionRefreshTimeout(Exception):
+    """Another worker held the refresh lock and never stored a new token."""
+
+
+def decode_access_token(session_data: dict) -> dict | None:
+    try:
+        return jwt.decode(
+            session_data["access_token"], options={"verify_signature": False}
+        )
+    except jwt.DecodeError:
+        return None
+
+
+def is_fresh(payload: dict | None, min_validity: float = 0.0) -> bool:
+    if payload is None:
+        return False
+    return payload["exp"] - time.time() > refresh_margin(payload, min_validity)
+
+
+class SessionRefresher:
+    """
+    Single-flight Keycloak token refresh for phantom-token sessions.
+
+    Within a worker, concurrent refreshes of one session share a single
+    task. Across workers, a short Redis lock (`SET NX PX`) elects the one
+    that calls Keycloak; the others poll the session in Redis until the new
+    token shows up. The winner re-reads the session after taking the lock,
+    so it always refreshes with the latest (rotated) refresh token and skips
+    the call when another worker has just refreshed.
+    """
+
+    def __init__(
+        self,
+        lock_ttl: float = session_settings.SESSION_REFRESH_LOCK_TTL,
+        poll_interval: float = session_settings.SESSION_REFRESH_POLL_INTERVAL,
+    ):
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+        self._in_flight: dict[str, asyncio.Task] = {}
+
+    async def refresh(self, phantom_token: str, min_validity: float = 0.0):
+        """
+        Make sure the session's access token is valid for more than
+        `min_validity` seconds (at most half its lifetime). Returns
+        (session_data, payload), or None if the session is gone or Keycloak
+        refused the refresh token.
+        """
+        task = self._in_flight.get(phantom_token)
+        if task is None:
+            task = asyncio.create_task(self._refresh(phantom_token, min_validity))
+            self._in_flight[phantom_token] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(phantom_token, None))
+        # A cancelled request must not cancel the refresh for the others.
+        return await asyncio.shield(task)
+
+    async def _refresh(self, phantom_token: str, min_validity: float):
+        lock_key = f"session_refresh_lock:{phantom_token}"
+        lock_id = str(uuid.uuid4())
+        # Long enough to take over a lock whose holder died.
+        deadline = time.monotonic() + 2 * self.lock_ttl
+        while True:
+            locked = await db.redis_client.set(
+                lock_key, lock_id, nx=True, px=int(self.lock_ttl * 1000)
+            )
+            if locked:
+                try:
+                    return await self._refresh_locked(phantom_token, min_validity)
+                finally:
+                    await db.redis_client.eval(RELEASE_LOCK, 1, lock_key, lock_id)
+
+            # Another worker is refreshing: wait for its token.
+            session = await self._read(phantom_token)
+            if session is None:
+                return None
+            if is_fresh(session[1], min_validity):
+                return session
+            if time.monotonic() > deadline:
+                raise SessionRefreshTimeout()
+            await asyncio.sleep(self.poll_interval)
+
+    async def _read(self, phantom_token: str):
+        data_json = await db.redis_client.get(f"session:{phantom_token}")
+        if not data_json:
+            return None
+        session_data = json.loads(data_json)
+        return session_data, decode_access_token(session_data)
+
+    async def _refresh_locked(self, phantom_token: str, min_validity: float):
+        session = await self._read(phantom_token)
+        if session is None or is_fresh(session[1], min_validity):
+            return session
+        session_data = session[0]
+
+        refresh_response = await self.refresh_keycloak_token(
+            session_data["refresh_token"]
+        )
+        if refresh_response.status_code != 200:
+            logger.error(f"Keycloak refresh failed: {refresh_response.text}")
+            return None  # could not refresh, session is invalid
+        refresh_response = refresh_response.json()
+        session_data["access_token"] = refresh_response["access_token"]
+        session_data["refresh_token"] = refresh_response.get(
+            "refresh_token", session_data["refresh_token"]
+        )
+        await db.redis_client.setex(
+            f"session:{phantom_token}",
+            refresh_response.get("refresh_expires_in", 1800),
+            json.dumps(session_data),
+        )
+        payload = jwt.decode(
+            session_data["access_token"], options={"verify_signature": False}
+        )
+        await track_session(db.redis_client, phantom_token, payload)
+        return session_data, payload
+
+    async def refresh_keycloak_token(self, refresh_token):
+        payload = {
+            "client_id": kcsettings.KEYCLOAK_CLIENT_ID,
+            "client_secret": kcsettings.KEYCLOAK_CLIENT_SECRET,
+            "grant_type": "refresh_token",
+            "refresh_token": refresh_token,
+        }
+        return await net.client.post(kcsettings.KEYCLOAK_TOKEN_URL, data=payload)
+
+
+session_refresher = SessionRefresher()
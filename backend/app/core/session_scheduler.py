@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import time
+import uuid
+
+from app.core import database as db
+from app.core.config import session_settings
+from app.core.session_refresh import (
+    EXTEND_LOCK,
+    RELEASE_LOCK,
+    SESSION_REFRESH_DUE_KEY,
+    session_refresher,
+    untrack_sessions,
+)
+
+logger = logging.getLogger("app.core.session_scheduler")
+
+# Sorted set of phantom tokens scored by when they were last used
+SESSION_ACTIVITY_KEY = "session_activity"
+SCHEDULER_LOCK_KEY = "session_refresh_scheduler"
+
+
+class SessionRefreshScheduler:
+    """
+    Refreshes active sessions shortly before their access token expires, so
+    requests rarely wait on Keycloak.
+
+    Sessions are indexed in a Redis sorted set by when they are due, `lead`
+    seconds (at most half the token's lifetime) before their access token
+    expires; the index is written at login and on every refresh. Each run
+    takes the due sessions, one batch at a time, and refreshes them through
+    the single-flight `session_refresher` with bounded concurrency. A Redis
+    lock, extended while a run lasts, lets one worker run at a time.
+
+    Sessions not used for `idle_timeout` seconds are dropped from the index
+    instead, so the scheduler never keeps an abandoned Keycloak session
+    alive; they are refreshed on demand if the user comes back. Workers
+    record usage in memory (`touch`) and flush it to Redis once per run.
+    """
+
+    def __init__(
+        self,
+        lead: float = session_settings.SESSION_REFRESH_LEAD,
+        interval: float = session_settings.SESSION_REFRESH_INTERVAL,
+        batch_size: int = session_settings.SESSION_REFRESH_BATCH_SIZE,
+        concurrency: int = session_settings.SESSION_REFRESH_CONCURRENCY,
+        idle_timeout: float = session_settings.SESSION_IDLE_TIMEOUT,
+        refresher=session_refresher,
+    ):
+        self.lead = lead
+        self.interval = interval
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.idle_timeout = idle_timeout
+        self.refresher = refresher
+        self._touched: set[str] = set()
+
+    def touch(self, phantom_token: str):
+        self._touched.add(phantom_token)
+
+    async def run(self):
+        """Refresh due sessions until cancelled."""
+        while True:
+            try:
+                picked = await self.run_once()
+            except Exception as e:  # noqa: BLE001 - retried on the next run
+                logger.error(f"Session refresh run failed: {e}")
+                picked = 0
+            # A full batch means more sessions are due right away.
+            if picked < self.batch_size:
+                await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> int:
+        """Refresh one batch of due sessions; returns how many were picked."""
+        now = time.time()
+        await self._flush_activity(now)
+
+        lock_id = str(uuid.uuid4())
+        locked = await db.redis_client.set(
+            SCHEDULER_LOCK_KEY, lock_id, nx=True, px=int(self.interval * 1000)
+        )
+        if not locked:
+            return 0  # another worker is on it
+        keep_locked = asyncio.create_task(self._keep_lock(lock_id))
+        try:
+            due = await db.redis_client.zrangebyscore(
+                SESSION_REFRESH_DUE_KEY, "-inf", now, start=0, num=self.batch_size
+            )
+            if not due:
+                return 0
+            last_used = await db.redis_client.zmscore(SESSION_ACTIVITY_KEY, due)
+            active = [
+                phantom_token
+                for phantom_token, used_at in zip(due, last_used, strict=True)
+                if used_at is not None and used_at > now - self.idle_timeout
+            ]
+            await untrack_sessions(db.redis_client, set(due) - set(active))
+            await self._refresh(active)
+            return len(due)
+        finally:
+            keep_locked.cancel()
+            await db.redis_client.eval(RELEASE_LOCK, 1, SCHEDULER_LOCK_KEY, lock_id)
+
+    async def _keep_lock(self, lock_id: str):
+        """Extend the scheduler lock while a run outlasts its TTL."""
+        while True:
+            await asyncio.sleep(self.interval / 2)
+            try:
+                await db.redis_client.eval(
+                    EXTEND_LOCK,
+                    1,
+                    SCHEDULER_LOCK_KEY,
+                    lock_id,
+                    int(self.interval * 1000),
+                )
+            except Exception as e:  # noqa: BLE001 - retried half an interval later
+                logger.error(f"Extending the session refresh lock failed: {e}")
+
+    async def _refresh(self, phantom_tokens: list[str]):
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def refresh(phantom_token):
+            async with semaphore:
+                return await self.refresher.refresh(phantom_token, self.lead)
+
+        results = await asyncio.gather(
+            *(refresh(phantom_token) for phantom_token in phantom_tokens),
+            return_exceptions=True,
+        )
+        gone = []
+        for phantom_token, result in zip(phantom_tokens, results, strict=True):
+            if isinstance(result, Exception):
+                logger.error(f"Background refresh of a session failed: {result}")
+                gone.append(phantom_token)
+            elif result is None:  # logged out or refresh token rejected
+                gone.append(phantom_token)
+        # Left to the next request, which refreshes or rejects it inline.
+        await untrack_sessions(db.redis_client, gone)
+
+    async def _flush_activity(self, now: float):
+        touched, self._touched = self._touched, set()
+        if touched:
+            await db.redis_client.zadd(
+                SESSION_ACTIVITY_KEY, {phantom_token: now for phantom_token in touched}
+            )
+        await db.redis_client.zremrangebyscore(
+            SESSION_ACTIVITY_KEY, "-inf", now - self.idle_timeout
+        )
+
+
+session_scheduler = SessionRefreshScheduler()
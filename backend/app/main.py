@@ -1,18 +1,20 @@
 from fastapi import FastAPI, APIRouter
-from app.routers.v1 import auth, user
-from app.core.middleware import (
-    PhantomTokenMiddleware,
-    RequestIdMiddleware,
-    LoggingMiddleware,
-)
+from app.routers.v1 import auth, user, search, summary
+from app.routers import health
+from app.core.middleware import RequestContextMiddleware
 from app.core.logger import configure_logging, LogLevels
 from app.core.rate_limiter import limiter
-from app.core.config import redis_settings
+from app.core.config import redis_settings, model_settings
 from app.core import network as net
 from contextlib import asynccontextmanager
 from starlette.middleware.cors import CORSMiddleware
 from app.core import database as db
+from app.core.session_cache import session_cache
+from app.core.session_scheduler import session_scheduler
+from app.services.search_service import SearchService
+from app.services.model_service import warmup_models
 import redis.asyncio as redis
+import asyncio
 import logging
 import httpx
 from dotenv import load_dotenv
@@ -31,19 +33,36 @@ async def lifespan(app: FastAPI):
         str(redis_settings.redis_url), decode_responses=True
     )
     logger.info("Redis connection established")
+    # Evict sessions logged out on other workers from this worker's cache
+    app.state.session_listener = asyncio.create_task(
+        session_cache.listen(db.redis_client)
+    )
     net.client = httpx.AsyncClient(timeout=30.0)
     logger.info("Global HTTP Client initialized with 30s timeout.")
+    # Refresh active sessions before their access token expires
+    app.state.session_scheduler = asyncio.create_task(session_scheduler.run())
+    if model_settings.AI_WARMUP_MODELS:
+        # Load models in the background; /ready reports 503 until done
+        app.state.warmup_task = asyncio.create_task(warmup_models())
+        logger.info(f"Warming up models: {model_settings.AI_WARMUP_MODELS}")
     logger.info("Resources initialized successfully")
 
     yield
 
     # Clean up resources here (e.g., close database connections, flush caches)
     logger.info("Application shutdown: Cleaning up resources")
+    app.state.session_listener.cancel()
+    app.state.session_scheduler.cancel()
+    if warmup_task := getattr(app.state, "warmup_task", None):
+        warmup_task.cancel()
     await db.redis_client.close()
     logger.info("Redis connection closed")
     if net.client:
         await net.client.aclose()
         logger.info("HTTP client closed")
+    if SearchService.shared:
+        SearchService.shared.shutdown()
+        logger.info("Search workers stopped")
     logger.info("Resources cleaned up successfully")
 
 
@@ -57,9 +76,7 @@ app = FastAPI(
 )
 
 app.state.limiter = limiter
-app.add_middleware(PhantomTokenMiddleware)
-app.add_middleware(RequestIdMiddleware)
-app.add_middleware(LoggingMiddleware)
+app.add_middleware(RequestContextMiddleware)
 
 origins = [
     "*",
@@ -77,9 +94,12 @@ app.add_middleware(
 v1_router = APIRouter(prefix="/v1")
 v1_router.include_router(auth.router)
 v1_router.include_router(user.router)
+v1_router.include_router(search.router)
+v1_router.include_router(summary.router)
 # v1_router.include_router(doc.router)
 
 app.include_router(v1_router)
+app.include_router(health.router)
 # if(__name__ == "__main__"):
 #     import uvicorn
 #     uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True)
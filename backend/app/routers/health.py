@@ -0,0 +1,22 @@
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from app.services.model_service import readiness
+
+router = APIRouter(tags=["Health"])
+
+
+@router.get(
+    "/ready",
+    summary="Readiness Probe",
+    description="""
+                Reports which AI models are resident and how long each took to load.
+                Returns 503 until every model listed in AI_WARMUP_MODELS is loaded.
+                """,
+)
+async def ready():
+    report = readiness()
+    code = (
+        status.HTTP_200_OK if report["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+    return JSONResponse(status_code=code, content=report)
@@ -11,6 +11,9 @@ from app.core.rate_limiter import limiter
 from app.core.config import kcsettings
 from app.core import database as db
 from app.core import network as net
+from app.core.session_cache import session_cache
+from app.core.session_refresh import track_session, untrack_sessions
+from app.core.session_scheduler import session_scheduler
 import logging
 import os
 import json
@@ -82,6 +85,9 @@ async def login(input_data: UserLogin, request: Request):
     )
     await db.redis_client.sadd(f"user_sessions:{user_id}", phantom_token)
     await db.redis_client.expire(f"user_sessions:{user_id}", 2592000)
+    # Index the session for background refresh ahead of expiry
+    await track_session(db.redis_client, phantom_token, decoded)
+    session_scheduler.touch(phantom_token)
 
     return JSONResponse(
         content={"message": "Login successful", "session_id": phantom_token}
@@ -216,6 +222,8 @@ async def logout(request: Request):
             )
 
         await db.redis_client.delete(f"session:{session_id}")
+        await session_cache.invalidate(db.redis_client, [session_id])
+        await untrack_sessions(db.redis_client, [session_id])
 
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -256,6 +264,8 @@ async def logout_all_devices(request: Request):
         logger.info(f"[{req_id}] Deleting session {_uuid} for user {user_id}")
         await db.redis_client.delete(f"session:{_uuid}")
     await db.redis_client.delete(user_key)
+    await session_cache.invalidate(db.redis_client, all_uuids)
+    await untrack_sessions(db.redis_client, all_uuids)
 
     logger.info(f"[{req_id}] Successfully logged out all devices for user {user_id}")
     return JSONResponse(
@@ -0,0 +1,72 @@
+import logging
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+
+from app.core.config import search_settings
+from app.schemas.search_schema import SearchResponse, SearchResult
+from app.schemas.user_schema import UserInternal
+from app.services.keycloak_service import kc_admin
+from app.services.search_service import (
+    SearchQueueFull,
+    SearchTimeout,
+    get_search_service,
+)
+
+logger = logging.getLogger("app.routers.search")
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get(
+    "",
+    response_model=SearchResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Semantic Search",
+    description="""
+                Search the indexed papers for the chunks closest in meaning to
+                the query. Returns 429 when the search workers are saturated
+                and 504 on timeout.
+                """,
+)
+async def search(
+    request: Request,
+    q: Annotated[str, Query(min_length=1, max_length=1000)],
+    user: Annotated[UserInternal, Depends(kc_admin.get_current_user)],
+    page: Annotated[int, Query(ge=1)] = 1,
+    page_size: Annotated[int, Query(ge=1, le=50)] = 10,
+):
+    req_id = getattr(request.state, "request_id", "-")
+    k = page * page_size
+    max_results = search_settings.SEARCH_MAX_RESULTS
+    if k > max_results:
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST,
+            f"Only the first {max_results} results can be paged",
+        )
+
+    try:
+        # One extra result tells whether there is a next page.
+        docs = await get_search_service().search(q, k + 1)
+    except SearchQueueFull:
+        logger.warning(f"[{req_id}] Search rejected, queue full")
+        raise HTTPException(
+            status.HTTP_429_TOO_MANY_REQUESTS,
+            "Search is busy, try again later.",
+            headers={"Retry-After": "1"},
+        ) from None
+    except SearchTimeout:
+        logger.error(f"[{req_id}] Search timed out")
+        raise HTTPException(
+            status.HTTP_504_GATEWAY_TIMEOUT, "Search timed out"
+        ) from None
+
+    return SearchResponse(
+        query=q,
+        page=page,
+        page_size=page_size,
+        has_more=len(docs) > k,
+        results=[
+            SearchResult(id=doc.id, content=doc.page_content, metadata=doc.metadata)
+            for doc in docs[k - page_size : k]
+        ],
+    )
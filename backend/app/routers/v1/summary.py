@@ -0,0 +1,38 @@
+import logging
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.schemas.user_schema import UserInternal
+from app.services.keycloak_service import kc_admin
+from app.services.summary_service import stream_summary_events
+
+logger = logging.getLogger("app.routers.summary")
+router = APIRouter(prefix="/summaries", tags=["Summaries"])
+
+
+@router.get(
+    "/stream",
+    status_code=status.HTTP_200_OK,
+    summary="Stream a Topic Summary",
+    description="""
+                Summarizes a scientific topic and streams the text as
+                server-sent events while it is generated. Closing the
+                connection stops the generation.
+                """,
+    response_class=StreamingResponse,
+)
+async def stream_summary(
+    request: Request,
+    topic: Annotated[str, Query(min_length=1, max_length=300)],
+    user: Annotated[UserInternal, Depends(kc_admin.get_current_user)],
+    context: Annotated[str, Query(max_length=20000)] = "None",
+):
+    req_id = getattr(request.state, "request_id", "-")
+    logger.info(f"[{req_id}] Streaming summary for user {user.sub}")
+    return StreamingResponse(
+        stream_summary_events(request, topic, context),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,33 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class SearchResult(BaseModel):
+    id: str | None = None
+    content: str
+    metadata: dict = Field(default_factory=dict)
+
+
+class SearchResponse(BaseModel):
+    query: str
+    page: int
+    page_size: int
+    has_more: bool
+    results: list[SearchResult]
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "query": "attention is all you need",
+                "page": 1,
+                "page_size": 10,
+                "has_more": True,
+                "results": [
+                    {
+                        "id": "9f2c…:12",
+                        "content": "The Transformer follows this architecture…",
+                        "metadata": {"source": "data/papers/1706.03762.pdf", "page": 2},
+                    }
+                ],
+            }
+        }
+    )
@@ -1,27 +1,106 @@
 from app.schemas.user_schema import UserInternal
 from fastapi import HTTPException, status, Request
-from jose import jwt
-from jose.exceptions import JWTError, ExpiredSignatureError
+from jose import jwk, jwt
+from jose.backends.base import Key
+from jose.exceptions import JWKError, JWTError, ExpiredSignatureError
 from app.core.config import kcsettings
 from app.core import network as net
+from collections import OrderedDict
+import asyncio
+import logging
 import httpx
+import time
+
+logger = logging.getLogger("app.services.keycloak")
 
 
 class KeycloakAdmin:
-    def __init__(self):
+    """
+    Keycloak admin calls and local access token verification.
+
+    Signing keys are cached by `kid` as constructed key objects and
+    refetched every `jwks_ttl` seconds; a token signed with an unknown
+    `kid` (key rotation) triggers a refetch, at most once per
+    `jwks_refetch_interval`. Verified tokens are memoized until their `exp`.
+    """
+
+    def __init__(
+        self,
+        jwks_ttl: float = kcsettings.KEYCLOAK_JWKS_TTL,
+        jwks_refetch_interval: float = kcsettings.KEYCLOAK_JWKS_REFETCH_INTERVAL,
+        verified_cache_size: int = kcsettings.KEYCLOAK_VERIFIED_TOKEN_CACHE_SIZE,
+    ):
         self.JWKS_CACHE = None
         self.TOKEN_CACHE = None
+        self.jwks_ttl = jwks_ttl
+        self.jwks_refetch_interval = jwks_refetch_interval
+        self.verified_cache_size = verified_cache_size
+        self._keys: dict[str, Key] = {}
+        self._jwks_fetched_at = None
+        self._jwks_lock = asyncio.Lock()
+        self._verified: OrderedDict[str, dict] = OrderedDict()
 
     async def __get_jwks(self):
-        if self.JWKS_CACHE:
-            return self.JWKS_CACHE
         response = await net.client.get(kcsettings.KEYCLOAK_JWK_URL)
+        response.raise_for_status()
         self.JWKS_CACHE = response.json()
         return self.JWKS_CACHE
 
+    async def __get_key(self, kid: str):
+        """The signing key with this `kid`, refetching the JWKS if due."""
+        key = self._keys.get(kid)
+        if key is not None and not self.__jwks_stale():
+            return key
+        async with self._jwks_lock:
+            # Another request may have refetched while we waited.
+            key = self._keys.get(kid)
+            if self.__jwks_stale() or (key is None and self.__refetch_allowed()):
+                await self.__refresh_keys()
+                key = self._keys.get(kid)
+        return key
+
+    def __jwks_stale(self) -> bool:
+        return (
+            self._jwks_fetched_at is None
+            or time.monotonic() - self._jwks_fetched_at > self.jwks_ttl
+        )
+
+    def __refetch_allowed(self) -> bool:
+        return time.monotonic() - self._jwks_fetched_at >= self.jwks_refetch_interval
+
+    async def __refresh_keys(self):
+        try:
+            jwks = await self.__get_jwks()
+        except (httpx.HTTPError, ValueError) as e:
+            if not self._keys:
+                raise
+            # Keep verifying with the keys we have; retry after the interval.
+            logger.error(f"Failed to refetch Keycloak JWKS: {e}")
+            self._jwks_fetched_at = (
+                time.monotonic() - self.jwks_ttl + self.jwks_refetch_interval
+            )
+            return
+
+        keys = {}
+        for k in jwks["keys"]:
+            if k.get("use", "sig") != "sig" or "kid" not in k:
+                continue
+            try:
+                keys[k["kid"]] = jwk.construct(k, k.get("alg", "RS256"))
+            except JWKError as e:
+                logger.warning(f"Skipping unsupported JWK {k['kid']}: {e}")
+        self._keys = keys
+        self._jwks_fetched_at = time.monotonic()
+
     async def verify_token(self, token: str):
         """Verifies a JWT access token from Keycloak"""
-        jwks = await self.__get_jwks()
+        payload = self._verified.get(token)
+        if payload is not None:
+            if payload["exp"] > time.time():
+                self._verified.move_to_end(token)
+                return payload
+            del self._verified[token]
+
         try:
             unverified_header = jwt.get_unverified_header(token)
         except JWTError:
@@ -30,11 +109,7 @@ class KeycloakAdmin:
             )
 
         # Find the public key with the same 'kid'
-        key = None
-        for k in jwks["keys"]:
-            if k["kid"] == unverified_header["kid"]:
-                key = k
-                break
+        key = await self.__get_key(unverified_header.get("kid"))
 
         if not key:
             raise HTTPException(
@@ -49,7 +124,6 @@ class KeycloakAdmin:
                 audience=kcsettings.KEYCLOAK_CLIENT_ID,
                 options={"verify_aud": False},
             )
-            return payload  # contains user info, roles, etc.
         except ExpiredSignatureError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired"
@@ -59,6 +133,12 @@ class KeycloakAdmin:
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
             )
 
+        if "exp" in payload:
+            self._verified[token] = payload
+            while len(self._verified) > self.verified_cache_size:
+                self._verified.popitem(last=False)
+        return payload  # contains user info, roles, etc.
+
     async def get_admin_token(self):
         """Get admin access token from Keycloak"""
         data = {
@@ -0,0 +1,64 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+
+from app.core.config import model_settings
+
+logger = logging.getLogger("app.services.models")
+
+
+@dataclass
+class WarmupState:
+    """Set by `warmup_models`; `error` is the exception if warmup failed."""
+
+    done: bool = False
+    error: Exception | None = None
+
+
+warmup = WarmupState()
+
+
+def ai_models():
+    """
+    The AI package's lazy model registry (AI/models.py). The repository root
+    must be on PYTHONPATH so that `AI` is importable.
+    """
+    from AI import models
+
+    return models
+
+
+async def warmup_models(names: list[str] | None = None):
+    """
+    Load the given models (AI_WARMUP_MODELS by default) on a worker thread,
+    without blocking the loop.
+    """
+    if names is None:
+        names = model_settings.AI_WARMUP_MODELS
+    try:
+        await asyncio.to_thread(ai_models().warmup, names)
+    except Exception as e:
+        warmup.error = e
+        logger.exception("Model warmup failed")
+    else:
+        logger.info(f"Models warmed up: {', '.join(names) or 'none'}")
+    warmup.done = True
+
+
+def readiness() -> dict:
+    try:
+        models = ai_models().model_status()
+    except ImportError as e:
+        logger.warning(f"AI package unavailable: {e}")
+        models = {}
+    missing = [
+        name
+        for name in model_settings.AI_WARMUP_MODELS
+        if not models.get(name, {}).get("loaded")
+    ]
+    return {
+        "ready": not missing and warmup.error is None,
+        "warming_up": bool(missing) and not warmup.done,
+        "missing": missing,
+        "models": models,
+    }
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.config import search_settings
+from app.services.model_service import ai_models
+
+logger = logging.getLogger("app.services.search")
+
+
+class SearchQueueFull(Exception):
+    """Every search thread is busy and the wait queue is full."""
+
+
+class SearchTimeout(Exception):
+    """The search did not finish within the configured timeout."""
+
+
+def load_pipeline():
+    """The AI semantic search pipeline, loaded once per process."""
+    return ai_models().search_pipeline.get()
+
+
+class SearchService:
+    """
+    Runs the synchronous semantic search (query embedding + FAISS lookup) on
+    a bounded thread pool so it never blocks the event loop.
+
+    At most `workers + queue_size` searches are admitted at once; beyond
+    that `search` raises SearchQueueFull immediately instead of queueing
+    more work. A search that times out still holds its slot until its
+    thread actually finishes, so stuck searches keep applying backpressure.
+    """
+
+    shared: "SearchService | None" = None  # see `get_search_service`
+
+    def __init__(
+        self,
+        workers: int = search_settings.SEARCH_WORKERS,
+        queue_size: int = search_settings.SEARCH_QUEUE_SIZE,
+        timeout: float = search_settings.SEARCH_TIMEOUT,
+        pipeline_factory=load_pipeline,
+    ):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self.timeout = timeout
+        self.pipeline_factory = pipeline_factory
+        self.in_flight = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="search"
+        )
+        self._pipeline = None
+        self._pipeline_lock = threading.Lock()
+
+    @property
+    def pipeline(self):
+        if self._pipeline is None:
+            with self._pipeline_lock:
+                if self._pipeline is None:
+                    logger.info("Loading semantic search pipeline")
+                    self._pipeline = self.pipeline_factory()
+        return self._pipeline
+
+    async def search(self, query: str, k: int):
+        # Only the event loop touches in_flight, so no lock is needed.
+        if self.in_flight >= self.capacity:
+            raise SearchQueueFull()
+        self.in_flight += 1
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, self._search, query, k)
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except TimeoutError:
+            raise SearchTimeout() from None
+
+    def _search(self, query: str, k: int):
+        return self.pipeline.search(query, k)
+
+    def _release(self, future):
+        self.in_flight -= 1
+        # Retrieve the exception of searches nobody waits for anymore.
+        if not future.cancelled():
+            future.exception()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_search_service() -> SearchService:
+    """The process-wide search service, created on first use."""
+    if SearchService.shared is None:
+        SearchService.shared = SearchService()
+    return SearchService.shared
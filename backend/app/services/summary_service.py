@@ -0,0 +1,40 @@
+import json
+import logging
+
+from fastapi import Request
+
+logger = logging.getLogger("app.services.summary")
+
+
+def get_summarizer():
+    """The AI topic summarizer module (imported on first use)."""
+    from AI.Summarizer import topic_summarizer
+
+    return topic_summarizer
+
+
+def sse_event(data: dict, event: str | None = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+async def stream_summary_events(request: Request, topic: str, context: str):
+    """
+    Server-sent events for a topic summary: one `data` event per text
+    delta, then `done` (or `error`). Stops generating when the client
+    disconnects.
+    """
+    stream = get_summarizer().astream_summary(topic, context)
+    try:
+        async for text in stream:
+            if await request.is_disconnected():
+                logger.info("Client disconnected, cancelling summary")
+                return
+            yield sse_event({"text": text})
+        yield sse_event({}, event="done")
+    except Exception:
+        logger.exception("Summary stream failed")
+        yield sse_event({"detail": "Summary generation failed"}, event="error")
+    finally:
+        # Closing the generator cancels the model request.
+        await stream.aclose()
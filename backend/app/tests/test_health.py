@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import model_settings
+from app.main import app
+from app.services.model_service import ai_models, warmup_models
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    models = ai_models()
+    model = models.register("fake", object)
+    monkeypatch.setattr(model_settings, "AI_WARMUP_MODELS", ["fake"])
+    yield model
+    del models.registry["fake"]
+
+
+def test_ready_reports_models_without_loading_them():
+    response = client.get("/ready")
+    assert response.status_code == 200
+    models = response.json()["models"]
+    assert {"keybert", "specter", "summarizer_llm", "search_pipeline"} <= set(models)
+    assert not any(m["loaded"] for m in models.values())
+
+
+def test_ready_waits_for_warmup_models(fake_model):
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["missing"] == ["fake"]
+
+    ai_models().warmup(["fake"])
+    response = client.get("/ready")
+    assert response.status_code == 200
+    status = response.json()["models"]["fake"]
+    assert status["loaded"] and status["load_seconds"] >= 0
+
+
+def test_warmup_reads_the_current_setting(fake_model):
+    asyncio.run(warmup_models())
+    assert fake_model.loaded
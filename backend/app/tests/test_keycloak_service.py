@@ -0,0 +1,98 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from jose import jwk, jwt
+
+from app.core import network as net
+from app.services.keycloak_service import KeycloakAdmin
+
+
+def signing_key(kid: str):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public = jwk.construct(pem, "RS256").public_key().to_dict()
+    return pem, {**public, "kid": kid, "use": "sig"}
+
+
+def sign(pem, kid: str, exp_in: float = 300) -> str:
+    claims = {"sub": "user-1", "exp": int(time.time() + exp_in)}
+    return jwt.encode(claims, pem, algorithm="RS256", headers={"kid": kid})
+
+
+class FakeJwksClient:
+    def __init__(self, keys):
+        self.keys = keys
+        self.fetches = 0
+
+    async def get(self, url):
+        self.fetches += 1
+        jwks = {"keys": list(self.keys)}
+        return SimpleNamespace(json=lambda: jwks, raise_for_status=lambda: None)
+
+
+@pytest.fixture
+def keys(monkeypatch):
+    pem_1, jwk_1 = signing_key("key-1")
+    pem_2, jwk_2 = signing_key("key-2")
+    client = FakeJwksClient([jwk_1])
+    monkeypatch.setattr(net, "client", client)
+    return client, pem_1, (pem_2, jwk_2)
+
+
+def test_verified_tokens_and_keys_are_cached(keys):
+    client, pem_1, _ = keys
+    admin = KeycloakAdmin()
+    token = sign(pem_1, "key-1")
+
+    assert asyncio.run(admin.verify_token(token))["sub"] == "user-1"
+    assert asyncio.run(admin.verify_token(token))["sub"] == "user-1"
+    assert asyncio.run(admin.verify_token(sign(pem_1, "key-1", 200)))
+    assert client.fetches == 1
+
+
+def test_unknown_kid_refetches_at_most_once_per_interval(keys):
+    client, pem_1, (pem_2, jwk_2) = keys
+    admin = KeycloakAdmin(jwks_refetch_interval=0)
+    asyncio.run(admin.verify_token(sign(pem_1, "key-1")))
+
+    # Keycloak rotated its signing key.
+    client.keys.append(jwk_2)
+    assert asyncio.run(admin.verify_token(sign(pem_2, "key-2")))["sub"] == "user-1"
+    assert client.fetches == 2
+
+    # The keys were just fetched, so unknown kids do not hit Keycloak again.
+    admin.jwks_refetch_interval = 60
+    for _ in range(3):
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(admin.verify_token(sign(pem_2, "unknown")))
+        assert error.value.detail == "Public key not found"
+    assert client.fetches == 2
+
+
+def test_keys_expire_after_ttl(keys):
+    client, pem_1, _ = keys
+    admin = KeycloakAdmin(jwks_ttl=0)
+    asyncio.run(admin.verify_token(sign(pem_1, "key-1")))
+    asyncio.run(admin.verify_token(sign(pem_1, "key-1", 200)))
+    assert client.fetches == 2
+
+
+def test_expired_and_forged_tokens_are_rejected(keys):
+    _, pem_1, (pem_2, _) = keys
+    admin = KeycloakAdmin()
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(admin.verify_token(sign(pem_1, "key-1", -10)))
+    assert error.value.detail == "Token expired"
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(admin.verify_token(sign(pem_2, "key-1")))
+    assert error.value.detail == "Invalid token"
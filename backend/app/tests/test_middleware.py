@@ -0,0 +1,202 @@
+import asyncio
+import json
+import logging
+import time
+
+import jwt
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import database as db
+from app.core.logger import RequestIdFilter
+from app.core.session_cache import SessionCache, session_cache
+from app.main import app
+
+client = TestClient(app)
+
+CLAIMS = {
+    "sub": "user-1",
+    "email_verified": True,
+    "preferred_username": "user",
+    "email": "user@mail.com",
+}
+
+
+def access_token(exp_in: float = 300) -> str:
+    return jwt.encode({**CLAIMS, "exp": int(time.time() + exp_in)}, "secret")
+
+
+class FakeRedis:
+    def __init__(self, fail=False):
+        self.data = {}
+        self.fail = fail
+        self.gets = 0
+        self.published = []
+
+    async def get(self, key):
+        self.gets += 1
+        if self.fail:
+            raise ConnectionError("redis down")
+        return self.data.get(key)
+
+    async def smembers(self, key):
+        return self.data.get(key, set())
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+    async def zrem(self, key, *members):
+        pass
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(db, "redis_client", fake)
+    session_cache.clear()
+    yield fake
+    session_cache.clear()
+
+
+def test_request_id_is_echoed_or_generated():
+    response = client.get("/ready", headers={"X-Request-ID": "abc"})
+    assert response.headers["X-Request-ID"] == "abc"
+
+    response = client.get("/ready")
+    assert len(response.headers["X-Request-ID"]) == 36
+
+
+def test_access_log_carries_the_request_id(caplog):
+    logger = logging.getLogger("app.core.middleware")
+    request_ids = []
+    record_filter = RequestIdFilter()
+
+    def capture(record):
+        record_filter.filter(record)
+        request_ids.append(record.request_id)
+        return True
+
+    logger.addFilter(capture)
+    try:
+        with caplog.at_level(logging.INFO, logger="app.core.middleware"):
+            client.get("/ready", headers={"X-Request-ID": "log-1"})
+    finally:
+        logger.removeFilter(capture)
+    assert request_ids == ["log-1"]
+
+
+def test_session_resolves_current_user(redis):
+    session = {"access_token": access_token(), "refresh_token": "r"}
+    redis.data["session:tok"] = json.dumps(session)
+
+    response = client.get("/v1/users/me", headers={"Authorization": "Bearer tok"})
+    assert response.status_code == 200
+    assert response.json()["user_id"] == "user-1"
+    assert "X-Request-ID" in response.headers
+
+
+def test_unknown_session_is_rejected_with_request_id(redis):
+    response = client.get(
+        "/v1/users/me",
+        headers={"Authorization": "Bearer missing", "X-Request-ID": "req-1"},
+    )
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Session expired or revoked"}
+    assert response.headers["X-Request-ID"] == "req-1"
+
+
+def test_redis_error_returns_500_with_request_id(monkeypatch):
+    monkeypatch.setattr(db, "redis_client", FakeRedis(fail=True))
+    response = client.get(
+        "/v1/users/me",
+        headers={"Authorization": "Bearer tok", "X-Request-ID": "req-2"},
+    )
+    assert response.status_code == 500
+    assert response.headers["X-Request-ID"] == "req-2"
+
+
+def test_missing_token_is_left_to_the_route():
+    response = client.get("/v1/users/me")
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Not authenticated"}
+
+
+def test_session_is_served_from_the_worker_cache(redis):
+    session = {"access_token": access_token(), "refresh_token": "r"}
+    redis.data["session:tok"] = json.dumps(session)
+    headers = {"Authorization": "Bearer tok"}
+
+    assert client.get("/v1/users/me", headers=headers).status_code == 200
+    assert client.get("/v1/users/me", headers=headers).status_code == 200
+    assert redis.gets == 1
+
+
+def test_logout_all_invalidates_cached_sessions(redis):
+    session = {"access_token": access_token(), "refresh_token": "r"}
+    redis.data["session:tok"] = json.dumps(session)
+    redis.data["user_sessions:user-1"] = {"tok"}
+    headers = {"Authorization": "Bearer tok"}
+
+    assert client.get("/v1/users/me", headers=headers).status_code == 200
+    assert client.post("/v1/auth/logout-all", headers=headers).status_code == 200
+    assert redis.published == [(session_cache.channel, json.dumps(["tok"]))]
+
+    response = client.get("/v1/users/me", headers=headers)
+    assert response.status_code == 401
+
+
+def test_cache_entry_never_outlives_the_token():
+    cache = SessionCache(ttl=60)
+    cache.put("tok", {}, {"exp": time.time() + 0.05})
+    assert cache.get("tok") is not None
+    time.sleep(0.06)
+    assert cache.get("tok") is None
+
+    cache.put("expired", {}, {"exp": time.time() - 1})
+    assert cache.get("expired") is None
+
+
+class FakePubSub:
+    def __init__(self, queue):
+        self.queue = queue
+        self.subscribed = asyncio.Event()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def subscribe(self, channel):
+        self.subscribed.set()
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+
+def test_listener_evicts_sessions_revoked_elsewhere():
+    cache = SessionCache(ttl=60)
+
+    async def run():
+        pubsub = FakePubSub(asyncio.Queue())
+        redis_client = type("FakeRedis", (), {"pubsub": lambda self: pubsub})()
+        listener = asyncio.create_task(cache.listen(redis_client))
+        await pubsub.subscribed.wait()
+        await asyncio.sleep(0)
+        for token in ("a", "b", "c"):
+            cache.put(token, {}, {"exp": time.time() + 60})
+
+        await pubsub.queue.put({"type": "message", "data": json.dumps(["a", "b"])})
+        await asyncio.sleep(0.01)
+        listener.cancel()
+
+    asyncio.run(run())
+    assert cache.get("a") is None and cache.get("b") is None
+    assert cache.get("c") is not None
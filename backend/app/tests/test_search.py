@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schemas.user_schema import UserInternal
+from app.services import search_service
+from app.services.keycloak_service import kc_admin
+
+USER = UserInternal(
+    sub="user-1",
+    email_verified=True,
+    preferred_username="user",
+    email="user@mail.com",
+)
+
+
+class FakePipeline:
+    def __init__(self, delay=0.0, gate=None):
+        self.delay = delay
+        self.gate = gate
+        self.docs = [
+            SimpleNamespace(
+                id=f"doc:{i}", page_content=f"chunk {i}", metadata={"page": i}
+            )
+            for i in range(30)
+        ]
+
+    def search(self, query, k):
+        if self.gate:
+            self.gate.wait()
+        time.sleep(self.delay)
+        return self.docs[:k]
+
+
+@pytest.fixture
+def use_pipeline():
+    app.dependency_overrides[kc_admin.get_current_user] = lambda: USER
+    services = []
+
+    def use(pipeline, **kwargs):
+        service = search_service.SearchService(
+            pipeline_factory=lambda: pipeline, **kwargs
+        )
+        search_service.SearchService.shared = service
+        services.append(service)
+        return service
+
+    yield use
+    app.dependency_overrides.clear()
+    search_service.SearchService.shared = None
+    for service in services:
+        service.shutdown()
+
+
+def test_search_paginates(use_pipeline):
+    use_pipeline(FakePipeline())
+    client = TestClient(app)
+
+    first = client.get("/v1/search", params={"q": "transformers", "page_size": 10})
+    assert first.status_code == 200
+    body = first.json()
+    assert [r["id"] for r in body["results"]] == [f"doc:{i}" for i in range(10)]
+    assert body["has_more"] is True
+
+    last = client.get(
+        "/v1/search", params={"q": "transformers", "page": 3, "page_size": 10}
+    )
+    body = last.json()
+    assert [r["id"] for r in body["results"]] == [f"doc:{i}" for i in range(20, 30)]
+    assert body["has_more"] is False
+
+
+def test_search_requires_login():
+    response = TestClient(app).get("/v1/search", params={"q": "transformers"})
+    assert response.status_code == 401
+
+
+def test_search_times_out(use_pipeline):
+    use_pipeline(FakePipeline(delay=0.5), timeout=0.05)
+    response = TestClient(app).get("/v1/search", params={"q": "transformers"})
+    assert response.status_code == 504
+
+
+def test_search_rejects_when_queue_full(use_pipeline):
+    gate = threading.Event()
+    use_pipeline(FakePipeline(gate=gate), workers=1, queue_size=1)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            pending = [
+                asyncio.create_task(c.get("/v1/search", params={"q": "a"}))
+                for _ in range(2)
+            ]
+            await asyncio.sleep(0.05)
+            rejected = await c.get("/v1/search", params={"q": "a"})
+            # Other endpoints stay responsive while searches are running.
+            start = time.perf_counter()
+            me = await c.get("/v1/users/me")
+            elapsed = time.perf_counter() - start
+            gate.set()
+            return rejected, me, elapsed, await asyncio.gather(*pending)
+
+    rejected, me, elapsed, accepted = asyncio.run(run())
+    assert rejected.status_code == 429
+    assert me.status_code == 200 and elapsed < 0.5
+    assert [r.status_code for r in accepted] == [200, 200]
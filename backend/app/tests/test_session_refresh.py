@@ -0,0 +1,207 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import jwt
+import pytest
+
+from app.core import database as db
+from app.core.middleware import RequestContextMiddleware
+from app.core.session_refresh import (
+    SESSION_REFRESH_DUE_KEY,
+    SessionRefresher,
+    session_refresher,
+)
+from app.core.session_scheduler import SessionRefreshScheduler
+
+
+def access_token(exp_in: float, lifetime: float | None = None) -> str:
+    claims = {"sub": "user-1", "exp": int(time.time() + exp_in)}
+    if lifetime is not None:
+        claims["iat"] = claims["exp"] - int(lifetime)
+    return jwt.encode(claims, "secret")
+
+
+class FakeRedis:
+    """Shared by every simulated worker, like the real Redis."""
+
+    def __init__(self):
+        self.data = {}
+        self.zsets = {}
+        self.extended = []
+
+    async def get(self, key):
+        await asyncio.sleep(0)
+        return self.data.get(key)
+
+    async def set(self, key, value, nx=False, px=None):
+        await asyncio.sleep(0)
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    async def eval(self, script, numkeys, key, value, *args):
+        if self.data.get(key) != value:
+            return 0
+        if "pexpire" in script:
+            self.extended.append(key)
+        else:
+            del self.data[key]
+        return 1
+
+    async def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    async def zrem(self, key, *members):
+        for member in members:
+            self.zsets.get(key, {}).pop(member, None)
+
+    async def zrangebyscore(self, key, low, high, start=0, num=None):
+        items = sorted(self.zsets.get(key, {}).items(), key=lambda item: item[1])
+        due = [member for member, score in items if score <= high]
+        return due[start : start + num] if num is not None else due[start:]
+
+    async def zmscore(self, key, members):
+        return [self.zsets.get(key, {}).get(member) for member in members]
+
+    async def zremrangebyscore(self, key, low, high):
+        zset = self.zsets.get(key, {})
+        for member in [m for m, score in zset.items() if score <= high]:
+            del zset[member]
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    fake.data["session:tok"] = json.dumps(
+        {"access_token": access_token(-10), "refresh_token": "refresh-1"}
+    )
+    monkeypatch.setattr(db, "redis_client", fake)
+    return fake
+
+
+def fake_keycloak(status_code=200, lifetime=300, delay=0.01):
+    used = []
+
+    async def refresh_keycloak_token(refresh_token):
+        used.append(refresh_token)
+        await asyncio.sleep(delay)
+        tokens = {
+            "access_token": access_token(lifetime, lifetime),
+            "refresh_token": "refresh-2",
+        }
+        return SimpleNamespace(status_code=status_code, json=lambda: tokens, text="")
+
+    return refresh_keycloak_token, used
+
+
+def test_parallel_requests_share_one_refresh(redis, monkeypatch):
+    refresh_keycloak_token, used = fake_keycloak()
+    monkeypatch.setattr(
+        session_refresher, "refresh_keycloak_token", refresh_keycloak_token
+    )
+    middleware = RequestContextMiddleware(app=None)
+    expired = json.loads(redis.data["session:tok"])
+
+    async def run():
+        return await asyncio.gather(
+            *(middleware.validate_session_data(dict(expired), "tok") for _ in range(10))
+        )
+
+    results = asyncio.run(run())
+    assert used == ["refresh-1"]
+    assert {session["refresh_token"] for session, _ in results} == {"refresh-2"}
+    assert all(payload["exp"] > time.time() for _, payload in results)
+    assert json.loads(redis.data["session:tok"])["refresh_token"] == "refresh-2"
+    assert "session_refresh_lock:tok" not in redis.data
+
+
+def test_workers_coordinate_through_the_redis_lock(redis):
+    workers = [SessionRefresher(lock_ttl=1, poll_interval=0.005) for _ in range(3)]
+    used = []
+    for worker in workers:
+        worker.refresh_keycloak_token, worker_used = fake_keycloak()
+        used.append(worker_used)
+
+    async def run():
+        return await asyncio.gather(*(worker.refresh("tok") for worker in workers))
+
+    results = asyncio.run(run())
+    assert sum(len(u) for u in used) == 1
+    assert all(session["refresh_token"] == "refresh-2" for session, _ in results)
+
+
+def test_failed_refresh_returns_none(redis):
+    refresher = SessionRefresher()
+    refresher.refresh_keycloak_token, _ = fake_keycloak(status_code=400)
+    assert asyncio.run(refresher.refresh("tok")) is None
+    assert "session_refresh_lock:tok" not in redis.data
+
+
+def test_fresh_session_is_not_refreshed(redis):
+    redis.data["session:tok"] = json.dumps(
+        {"access_token": access_token(300), "refresh_token": "refresh-1"}
+    )
+    refresher = SessionRefresher()
+    refresher.refresh_keycloak_token, used = fake_keycloak()
+    session, _ = asyncio.run(refresher.refresh("tok"))
+    assert used == [] and session["refresh_token"] == "refresh-1"
+
+
+def test_scheduler_refreshes_active_sessions_before_expiry(redis):
+    redis.data["session:tok"] = json.dumps(
+        {"access_token": access_token(30), "refresh_token": "refresh-1"}
+    )
+    redis.data["session:idle"] = redis.data["session:tok"]
+    redis.zsets[SESSION_REFRESH_DUE_KEY] = {
+        "tok": time.time() - 30,
+        "idle": time.time() - 30,
+        "later": time.time() + 3600,
+    }
+    refresher = SessionRefresher()
+    refresher.refresh_keycloak_token, used = fake_keycloak()
+    scheduler = SessionRefreshScheduler(lead=60, batch_size=10, refresher=refresher)
+    scheduler.touch("tok")
+
+    assert asyncio.run(scheduler.run_once()) == 2
+    assert used == ["refresh-1"]
+    assert json.loads(redis.data["session:tok"])["refresh_token"] == "refresh-2"
+    # The idle session is left for the next request; the refreshed one is
+    # due again `lead` seconds before its new expiry.
+    index = redis.zsets[SESSION_REFRESH_DUE_KEY]
+    assert "idle" not in index
+    assert index["tok"] > time.time() + 200
+
+    assert asyncio.run(scheduler.run_once()) == 0
+    assert used == ["refresh-1"]
+
+
+def test_short_lived_tokens_are_not_refreshed_on_every_run(redis):
+    redis.zsets[SESSION_REFRESH_DUE_KEY] = {"tok": time.time() - 1}
+    refresher = SessionRefresher()
+    # Tokens live 30s, less than the 60s lead.
+    refresher.refresh_keycloak_token, used = fake_keycloak(lifetime=30)
+    scheduler = SessionRefreshScheduler(lead=60, batch_size=10, refresher=refresher)
+    scheduler.touch("tok")
+
+    assert asyncio.run(scheduler.run_once()) == 1
+    assert redis.zsets[SESSION_REFRESH_DUE_KEY]["tok"] > time.time() + 10
+    assert asyncio.run(scheduler.run_once()) == 0
+    assert used == ["refresh-1"]
+
+
+def test_scheduler_lock_is_extended_during_a_long_run(redis):
+    redis.zsets[SESSION_REFRESH_DUE_KEY] = {"tok": time.time() - 1}
+    refresher = SessionRefresher()
+    refresher.refresh_keycloak_token, _ = fake_keycloak(delay=0.05)
+    scheduler = SessionRefreshScheduler(interval=0.02, refresher=refresher)
+    scheduler.touch("tok")
+
+    assert asyncio.run(scheduler.run_once()) == 1
+    assert "session_refresh_scheduler" in redis.extended
+    assert "session_refresh_scheduler" not in redis.data
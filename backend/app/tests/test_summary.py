@@ -0,0 +1,100 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schemas.user_schema import UserInternal
+from app.services import summary_service
+from app.services.keycloak_service import kc_admin
+
+USER = UserInternal(
+    sub="user-1",
+    email_verified=True,
+    preferred_username="user",
+    email="user@mail.com",
+)
+
+
+class FakeSummarizer:
+    """Stands in for AI.Summarizer.topic_summarizer."""
+
+    def __init__(self, parts, fail=False):
+        self.parts = parts
+        self.fail = fail
+        self.closed = False
+
+    async def astream_summary(self, topic, context="None"):
+        try:
+            for part in self.parts:
+                await asyncio.sleep(0)
+                yield part
+            if self.fail:
+                raise RuntimeError("model error")
+        finally:
+            self.closed = True
+
+
+@pytest.fixture
+def summarizer(monkeypatch):
+    app.dependency_overrides[kc_admin.get_current_user] = lambda: USER
+
+    def use(fake):
+        monkeypatch.setattr(summary_service, "get_summarizer", lambda: fake)
+        return fake
+
+    yield use
+    app.dependency_overrides.clear()
+
+
+def parse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines.get("event", "message"), json.loads(lines["data"])))
+    return events
+
+
+def test_streams_summary_as_events(summarizer):
+    fake = summarizer(FakeSummarizer(["Deep ", "learning ", "is..."]))
+    with TestClient(app).stream(
+        "GET", "/v1/summaries/stream", params={"topic": "Deep Learning"}
+    ) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_events(response.read().decode())
+    assert events == [
+        ("message", {"text": "Deep "}),
+        ("message", {"text": "learning "}),
+        ("message", {"text": "is..."}),
+        ("done", {}),
+    ]
+    assert fake.closed
+
+
+def test_reports_errors_as_event(summarizer):
+    summarizer(FakeSummarizer(["partial"], fail=True))
+    response = TestClient(app).get("/v1/summaries/stream", params={"topic": "x"})
+    assert parse_events(response.text)[-1][0] == "error"
+
+
+def test_stops_generating_when_client_disconnects(summarizer):
+    fake = summarizer(FakeSummarizer(["a", "b", "c", "d"]))
+    checks = iter([False, True])
+    request = SimpleNamespace(is_disconnected=lambda: asyncio.sleep(0, next(checks)))
+
+    async def consume():
+        return [
+            e async for e in summary_service.stream_summary_events(request, "x", "")
+        ]
+
+    events = asyncio.run(consume())
+    assert len(events) == 1
+    assert fake.closed
+
+
+def test_requires_login():
+    response = TestClient(app).get("/v1/summaries/stream", params={"topic": "x"})
+    assert response.status_code == 401
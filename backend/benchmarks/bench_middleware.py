@@ -0,0 +1,175 @@
+"""
+Benchmark: request throughput and p99 latency of GET /v1/users/me through
+the pure-ASGI RequestContextMiddleware vs a replica of the previous stack of
+three BaseHTTPMiddleware layers (phantom token, request id, logging).
+
+Both apps serve the real users router. Redis is replaced by an in-memory
+fake holding one valid session, so the numbers measure the middleware and
+routing overhead rather than the network. The new middleware runs twice:
+with the session cache disabled, so it does the same Redis read and token
+decode per request as the old stack, and with it enabled, which serves every
+request after the first from memory. Requests are driven in process
+through httpx's ASGI transport by `clients` concurrent callers.
+
+Run from the backend directory (the usual settings env vars must be set):
+    PYTHONPATH=. python benchmarks/bench_middleware.py [requests] [clients]
+"""
+
+import asyncio
+import json
+import logging
+import sys
+import time
+import uuid
+
+import httpx
+import jwt
+import numpy as np
+from fastapi import APIRouter, FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core import database as db
+from app.core.context import request_id_ctx
+from app.core.middleware import RequestContextMiddleware
+from app.core.session_cache import session_cache
+from app.routers.v1 import user
+
+SESSION = "bench-session"
+
+
+class FakeRedis:
+    def __init__(self, data):
+        self.data = data
+
+    async def get(self, key):
+        return self.data.get(key)
+
+
+# --- Replica of the previous middleware stack --------------------------------
+
+
+class LegacyPhantomTokenMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        auth_header = request.headers.get("Authorization")
+        if not (auth_header and auth_header.startswith("Bearer ")):
+            return await call_next(request)
+        phantom_token = auth_header.split(" ")[1]
+        data_json = await db.redis_client.get(f"session:{phantom_token}")
+        session_data = json.loads(data_json)
+        # validate_session_data decoded the token once more to check `exp`
+        payload = jwt.decode(
+            session_data["access_token"], options={"verify_signature": False}
+        )
+        assert time.time() < payload["exp"]
+        payload = jwt.decode(
+            session_data["access_token"], options={"verify_signature": False}
+        )
+        request.state.user = payload
+        request.state.user_id = payload.get("sub")
+        request.state.session_id = phantom_token
+        request.state.access_token = session_data["access_token"]
+        request.state.refresh_token = session_data["refresh_token"]
+        return await call_next(request)
+
+
+class LegacyRequestIdMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        req_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
+        request.state.request_id = req_id
+        request_id_ctx.set(req_id)
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = req_id
+        return response
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        process_time = (time.time() - start_time) * 1000
+        logging.getLogger("bench").info(
+            f"{request.method} {request.url.path} "
+            f"completed in {process_time:.2f}ms status {response.status_code}"
+        )
+        return response
+
+
+# -----------------------------------------------------------------------------
+
+
+def build_app(middlewares) -> FastAPI:
+    app = FastAPI()
+    v1_router = APIRouter(prefix="/v1")
+    v1_router.include_router(user.router)
+    app.include_router(v1_router)
+    for middleware in middlewares:
+        app.add_middleware(middleware)
+    return app
+
+
+async def run_clients(app, n_requests, clients):
+    latencies = []
+    headers = {"Authorization": f"Bearer {SESSION}"}
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+
+        async def caller(count):
+            for _ in range(count):
+                start = time.perf_counter()
+                response = await c.get("/v1/users/me", headers=headers)
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.text
+
+        await caller(50)  # warm up
+        latencies.clear()
+        start = time.perf_counter()
+        await asyncio.gather(*(caller(n_requests // clients) for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, np.array(latencies) * 1000
+
+
+def main():
+    n_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+
+    claims = {
+        "sub": "user-1",
+        "email_verified": True,
+        "preferred_username": "user",
+        "email": "user@mail.com",
+        "exp": int(time.time()) + 3600,
+    }
+    session = {"access_token": jwt.encode(claims, "secret"), "refresh_token": "r"}
+    db.redis_client = FakeRedis({f"session:{SESSION}": json.dumps(session)})
+    # Log lines are formatted but not written, like a production INFO level.
+    logging.basicConfig(level=logging.INFO, handlers=[logging.NullHandler()])
+
+    legacy = [
+        LegacyPhantomTokenMiddleware,
+        LegacyRequestIdMiddleware,
+        LegacyLoggingMiddleware,
+    ]
+    # (name, middlewares, session cache TTL); a zero TTL caches nothing.
+    stacks = [
+        ("BaseHTTPMiddleware x3", legacy, 0),
+        ("RequestContextMiddleware", [RequestContextMiddleware], 0),
+        ("  + session cache", [RequestContextMiddleware], session_cache.ttl),
+    ]
+
+    print(f"{n_requests} requests, {clients} concurrent clients")
+    print(f"{'stack':<28}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, middlewares, ttl in stacks:
+        session_cache.clear()
+        session_cache.ttl = ttl
+        app = build_app(middlewares)
+        throughput, latencies = asyncio.run(run_clients(app, n_requests, clients))
+        print(
+            f"{name:<28}{throughput:>10.0f}"
+            f"{np.percentile(latencies, 50):>10.2f}"
+            f"{np.percentile(latencies, 99):>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()